@@ -0,0 +1,95 @@
+"""
+Import Profile - Reports what importing the API costs at startup
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+summarizes the cumulative import time per top-level package, and whether
+the heavy agent frameworks were loaded. The fast paths (competitor research,
+fast prompt generation) should not need CrewAI, so it should not appear.
+
+Usage (from agents/):
+    python bench/import_profile.py
+    python bench/import_profile.py --module crewai --top 30
+"""
+import re
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+
+# Packages that must stay out of the startup import graph
+HEAVY_PACKAGES = ("crewai", "crewai_tools", "langchain", "langchain_core", "litellm", "chromadb")
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str) -> tuple[dict[str, int], set[str]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Module to import, resolved from the agents directory
+
+    Returns:
+        Cumulative microseconds per top-level package, and every module loaded
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AGENTS_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        tail = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+        raise SystemExit(f"Importing {module} failed:\n{tail[-2000:]}")
+
+    # Children are reported before their parent; indentation gives the depth
+    packages: dict[str, int] = {}
+    children: dict[str, int] = {}
+    loaded: set[str] = set()
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(2)), len(match.group(3)) // 2, match.group(4)
+        loaded.add(name)
+        if depth == 1:
+            # A direct import of the profiled module; deeper ones are inside its cumulative time
+            top = name.split(".")[0]
+            children[top] = children.get(top, 0) + cumulative
+        elif depth == 0:
+            if name == module:
+                packages = {**children, module: cumulative}
+            children = {}
+    return packages, loaded
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import-time profile of the agents service")
+    parser.add_argument("--module", default="main", help="Module to profile (default: main)")
+    parser.add_argument("--top", type=int, default=20, help="Packages to list")
+    args = parser.parse_args(argv)
+
+    packages, loaded = profile_import(args.module)
+    total = packages.pop(args.module, 0)
+
+    print(f"import {args.module}: {total / 1e6:.3f}s total")
+    print()
+    print(f"{'package':<30} {'seconds':>8}")
+    print("-" * 39)
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<30} {micros / 1e6:>8.3f}")
+
+    heavy = sorted(p for p in HEAVY_PACKAGES if p in loaded)
+    print()
+    if heavy:
+        print(f"Heavy packages loaded at import: {', '.join(heavy)}")
+    else:
+        print("No heavy agent frameworks loaded at import")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""
+Benchmark Runner - Drives every API endpoint against the stub providers
+
+Starts the stubs and a uvicorn server pointed at them, runs each scenario at
+the requested concurrency and reports throughput, latency percentiles, peak
+RSS and outbound calls per provider.
+
+Usage (from agents/):
+    python bench/run.py
+    python bench/run.py --scenarios product,brand --requests 50 --concurrency 10
+    python bench/run.py --openai-latency 0 --serpapi-latency 0 --json results.json
+"""
+import os
+import sys
+import copy
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from stubs import StubProviders, FIXTURES_DIR, PROVIDERS
+
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+
+
+class Scenario:
+    """One endpoint call pattern"""
+
+    def __init__(
+        self,
+        path: str,
+        fixture: str,
+        overrides: Optional[dict] = None,
+        stream: bool = False,
+        batch: int = 0,
+        job: bool = False
+    ):
+        """
+        Args:
+            path: Endpoint path
+            fixture: Key in fixtures/requests.json for the base payload
+            overrides: Fields merged over the base payload
+            stream: Consume an NDJSON/SSE response to the end
+            batch: Send this many items to /research/batch instead of one payload
+            job: Submit in async mode and poll /jobs/{id} until it finishes
+        """
+        self.path = path
+        self.fixture = fixture
+        self.overrides = overrides or {}
+        self.stream = stream
+        self.batch = batch
+        self.job = job
+
+
+SCENARIOS = {
+    "product": Scenario("/research", "product"),
+    "product_simple": Scenario("/research/simple", "product"),
+    "product_stream": Scenario("/research/stream", "product", stream=True),
+    "product_batch": Scenario("/research/batch", "product", batch=5, stream=True),
+    "product_job": Scenario("/research", "product", job=True),
+    "brand": Scenario("/brand/research", "brand"),
+    "brand_simple": Scenario("/brand/research/simple", "brand"),
+    "brand_stream": Scenario("/brand/research/stream", "brand", stream=True),
+    "competitors": Scenario("/competitors/research", "competitor"),
+    "competitors_simple": Scenario("/competitors/research/simple", "competitor"),
+    "competitors_stream": Scenario("/competitors/research/stream", "competitor", stream=True),
+    "prompts_fast": Scenario("/prompts/generate", "prompts"),
+    "prompts_single": Scenario("/prompts/generate", "prompts", {"fan_out": False}),
+    "prompts_crew": Scenario("/prompts/generate", "prompts", {"use_fast_mode": False}),
+    "prompts_simple": Scenario("/prompts/generate/simple", "prompts"),
+    "prompts_stream": Scenario("/prompts/generate/stream", "prompts", stream=True),
+    "prompts_simple_stream": Scenario("/prompts/generate/simple/stream", "prompts", {"fan_out": False}, stream=True),
+}
+
+# Where each response shape keeps its result: the full endpoints' "data" and
+# the n8n-format endpoints' payloads
+_RESULT_FIELDS = ("data", "updateData", "brandData", "competitorData", "generation_result")
+
+# Field made unique per scenario (and per request) so the response cache doesn't answer every call
+_UNIQUE_FIELDS = {
+    "product": "product_name",
+    "brand": "website_url",
+    "competitor": "brand_name",
+    "prompts": "brand_name",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(values: list[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_mb(pid: int) -> Optional[float]:
+    """High-water resident set size of a process, from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss(pid: int) -> None:
+    """Reset VmHWM so each scenario reports its own peak (Linux 4.0+, best effort)."""
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def build_payload(
+    name: str,
+    scenario: Scenario,
+    base_requests: dict,
+    stub_url: str,
+    index: int,
+    unique: bool
+) -> dict:
+    """
+    Build the request body for one call of a scenario.
+
+    The scenario name always goes into the unique field, so scenarios that
+    share a fixture never answer each other from the response cache and
+    results don't depend on scenario order. With unique, each call also
+    gets its own inputs.
+    """
+    def one(item_index: int) -> dict:
+        payload = copy.deepcopy(base_requests[scenario.fixture])
+        payload.update(scenario.overrides)
+        if scenario.fixture == "brand":
+            payload["website_url"] = payload["website_url"].replace("{stub}", stub_url)
+        field = _UNIQUE_FIELDS[scenario.fixture]
+        separator = "&n=" if field == "website_url" else " "
+        suffix = f"{name}-{index}-{item_index}" if unique else name
+        payload[field] = f"{payload[field]}{separator}{suffix}"
+        if scenario.job:
+            payload["async_mode"] = True
+            payload["callback_url"] = f"{stub_url}/callback"
+        return payload
+
+    if scenario.batch:
+        return {"items": [one(i) for i in range(scenario.batch)]}
+    return one(0)
+
+
+def _has_result(body: Any) -> bool:
+    """
+    Whether a response body carries a real result. success:false, an empty
+    result or a crew parse error count as failures even with a 200 status.
+    """
+    if not isinstance(body, dict) or body.get("success") is False:
+        return False
+    for field in _RESULT_FIELDS:
+        if field not in body:
+            continue
+        data = body[field]
+        if not data:
+            return False
+        if str(data.get("description") or "").startswith("Error parsing result"):
+            return False
+        # Competitor and prompt runs that crash come back with empty lists
+        return all(data[key] for key in ("competitors", "topics") if key in data)
+    return True
+
+
+async def _call(client: httpx.AsyncClient, scenario: Scenario, payload: dict) -> bool:
+    """Make one call, consuming streams and polling jobs to completion. Returns success."""
+    if scenario.stream:
+        events = []
+        async with client.stream("POST", scenario.path, json=payload) as response:
+            async for line in response.aiter_lines():
+                if line.strip():
+                    events.append(json.loads(line))
+        if response.status_code >= 400 or not events:
+            return False
+        if scenario.batch:
+            items = [event for event in events if event.get("type") == "item"]
+            return len(items) == scenario.batch and all(_has_result(item) for item in items)
+        last = events[-1]
+        return last.get("event") == "result" and _has_result(last.get("data"))
+
+    response = await client.post(scenario.path, json=payload)
+    if response.status_code >= 400:
+        return False
+    body = response.json()
+
+    if scenario.job:
+        job_id = body["job_id"]
+        while True:
+            await asyncio.sleep(0.05)
+            status = (await client.get(f"/jobs/{job_id}")).json()
+            if status["status"] in ("succeeded", "failed"):
+                return status["status"] == "succeeded" and _has_result(status.get("result"))
+
+    return _has_result(body)
+
+
+async def run_scenario(
+    name: str,
+    scenario: Scenario,
+    api_url: str,
+    stubs: StubProviders,
+    server_pid: int,
+    base_requests: dict,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    unique: bool
+) -> dict:
+    """Run one scenario and summarize it."""
+    timeout = httpx.Timeout(600.0, connect=10.0)
+    limits = httpx.Limits(max_connections=concurrency + 5)
+    async with httpx.AsyncClient(base_url=api_url, timeout=timeout, limits=limits) as client:
+        for i in range(warmup):
+            await _call(client, scenario, build_payload(name, scenario, base_requests, stubs.url, -1 - i, unique))
+
+        _reset_peak_rss(server_pid)
+        calls_before = stubs.stats()["calls"]
+        latencies: list[float] = []
+        errors = 0
+        counter = iter(range(requests))
+
+        async def worker() -> None:
+            nonlocal errors
+            # Workers share one counter, so exactly `requests` calls are made
+            for index in counter:
+                payload = build_payload(name, scenario, base_requests, stubs.url, index, unique)
+                start = time.perf_counter()
+                try:
+                    ok = await _call(client, scenario, payload)
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    calls_after = stubs.stats()["calls"]
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 3) if elapsed else None,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "peak_rss_mb": _peak_rss_mb(server_pid),
+        "outbound_calls": {p: calls_after[p] - calls_before[p] for p in PROVIDERS},
+    }
+
+
+def start_server(stub_url: str, port: int, workdir: str, caches: bool, extra_env: dict) -> subprocess.Popen:
+    """Start the API under uvicorn with every provider pointed at the stubs."""
+    env = {
+        **os.environ,
+        "SERPAPI_URL": f"{stub_url}/search.json",
+        "SERPAPI_API_KEY": "bench",
+        "FIRECRAWL_URL": stub_url,
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "OPENAI_API_BASE": f"{stub_url}/v1",
+        "OPENAI_API_KEY": "bench",
+        # Local plain HTTP; providers' real rate limits don't apply to the stubs
+        "HTTP2_ENABLED": "false",
+        "SERPAPI_RATE_PER_SECOND": "10000",
+        "SERPAPI_BURST": "10000",
+        "FIRECRAWL_RATE_PER_SECOND": "10000",
+        "FIRECRAWL_BURST": "10000",
+        "OPENAI_RATE_PER_SECOND": "10000",
+        "OPENAI_BURST": "10000",
+        # Fresh cache and yield stores per run so results are reproducible
+        "SEARCH_CACHE_PATH": os.path.join(workdir, "search_cache.sqlite3"),
+        "RESPONSE_CACHE_PATH": os.path.join(workdir, "response_cache.sqlite3"),
+        "QUERY_YIELD_PATH": os.path.join(workdir, "query_yield.sqlite3"),
+        "TRACING_FILE_PATH": os.path.join(workdir, "traces.jsonl"),
+        "CREWAI_DISABLE_TELEMETRY": "true",
+    }
+    if not caches:
+        env["SEARCH_CACHE_ENABLED"] = "false"
+        env["RESPONSE_CACHE_ENABLED"] = "false"
+    env.update(extra_env)
+
+    log = open(os.path.join(workdir, "server.log"), "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=AGENTS_DIR,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT
+    )
+
+
+def wait_for_health(api_url: str, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{api_url}/health", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server not healthy after {timeout:.0f}s")
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    return f"{value:.3f}" if value is not None else "-"
+
+
+def print_report(results: list[dict]) -> None:
+    header = f"{'scenario':<20} {'req':>5} {'conc':>4} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'rss MB':>8}  outbound calls"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        calls = " ".join(f"{p}={n}" for p, n in r["outbound_calls"].items() if n)
+        rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "-"
+        print(
+            f"{r['scenario']:<20} {r['requests']:>5} {r['concurrency']:>4} {r['errors']:>4} "
+            f"{r['throughput_rps']:>8.2f} {_format_seconds(r['p50']):>8} {_format_seconds(r['p95']):>8} "
+            f"{_format_seconds(r['p99']):>8} {rss:>8}  {calls or '-'}"
+        )
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the research API against stub providers")
+    parser.add_argument("--scenarios", default="all",
+                        help=f"Comma-separated scenarios, or 'all' ({', '.join(SCENARIOS)})")
+    parser.add_argument("--requests", type=int, default=20, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=5, help="Concurrent clients per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed requests per scenario before measuring")
+    for provider in PROVIDERS:
+        parser.add_argument(f"--{provider}-latency", type=float, default=None,
+                            help=f"Median {provider} latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter as a fraction of the median")
+    parser.add_argument("--firecrawl-error-rate", type=float, default=0.0,
+                        help="Fraction of scrapes that fail, exercising the direct HTTP fallback")
+    parser.add_argument("--repeat-inputs", action="store_true",
+                        help="Send identical payloads so the response cache can answer repeats")
+    parser.add_argument("--no-caches", action="store_true", help="Disable the search and response caches")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra environment for the API server (repeatable)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[list[str]] = None) -> list[dict]:
+    args = parse_args(argv)
+    names = list(SCENARIOS) if args.scenarios == "all" else [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}")
+
+    latency = {
+        provider: getattr(args, f"{provider}_latency")
+        for provider in PROVIDERS if getattr(args, f"{provider}_latency") is not None
+    }
+    extra_env = dict(entry.split("=", 1) for entry in args.env)
+
+    with open(FIXTURES_DIR / "requests.json", encoding="utf-8") as f:
+        base_requests = json.load(f)
+
+    stubs = StubProviders(latency, jitter=args.jitter, firecrawl_error_rate=args.firecrawl_error_rate, seed=args.seed)
+    stub_url = stubs.start()
+    port = _free_port()
+    api_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory(prefix="cramler-bench-") as workdir:
+        server = start_server(stub_url, port, workdir, caches=not args.no_caches, extra_env=extra_env)
+        try:
+            wait_for_health(api_url, server)
+            print(f"[Bench] API on {api_url}, stubs on {stub_url}, latency {stubs.latency}")
+
+            results = []
+            for name in names:
+                print(f"[Bench] Running {name}...")
+                results.append(await run_scenario(
+                    name, SCENARIOS[name], api_url, stubs, server.pid, base_requests,
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                    warmup=args.warmup,
+                    unique=not args.repeat_inputs
+                ))
+        except Exception:
+            print("[Bench] Server log tail:")
+            with open(os.path.join(workdir, "server.log")) as f:
+                print(f.read()[-4000:])
+            raise
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            stubs.close()
+
+    print()
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"latency": stubs.latency, "jitter": args.jitter, "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
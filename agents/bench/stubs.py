@@ -0,0 +1,296 @@
+"""
+Benchmark Stubs - Local stand-ins for SerpAPI, Firecrawl, OpenAI and customer websites
+
+Replays recorded responses from bench/fixtures with injected latency, so the
+API can be benchmarked without network access or API credits.
+"""
+import re
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+PROVIDERS = ("serpapi", "firecrawl", "website", "openai", "callback")
+
+# Median latency per provider in seconds, roughly what production sees
+DEFAULT_LATENCY = {
+    "serpapi": 0.8,
+    "firecrawl": 1.5,
+    "website": 0.3,
+    "openai": 1.2,
+    "callback": 0.05,
+}
+
+# Which recorded completion to replay, matched against the prompt in order
+_COMPLETION_PATTERNS = [
+    ("topics", re.compile(r"Choose (\d+) distinct research topics")),
+    ("topic_prompts", re.compile(r"Generate (\d+) BRAND-AGNOSTIC consumer prompts for this topic")),
+    ("full_prompts", re.compile(r"Generate (\d+) research topics and (\d+) BRAND-AGNOSTIC prompts per topic")),
+    ("product", re.compile(r"Research the product \"([^\"]+)\"")),
+    ("brand", re.compile(r"Analyze the brand from their website: (\S+)")),
+    ("competitors", re.compile(r"Find competitors for ([^\n]+?)\.\s*\n")),
+]
+
+_TOOL_NAME = re.compile(r"Tool Name: ([\w-]+)")
+_TOOL_ARGUMENT = re.compile(r"Tool Arguments: \{['\"](\w+)['\"]")
+
+
+def _load_fixture(name: str) -> dict:
+    with open(FIXTURES_DIR / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StubProviders:
+    """
+    One threaded HTTP server playing every outbound provider:
+
+    - GET  /search.json           SerpAPI
+    - POST /v1/scrape             Firecrawl (fails at firecrawl_error_rate)
+    - GET  /page                  A customer website, for the direct HTTP fallback
+    - POST /v1/chat/completions   OpenAI, including CrewAI's ReAct turns and streaming
+    - POST /callback              Async job callbacks
+    - GET  /__stats               Call counts per provider (no latency)
+    """
+
+    def __init__(
+        self,
+        latency: Optional[dict[str, float]] = None,
+        jitter: float = 0.2,
+        firecrawl_error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            latency: Median seconds per provider, merged over DEFAULT_LATENCY
+            jitter: Latency varies uniformly by +/- this fraction of the median
+            firecrawl_error_rate: Fraction of scrapes answered with a failure
+            seed: Seed for jitter and injected failures
+        """
+        self.latency = {**DEFAULT_LATENCY, **(latency or {})}
+        self.jitter = jitter
+        self.firecrawl_error_rate = firecrawl_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {provider: 0 for provider in PROVIDERS}
+        self._failures = 0
+
+        self.search_result = _load_fixture("serpapi_search.json")
+        self.scrape_result = _load_fixture("firecrawl_scrape.json")
+        self.completions = _load_fixture("llm_responses.json")
+        self.page = (FIXTURES_DIR / "page.html").read_bytes()
+
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving on a background thread and return the base URL."""
+        handler = type("BoundStubHandler", (_StubHandler,), {"stubs": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-stubs", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": dict(self._counts), "injected_failures": self._failures}
+
+    def record_call(self, provider: str) -> None:
+        with self._lock:
+            self._counts[provider] += 1
+
+    def delay(self, provider: str) -> None:
+        median = self.latency.get(provider, 0.0)
+        if median <= 0:
+            return
+        with self._lock:
+            factor = self._random.uniform(1 - self.jitter, 1 + self.jitter)
+        time.sleep(median * factor)
+
+    def should_fail_scrape(self) -> bool:
+        with self._lock:
+            failed = self._random.random() < self.firecrawl_error_rate
+            if failed:
+                self._failures += 1
+            return failed
+
+    def completion_for(self, messages: list[dict]) -> str:
+        """
+        Pick the recorded completion matching the prompt. CrewAI agents get a
+        ReAct reply: one tool call on their first turn, then the final answer.
+        """
+        text = "\n".join(str(message.get("content") or "") for message in messages)
+        data: object = {"result": "ok"}
+        subject = ""
+
+        for kind, pattern in _COMPLETION_PATTERNS:
+            match = pattern.search(text)
+            if not match:
+                continue
+            if kind == "topics":
+                data = {"topics": self.completions["topics"]["topics"][:int(match.group(1))]}
+            elif kind == "topic_prompts":
+                data = {"prompts": self.completions["topic_prompts"]["prompts"][:int(match.group(1))]}
+            elif kind == "full_prompts":
+                num_topics, prompts_per_topic = int(match.group(1)), int(match.group(2))
+                prompts = self.completions["topic_prompts"]["prompts"][:prompts_per_topic]
+                topics = [
+                    {**topic, "prompts": prompts}
+                    for topic in self.completions["topics"]["topics"][:num_topics]
+                ]
+                data = {"topics": topics, "total_prompts": len(topics) * len(prompts)}
+            elif kind == "competitors":
+                data = {"brand_name": match.group(1).strip(), **self.completions["competitors"]}
+            else:
+                data = self.completions[kind]
+            subject = match.group(1).strip()
+            break
+
+        content = json.dumps(data)
+
+        system = str(messages[0].get("content") or "") if messages else ""
+        if "Final Answer:" not in system:
+            return content
+
+        tool = _TOOL_NAME.search(system)
+        used_tool = any(message.get("role") == "assistant" for message in messages)
+        if tool and not used_tool:
+            argument = _TOOL_ARGUMENT.search(system)
+            name = argument.group(1) if argument else "query"
+            return (
+                "Thought: I should gather information first.\n"
+                f"Action: {tool.group(1)}\n"
+                f"Action Input: {json.dumps({name: subject})}"
+            )
+        return f"Thought: I now know the final answer\nFinal Answer: {content}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stubs: StubProviders
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/__stats":
+            self._send_json(self.stubs.stats())
+        elif path == "/search.json":
+            self._serve("serpapi", lambda: self._send_json(self.stubs.search_result))
+        elif path == "/page":
+            self._serve("website", lambda: self._send(200, self.stubs.page, "text/html; charset=utf-8"))
+        else:
+            self._send_json({"error": f"No stub for GET {path}"}, status=404)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if path == "/v1/scrape":
+            self._serve("firecrawl", self._scrape)
+        elif path in ("/v1/chat/completions", "/chat/completions"):
+            self._serve("openai", lambda: self._complete(body))
+        elif path == "/callback":
+            self._serve("callback", lambda: self._send_json({"ok": True}))
+        else:
+            self._send_json({"error": f"No stub for POST {path}"}, status=404)
+
+    def _serve(self, provider: str, respond) -> None:
+        self.stubs.record_call(provider)
+        self.stubs.delay(provider)
+        respond()
+
+    def _scrape(self) -> None:
+        if self.stubs.should_fail_scrape():
+            # Firecrawl reports blocked or failed scrapes in a 200 body
+            self._send_json({"success": False, "error": "Injected scrape failure"})
+        else:
+            self._send_json(self.stubs.scrape_result)
+
+    def _complete(self, body: dict) -> None:
+        messages = body.get("messages", [])
+        content = self.stubs.completion_for(messages)
+        model = body.get("model", "gpt-4o-mini")
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4,
+        }
+        completion_id = f"chatcmpl-bench{int(time.time() * 1000)}"
+
+        if body.get("stream"):
+            self._stream_completion(completion_id, model, content, usage)
+            return
+
+        self._send_json({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream_completion(self, completion_id: str, model: str, content: str, usage: dict) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta: dict, finish_reason: Optional[str] = None, **extra) -> None:
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+
+        chunk({"role": "assistant", "content": ""})
+        # Token-sized pieces are overkill for a stub; ~40 characters keeps event counts realistic
+        pieces = [content[i:i + 40] for i in range(0, len(content), 40)]
+        for piece in pieces:
+            chunk({"content": piece})
+            time.sleep(0.002)
+        chunk({}, "stop", usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _send_json(self, data: dict, status: int = 200) -> None:
+        self._send(status, json.dumps(data).encode(), "application/json")
+
+    def _send(self, status: int, payload: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
@@ -5,11 +5,25 @@ import os
 import re
 import json
 import httpx
-from typing import Optional
-from crewai import Agent, Task, Crew, Process
-from crewai.tools import tool
+from typing import TYPE_CHECKING, Optional
 from pydantic import BaseModel
 
+from http_client import get_http_client, timeout_for
+from html_extract import PageExtractor, extract_page
+from serpapi import serpapi_search
+from singleflight import SingleFlight
+from rate_limit import call_with_retry
+from progress import emit, crew_step_callback
+from llm_clients import configure_crewai_llm_pool
+from metrics import track_provider, track_crew
+from tracing import span, traced
+from crew_templates import CrewTemplate
+from llm_json import extract_json_object
+from deadline import tool_cutoff, was_cut_off, partial_fields, salvage
+
+if TYPE_CHECKING:  # CrewAI is imported lazily, see crew_templates
+    from crewai import Crew
+
 
 class BrandInfo(BaseModel):
     """Structured brand information"""
@@ -23,49 +37,44 @@ class BrandInfo(BaseModel):
     unique_selling_points: Optional[list[str]] = None
     tone_of_voice: Optional[str] = None
     suggested_topics: Optional[list[str]] = None
+    partial: bool = False  # See deadline.salvage
+
+
+def _read_page(url: str) -> PageExtractor:
+    """
+    Stream a page through the extractor, stopping at FALLBACK_MAX_BYTES or
+    once enough text has been collected, whichever comes first.
+    """
+    max_bytes = int(os.getenv("FALLBACK_MAX_BYTES", 2 * 1024 * 1024))
+    client = get_http_client()
+    with track_provider("fallback_http"), client.stream(
+        "GET",
+        url,
+        headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
+        follow_redirects=True,
+        timeout=timeout_for(url)
+    ) as response:
+        response.raise_for_status()
+
+        def chunks():
+            for chunk in response.iter_text():
+                yield chunk
+                if response.num_bytes_downloaded >= max_bytes:
+                    return
+
+        return extract_page(chunks())
 
 
 def _fallback_http_fetch(url: str) -> str:
     """Fallback method using direct HTTP request when Firecrawl fails."""
     try:
-        with httpx.Client(timeout=30.0, follow_redirects=True) as client:
-            response = client.get(url, headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            })
-            response.raise_for_status()
-            html = response.text
-
-        # Extract title
-        title_match = re.search(r'<title[^>]*>([^<]+)</title>', html, re.IGNORECASE)
-        title = title_match.group(1).strip() if title_match else ""
-
-        # Extract meta description
-        desc_match = re.search(r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', html, re.IGNORECASE)
-        if not desc_match:
-            desc_match = re.search(r'<meta[^>]*content=["\']([^"\']+)["\'][^>]*name=["\']description["\']', html, re.IGNORECASE)
-        description = desc_match.group(1).strip() if desc_match else ""
-
-        # Extract OG tags
-        og_title_match = re.search(r'<meta[^>]*property=["\']og:title["\'][^>]*content=["\']([^"\']+)["\']', html, re.IGNORECASE)
-        og_title = og_title_match.group(1).strip() if og_title_match else ""
+        page = _read_page(url)
 
-        og_desc_match = re.search(r'<meta[^>]*property=["\']og:description["\'][^>]*content=["\']([^"\']+)["\']', html, re.IGNORECASE)
-        og_description = og_desc_match.group(1).strip() if og_desc_match else ""
-
-        # Remove script and style tags
-        html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<nav[^>]*>.*?</nav>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<footer[^>]*>.*?</footer>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<header[^>]*>.*?</header>', '', html, flags=re.DOTALL | re.IGNORECASE)
-
-        # Remove HTML tags and get text
-        text = re.sub(r'<[^>]+>', ' ', html)
-        text = re.sub(r'\s+', ' ', text).strip()
-
-        # Truncate if too long
-        if len(text) > 15000:
-            text = text[:15000] + "..."
+        title = page.title
+        description = page.meta.get("description", "")
+        og_title = page.meta.get("og:title", "")
+        og_description = page.meta.get("og:description", "")
+        text = page.text
 
         # Build result
         content_parts = []
@@ -86,40 +95,44 @@ def _fallback_http_fetch(url: str) -> str:
         return f"Fallback HTTP error: {str(e)}"
 
 
-@tool
-def fetch_website_content(url: str) -> str:
+# Concurrent scrapes of the same site share one Firecrawl/fallback fetch
+scrape_flight = SingleFlight("scrape")
+
+
+def scrape_website(url: str) -> str:
     """
-    Fetch and extract text content from a website URL using Firecrawl.
-    Falls back to direct HTTP request if Firecrawl fails.
+    Scrape a website with Firecrawl, falling back to a direct HTTP request.
 
     Args:
-        url: The website URL to fetch content from
+        url: Absolute website URL
 
     Returns:
-        Clean markdown content from the website optimized for LLM analysis
+        Markdown content with page metadata
     """
-    # Ensure URL has protocol
-    if not url.startswith(('http://', 'https://')):
-        url = f'https://{url}'
-
     firecrawl_error = None
 
     # Try Firecrawl first
     try:
         firecrawl_url = os.getenv("FIRECRAWL_URL", "http://localhost:3002")
 
-        with httpx.Client(timeout=60.0) as client:
+        scrape_url = f"{firecrawl_url}/v1/scrape"
+
+        def scrape() -> dict:
+            client = get_http_client()
             response = client.post(
-                f"{firecrawl_url}/v1/scrape",
+                scrape_url,
                 json={
                     "url": url,
                     "formats": ["markdown"],
                     "onlyMainContent": True
                 },
-                headers={"Content-Type": "application/json"}
+                headers={"Content-Type": "application/json"},
+                timeout=timeout_for(scrape_url)
             )
             response.raise_for_status()
-            data = response.json()
+            return response.json()
+
+        data = call_with_retry("firecrawl", scrape)
 
         if data.get("success") and data.get("data"):
             result = data["data"]
@@ -155,7 +168,33 @@ def fetch_website_content(url: str) -> str:
     return _fallback_http_fetch(url)
 
 
-@tool
+@traced("tool.fetch_website_content")
+def fetch_website_content(url: str) -> str:
+    """
+    Fetch and extract text content from a website URL using Firecrawl.
+    Falls back to direct HTTP request if Firecrawl fails.
+
+    Args:
+        url: The website URL to fetch content from
+
+    Returns:
+        Clean markdown content from the website optimized for LLM analysis
+    """
+    cutoff = tool_cutoff()
+    if cutoff:
+        return cutoff
+
+    # Ensure URL has protocol
+    if not url.startswith(('http://', 'https://')):
+        url = f'https://{url}'
+
+    emit("tool_started", tool="fetch_website_content", url=url)
+    content = scrape_flight.do(url.rstrip("/"), lambda: scrape_website(url))
+    emit("page_fetched", tool="fetch_website_content", url=url, characters=len(content))
+    return content
+
+
+@traced("tool.search_brand_info")
 def search_brand_info(query: str) -> str:
     """
     Search Google for additional brand information.
@@ -170,18 +209,25 @@ def search_brand_info(query: str) -> str:
     if not api_key:
         return "Error: SERPAPI_API_KEY not configured"
 
+    cutoff = tool_cutoff()
+    if cutoff:
+        return cutoff
+
+    emit("tool_started", tool="search_brand_info", query=query)
     try:
-        url = "https://serpapi.com/search.json"
         params = {
             "q": query,
             "api_key": api_key,
             "engine": "google"
         }
 
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        data = serpapi_search(params)
+        emit(
+            "search_results",
+            tool="search_brand_info",
+            query=query,
+            result_count=len(data.get("organic_results", []))
+        )
 
         extracted = []
 
@@ -205,27 +251,40 @@ def search_brand_info(query: str) -> str:
         return "\n".join(extracted) if extracted else "No relevant results found"
 
     except Exception as e:
+        emit("tool_error", tool="search_brand_info", query=query, error=str(e))
         return f"Search error: {str(e)}"
 
 
-def create_brand_research_crew(website_url: str, brand_name: Optional[str] = None) -> Crew:
-    """
-    Create a CrewAI crew for brand research from website.
+# Bound to {output_format} at kickoff (see CrewTemplate)
+BRAND_OUTPUT_FORMAT = """{
+            "name": "brand name",
+            "description": "Single concise paragraph, 2-4 sentences, no newlines",
+            "tagline": "brand tagline or null",
+            "industry": "specific industry/sector",
+            "target_audience": "one sentence describing target customers",
+            "key_products": ["product1", "product2"] or null,
+            "brand_values": ["value1", "value2"] or null,
+            "unique_selling_points": ["usp1", "usp2"] or null,
+            "tone_of_voice": "description of brand voice",
+            "suggested_topics": ["topic1", "topic2", "topic3"]
+        }"""
 
-    Args:
-        website_url: URL of the brand's website
-        brand_name: Optional brand name if already known
+
+def create_brand_research_crew() -> "Crew":
+    """
+    Create the CrewAI crew for brand research from a website, with
+    {website_url} and {brand_context} placeholders bound at kickoff.
 
     Returns:
         Configured Crew instance
     """
-
-    brand_context = f"for brand '{brand_name}'" if brand_name else ""
+    from crewai import Agent, Task, Crew, Process
+    from crewai.tools import tool
 
     # Define the Brand Research Agent
     researcher = Agent(
         role="Brand Analyst",
-        goal=f"Analyze and understand the brand {brand_context} from their website {website_url}",
+        goal="Analyze and understand the brand {brand_context} from their website {website_url}",
         backstory="""You are an expert brand strategist and analyst with years of experience
         understanding brands, their positioning, and their value propositions.
         You excel at extracting brand essence from website content and marketing materials.
@@ -233,12 +292,12 @@ def create_brand_research_crew(website_url: str, brand_name: Optional[str] = Non
         You NEVER make up information - you only report what you can verify from the sources.""",
         verbose=True,
         allow_delegation=False,
-        tools=[fetch_website_content, search_brand_info]
+        tools=[tool(fetch_website_content), tool(search_brand_info)]
     )
 
     # Define the research task
     research_task = Task(
-        description=f"""
+        description="""
         Analyze the brand from their website: {website_url}
 
         Your task is to understand this brand thoroughly and extract key information.
@@ -271,18 +330,7 @@ def create_brand_research_crew(website_url: str, brand_name: Optional[str] = Non
         - The suggested_topics should be specific enough to be useful for tracking AI mentions
         """,
         expected_output="""A JSON object with the brand information in this exact format:
-        {
-            "name": "brand name",
-            "description": "Single concise paragraph, 2-4 sentences, no newlines",
-            "tagline": "brand tagline or null",
-            "industry": "specific industry/sector",
-            "target_audience": "one sentence describing target customers",
-            "key_products": ["product1", "product2"] or null,
-            "brand_values": ["value1", "value2"] or null,
-            "unique_selling_points": ["usp1", "usp2"] or null,
-            "tone_of_voice": "description of brand voice",
-            "suggested_topics": ["topic1", "topic2", "topic3"]
-        }
+        {output_format}
 
         CRITICAL: The description field must be a single paragraph with NO \\n or newline characters.
         Return ONLY the JSON object, no other text.""",
@@ -294,12 +342,17 @@ def create_brand_research_crew(website_url: str, brand_name: Optional[str] = Non
         agents=[researcher],
         tasks=[research_task],
         process=Process.sequential,
-        verbose=True
+        verbose=True,
+        cache=False,  # See CrewTemplate
+        step_callback=crew_step_callback
     )
 
     return crew
 
 
+brand_crew_template = CrewTemplate("brand", create_brand_research_crew)
+
+
 def research_brand(website_url: str, brand_name: Optional[str] = None) -> BrandInfo:
     """
     Research a brand from their website using the CrewAI crew.
@@ -311,22 +364,17 @@ def research_brand(website_url: str, brand_name: Optional[str] = None) -> BrandI
     Returns:
         BrandInfo with extracted data
     """
-    crew = create_brand_research_crew(website_url, brand_name)
-    result = crew.kickoff()
+    configure_crewai_llm_pool()
+    with track_crew("brand"), span("crew.kickoff", crew="brand", website_url=website_url):
+        result = brand_crew_template.kickoff({
+            "website_url": website_url,
+            "brand_context": f"for brand '{brand_name}'" if brand_name else "",
+            "output_format": BRAND_OUTPUT_FORMAT
+        })
 
     # Parse the result
     try:
-        # Get the raw output
-        output = str(result)
-
-        # Try to extract JSON from the output
-        if "```json" in output:
-            output = output.split("```json")[1].split("```")[0]
-        elif "```" in output:
-            output = output.split("```")[1].split("```")[0]
-
-        # Parse the JSON
-        data = json.loads(output.strip())
+        data, truncated = extract_json_object(str(result))
         # Filter out None values so Pydantic uses defaults
         filtered_data = {k: v for k, v in data.items() if v is not None}
 
@@ -339,8 +387,13 @@ def research_brand(website_url: str, brand_name: Optional[str] = None) -> BrandI
             desc = re.sub(r'\s+', ' ', desc).strip()
             filtered_data['description'] = desc
 
-        return BrandInfo(**filtered_data)
+        brand_info = BrandInfo(**filtered_data)
+        brand_info.partial = was_cut_off() or truncated
+        return brand_info
     except (json.JSONDecodeError, Exception) as e:
+        if was_cut_off():
+            # Keep whatever the agent produced before the deadline
+            return salvage(BrandInfo, partial_fields(), name=brand_name or "Unknown")
         # Return basic info if parsing fails
         return BrandInfo(
             name=brand_name or "Unknown",
@@ -0,0 +1,241 @@
+"""
+Tiered Cache - In-memory LRU in front of a SQLite store, with TTL and size-bounded eviction
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from metrics import CACHE_LOOKUPS
+
+
+class TieredCache:
+    """
+    Two-tier key/value cache for JSON-serializable values.
+
+    Lookups hit the in-memory LRU first, then the SQLite tier; disk hits are
+    promoted back into memory. Entries older than the TTL are treated as
+    misses. Both tiers are size bounded, evicting least recently used
+    entries first. Safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: Optional[str] = None,
+        ttl_seconds: float = 86400.0,
+        max_memory_items: int = 1000,
+        max_disk_items: int = 50000
+    ):
+        self.name = name
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_items = max(1, max_memory_items)
+        self.max_disk_items = max(1, max_disk_items)
+
+        self._memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_trim = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        if path:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed_at)")
+            except sqlite3.Error as e:
+                print(f"[Cache:{name}] Disk tier disabled ({e})")
+                self._db = None
+
+    def get_entry(self, key: str, max_age: Optional[float] = None) -> Optional[tuple[float, Any]]:
+        """
+        Look up a key and return it with its creation time.
+
+        Args:
+            key: Cache key
+            max_age: Maximum age in seconds (defaults to the cache TTL)
+
+        Returns:
+            (created_at, value) tuple, or None on a miss
+        """
+        max_age = self.ttl_seconds if max_age is None else max_age
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= max_age:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    CACHE_LOOKUPS.labels(self.name, "memory_hit").inc()
+                    return entry
+                if now - entry[0] > self.ttl_seconds:
+                    del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and now - row[1] <= max_age:
+                        self._db.execute(
+                            "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        entry = (row[1], json.loads(row[0]))
+                        self._remember(key, entry)
+                        self.disk_hits += 1
+                        CACHE_LOOKUPS.labels(self.name, "disk_hit").inc()
+                        return entry
+                except (sqlite3.Error, ValueError) as e:
+                    print(f"[Cache:{self.name}] Disk read failed: {e}")
+
+            self.misses += 1
+            CACHE_LOOKUPS.labels(self.name, "miss").inc()
+            return None
+
+    def contains(self, key: str) -> bool:
+        """Whether a live entry exists, without counting a hit or promoting it."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] <= self.ttl_seconds:
+                return True
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT created_at FROM cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    return row is not None and now - row[0] <= self.ttl_seconds
+                except sqlite3.Error:
+                    pass
+            return False
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss."""
+        entry = self.get_entry(key, max_age)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, (now, value))
+            self.writes += 1
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value), now, now)
+                    )
+                    self._writes_since_trim += 1
+                    if self._writes_since_trim >= 100:
+                        self._trim_disk(now)
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    print(f"[Cache:{self.name}] Disk write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        """Remove a key from both tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                except sqlite3.Error as e:
+                    print(f"[Cache:{self.name}] Disk delete failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_items = None
+            if self._db is not None:
+                try:
+                    disk_items = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "memory_items": len(self._memory),
+                "disk_items": disk_items,
+            }
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, entry: tuple[float, Any]) -> None:
+        """Insert into the memory tier, evicting the least recently used entry. Caller holds the lock."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _trim_disk(self, now: float) -> None:
+        """Purge expired rows and enforce the disk size bound. Caller holds the lock."""
+        self._writes_since_trim = 0
+        expired = self._db.execute(
+            "DELETE FROM cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self._db.execute(
+            "DELETE FROM cache WHERE key IN ("
+            "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_items,)
+        ).rowcount
+        self.evictions += max(0, expired) + max(0, overflow)
+
+
+def cache_from_env(name: str, prefix: str, default_ttl: float, default_path: Optional[str]) -> TieredCache:
+    """
+    Build a TieredCache configured from <PREFIX>_* environment variables.
+
+    Args:
+        name: Cache name used in log messages
+        prefix: Environment variable prefix (e.g. SEARCH_CACHE)
+        default_ttl: TTL in seconds when <PREFIX>_TTL_SECONDS is unset
+        default_path: SQLite path when <PREFIX>_PATH is unset
+
+    Returns:
+        Configured cache. Setting <PREFIX>_PATH to an empty string keeps it memory-only.
+    """
+    return TieredCache(
+        name=name,
+        path=os.getenv(f"{prefix}_PATH", default_path) or None,
+        ttl_seconds=float(os.getenv(f"{prefix}_TTL_SECONDS", default_ttl)),
+        max_memory_items=int(os.getenv(f"{prefix}_MEMORY_ITEMS", 1000)),
+        max_disk_items=int(os.getenv(f"{prefix}_DISK_ITEMS", 50000))
+    )
@@ -4,12 +4,25 @@ Competitor Research - Fast competitor discovery using smart search strategies
 import os
 import re
 import json
-import httpx
 import asyncio
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Optional
 from pydantic import BaseModel
 
+from http_client import close_async_http_client
+from serpapi import serpapi_search, serpapi_search_async, is_search_cached
+from progress import emit, crew_step_callback
+from competitor_kb import get_competitor_kb
+from query_planner import QueryCandidate, plan_queries, get_yield_stats
+from metrics import track_crew
+from tracing import span, traced
+from crew_templates import CrewTemplate
+from llm_json import extract_json_object
+from deadline import tool_cutoff, time_left, mark_cut_off, was_cut_off, record_partial
+from llm_clients import configure_crewai_llm_pool
+
+if TYPE_CHECKING:  # CrewAI is imported lazily, see crew_templates
+    from crewai import Crew
+
 
 class CompetitorInfo(BaseModel):
     """Information about a single competitor"""
@@ -28,6 +41,7 @@ class CompetitorAnalysis(BaseModel):
     competitors: list[CompetitorInfo] = []
     market_position: Optional[str] = None
     competitive_landscape: Optional[str] = None
+    partial: bool = False  # See deadline.salvage
 
 
 def extract_keywords_from_description(description: str) -> list[str]:
@@ -65,6 +79,28 @@ def extract_keywords_from_description(description: str) -> list[str]:
     return list(set(keywords))
 
 
+def plan_competitor_queries(
+    brand_name: str,
+    brand_description: str,
+    industry: str,
+    topics: list[str],
+    max_queries: int = 8
+) -> list[QueryCandidate]:
+    """
+    Plan the competitor searches for a brand: cached queries first, then by
+    historical yield, with near-duplicates pruned.
+    """
+    keywords = extract_keywords_from_description(brand_description)
+    return plan_queries(
+        brand_name,
+        keywords,
+        industry,
+        topics,
+        is_cached=lambda query: is_search_cached(_serpapi_params(query, "")),
+        max_queries=max_queries
+    )
+
+
 def generate_smart_queries(
     brand_name: str,
     brand_description: str,
@@ -73,43 +109,47 @@ def generate_smart_queries(
 ) -> list[str]:
     """
     Generate smart search queries based on the brand context.
-    Returns a list of targeted queries that will find relevant competitors.
+    Returns a list of targeted queries that will find relevant competitors,
+    highest expected yield first.
     """
-    queries = []
-
-    # Extract keywords from description
-    keywords = extract_keywords_from_description(brand_description)
+    return [c.query for c in plan_competitor_queries(brand_name, brand_description, industry, topics)]
 
-    # Add keyword-based queries (most specific, likely to find direct competitors)
-    for keyword in keywords[:3]:  # Limit to top 3 keywords
-        queries.append(f"best {keyword} apps 2024")
-        queries.append(f"{keyword} alternatives")
 
-    # Add topic-based queries
-    for topic in topics[:3]:  # Limit to top 3 topics
-        queries.append(f"top {topic} companies")
-        queries.append(f"best {topic} platforms 2024")
+def _serpapi_params(query: str, api_key: str) -> dict:
+    return {
+        "q": query,
+        "api_key": api_key,
+        "engine": "google",
+        "num": 10
+    }
 
-    # Add industry-specific queries
-    queries.append(f"{industry} market leaders 2024")
-    queries.append(f"top {industry} startups")
 
-    # Add "alternatives to" queries if brand is somewhat known
-    # This often surfaces competitor lists
-    if len(brand_name) > 3:
-        queries.append(f"{brand_name} alternatives")
-        queries.append(f"apps like {brand_name}")
+def _extract_search_results(data: dict) -> list[dict]:
+    """Flatten a SerpAPI response into title/link/snippet/source records."""
+    results = []
 
-    # Deduplicate while preserving order
-    seen = set()
-    unique_queries = []
-    for q in queries:
-        q_lower = q.lower()
-        if q_lower not in seen:
-            seen.add(q_lower)
-            unique_queries.append(q)
+    # Extract from organic results
+    if "organic_results" in data:
+        for result in data["organic_results"][:10]:
+            results.append({
+                "title": result.get("title", ""),
+                "link": result.get("link", ""),
+                "snippet": result.get("snippet", ""),
+                "source": result.get("source", "")
+            })
+
+    # Extract from knowledge graph if available
+    if "knowledge_graph" in data:
+        kg = data["knowledge_graph"]
+        if kg.get("title"):
+            results.insert(0, {
+                "title": kg.get("title", ""),
+                "link": kg.get("website", ""),
+                "snippet": kg.get("description", ""),
+                "source": "knowledge_graph"
+            })
 
-    return unique_queries[:8]  # Limit to 8 queries max
+    return results
 
 
 def search_serpapi(query: str) -> dict:
@@ -121,168 +161,285 @@ def search_serpapi(query: str) -> dict:
         return {"query": query, "error": "SERPAPI_API_KEY not configured", "results": []}
 
     try:
-        url = "https://serpapi.com/search.json"
-        params = {
-            "q": query,
-            "api_key": api_key,
-            "engine": "google",
-            "num": 10
-        }
+        with span("search.serpapi", query=query):
+            data = serpapi_search(_serpapi_params(query, api_key))
+        return {"query": query, "results": _extract_search_results(data), "error": None}
+
+    except Exception as e:
+        return {"query": query, "error": str(e), "results": []}
 
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-        results = []
-
-        # Extract from organic results
-        if "organic_results" in data:
-            for result in data["organic_results"][:10]:
-                results.append({
-                    "title": result.get("title", ""),
-                    "link": result.get("link", ""),
-                    "snippet": result.get("snippet", ""),
-                    "source": result.get("source", "")
-                })
-
-        # Extract from knowledge graph if available
-        if "knowledge_graph" in data:
-            kg = data["knowledge_graph"]
-            if kg.get("title"):
-                results.insert(0, {
-                    "title": kg.get("title", ""),
-                    "link": kg.get("website", ""),
-                    "snippet": kg.get("description", ""),
-                    "source": "knowledge_graph"
-                })
 
+async def search_serpapi_async(query: str) -> dict:
+    """
+    Async variant of search_serpapi using the pooled async HTTP client.
+    """
+    api_key = os.getenv("SERPAPI_API_KEY")
+    if not api_key:
+        return {"query": query, "error": "SERPAPI_API_KEY not configured", "results": []}
+
+    try:
+        with span("search.serpapi", query=query):
+            data = await serpapi_search_async(_serpapi_params(query, api_key))
+        results = _extract_search_results(data)
+        emit("search_results", tool="search_serpapi", query=query, result_count=len(results))
         return {"query": query, "results": results, "error": None}
 
     except Exception as e:
+        emit("tool_error", tool="search_serpapi", query=query, error=str(e))
         return {"query": query, "error": str(e), "results": []}
 
 
-def parallel_search(queries: list[str], max_workers: int = 4) -> list[dict]:
+async def parallel_search_async(
+    queries: list[str],
+    deadline_seconds: Optional[float] = None
+) -> list[dict]:
     """
-    Execute multiple searches in parallel for speed.
+    Execute all searches concurrently in a single wave.
+
+    Concurrency against SerpAPI is bounded globally (SERPAPI_MAX_CONCURRENCY),
+    so bursts from many requests share the same limit. Searches still
+    outstanding when the deadline passes are cancelled and reported as errors.
+
+    Args:
+        queries: Search queries to run
+        deadline_seconds: Time budget for the whole wave (defaults to
+            COMPETITOR_SEARCH_DEADLINE_SECONDS, capped by the request deadline)
+
+    Returns:
+        One result dict per query, in query order
     """
-    results = []
+    if deadline_seconds is None:
+        deadline_seconds = time_left(float(os.getenv("COMPETITOR_SEARCH_DEADLINE_SECONDS", 45.0)))
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_query = {executor.submit(search_serpapi, q): q for q in queries}
+    tasks = [asyncio.create_task(search_serpapi_async(q)) for q in queries]
+    if not tasks:
+        return []
 
-        for future in as_completed(future_to_query):
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                query = future_to_query[future]
-                results.append({"query": query, "error": str(e), "results": []})
+    done, pending = await asyncio.wait(tasks, timeout=deadline_seconds)
+    for task in pending:
+        task.cancel()
+    if pending:
+        mark_cut_off()
+
+    results = []
+    for query, task in zip(queries, tasks):
+        if task in pending:
+            results.append({"query": query, "error": "Search deadline exceeded", "results": []})
+        elif task.exception() is not None:
+            results.append({"query": query, "error": str(task.exception()), "results": []})
+        else:
+            results.append(task.result())
 
     return results
 
 
+def parallel_search(queries: list[str], deadline_seconds: Optional[float] = None) -> list[dict]:
+    """
+    Execute multiple searches in parallel for speed.
+    Synchronous wrapper around parallel_search_async for callers without an event loop.
+    """
+    async def run() -> list[dict]:
+        try:
+            return await parallel_search_async(queries, deadline_seconds)
+        finally:
+            await close_async_http_client()
+
+    return asyncio.run(run())
+
+
+async def search_in_waves(
+    plan: list[QueryCandidate],
+    brand_name: str,
+    topics: list[str],
+    known: Optional[list[dict]] = None,
+    deadline_seconds: Optional[float] = None
+) -> list[dict]:
+    """
+    Run planned searches in waves, stopping once a wave stops finding new companies.
+
+    Cached queries all run in the first wave since they cost nothing. Each
+    wave adds up to COMPETITOR_QUERY_WAVE_SIZE uncached queries; after a
+    wave that surfaces fewer than COMPETITOR_MIN_NEW_COMPANIES new companies
+    the remaining queries are skipped. Per-query yields feed the planner's
+    history.
+
+    Args:
+        plan: Queries from plan_competitor_queries, in order
+        brand_name: The brand being researched
+        topics: Topics used to judge relevance
+        known: Competitors already known, which don't count as new
+        deadline_seconds: Time budget for all waves (defaults to
+            COMPETITOR_SEARCH_DEADLINE_SECONDS, capped by the request deadline)
+
+    Returns:
+        Result dicts for the queries that ran, in run order
+    """
+    if deadline_seconds is None:
+        deadline_seconds = time_left(float(os.getenv("COMPETITOR_SEARCH_DEADLINE_SECONDS", 45.0)))
+    wave_size = max(1, int(os.getenv("COMPETITOR_QUERY_WAVE_SIZE", 3)))
+    min_new = int(os.getenv("COMPETITOR_MIN_NEW_COMPANIES", 2))
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_seconds
+    stats = get_yield_stats()
+    seen = {c["name"] for c in known or []}
+
+    cached = [c for c in plan if c.cached]
+    uncached = [c for c in plan if not c.cached]
+    wave, remaining = cached + uncached[:wave_size], uncached[wave_size:]
+
+    search_results = []
+    while wave:
+        budget = deadline - loop.time()
+        if budget <= 0:
+            mark_cut_off()
+            break
+
+        wave_results = await parallel_search_async([c.query for c in wave], budget)
+        new_in_wave = 0
+        for candidate, result in zip(wave, wave_results):
+            if result.get("error"):
+                continue
+            names = {c.name for c in extract_companies_from_results([result], brand_name, topics)}
+            new = names - seen
+            seen |= names
+            new_in_wave += len(new)
+            stats.record(candidate.template, len(new))
+        search_results.extend(wave_results)
+
+        print(f"[Competitor Research] Wave of {len(wave)} queries found {new_in_wave} new companies")
+        if new_in_wave < min_new:
+            break
+        wave, remaining = remaining[:wave_size], remaining[wave_size:]
+
+    return search_results
+
+
+# Sites to exclude (not actual competitors - these are aggregators, review sites, social media)
+EXCLUDED_DOMAINS = frozenset({
+    # Social media
+    "quora", "reddit", "youtube", "facebook", "twitter", "linkedin",
+    "wikipedia", "medium", "instagram", "tiktok", "pinterest",
+    # Review/comparison sites
+    "yelp", "glassdoor", "indeed", "trustpilot", "g2", "capterra",
+    "intelligent", "bestcolleges", "usnews", "nerdwallet", "forbes",
+    "businessinsider", "techcrunch", "theverge", "cnet", "zdnet",
+    "testprepinsight", "collegerover", "beyondthestates", "thematchguy",
+    "crushtheusmleexam", "medschoolinsiders", "studentdoctor",
+    # Tech giants
+    "google", "apple", "amazon", "microsoft", "play"
+})
+
+_DOMAIN_RE = re.compile(r'https?://(?:www\.)?([^/]+)')
+
+
 def extract_companies_from_results(
     search_results: list[dict],
     brand_name: str,
-    topics: list[str]
+    topics: list[str],
+    known: Optional[list[dict]] = None
 ) -> list[CompetitorInfo]:
     """
     Extract unique companies from search results and deduplicate.
-    """
-    # Common company indicators
-    company_patterns = [
-        r'\b(\w+(?:\s+\w+)?)\s+(?:is|offers|provides|helps|enables)',
-        r'\b(\w+(?:\.\w+)?\.(?:com|io|ai|co|app))\b',
-        r'^(\w+(?:\s+\w+)?)\s*[-–—:]',
-    ]
-
-    # Known test prep companies (for medical/education context)
-    known_competitors = {
-        "uworld": {"name": "UWorld", "website": "https://www.uworld.com", "category": "test preparation"},
-        "amboss": {"name": "Amboss", "website": "https://www.amboss.com", "category": "medical education"},
-        "kaplan": {"name": "Kaplan", "website": "https://www.kaplan.com", "category": "test preparation"},
-        "lecturio": {"name": "Lecturio", "website": "https://www.lecturio.com", "category": "medical education"},
-        "boards and beyond": {"name": "Boards and Beyond", "website": "https://www.boardsbeyond.com", "category": "medical education"},
-        "sketchy": {"name": "Sketchy", "website": "https://www.sketchy.com", "category": "medical education"},
-        "pathoma": {"name": "Pathoma", "website": "https://www.pathoma.com", "category": "medical education"},
-        "first aid": {"name": "First Aid for USMLE", "website": "https://www.firstaidteam.com", "category": "medical education"},
-        "anki": {"name": "Anki", "website": "https://apps.ankiweb.net", "category": "flashcard learning"},
-        "osmosis": {"name": "Osmosis", "website": "https://www.osmosis.org", "category": "medical education"},
-        "quizlet": {"name": "Quizlet", "website": "https://www.quizlet.com", "category": "study tools"},
-        "princeton review": {"name": "The Princeton Review", "website": "https://www.princetonreview.com", "category": "test preparation"},
-        "magoosh": {"name": "Magoosh", "website": "https://magoosh.com", "category": "test preparation"},
-    }
 
+    Args:
+        search_results: Results from parallel_search
+        brand_name: The brand being researched (never reported as its own competitor)
+        topics: Topics used to judge relevance of unknown companies
+        known: Knowledge-base competitors to include even without search mentions;
+            they rank below every company the searches actually surfaced
+    """
+    kb = get_competitor_kb()
+    matcher = kb.matcher
     found_companies = {}
     brand_name_lower = brand_name.lower()
-
-    # Sites to exclude (not actual competitors - these are aggregators, review sites, social media)
-    excluded_domains = {
-        # Social media
-        "quora", "reddit", "youtube", "facebook", "twitter", "linkedin",
-        "wikipedia", "medium", "instagram", "tiktok", "pinterest",
-        # Review/comparison sites
-        "yelp", "glassdoor", "indeed", "trustpilot", "g2", "capterra",
-        "intelligent", "bestcolleges", "usnews", "nerdwallet", "forbes",
-        "businessinsider", "techcrunch", "theverge", "cnet", "zdnet",
-        "testprepinsight", "collegerover", "beyondthestates", "thematchguy",
-        "crushtheusmleexam", "medschoolinsiders", "studentdoctor",
-        # Tech giants
-        "google", "apple", "amazon", "microsoft", "play"
-    }
+    topics_lower = [(topic, topic.lower()) for topic in topics]
+
+    # Seed with knowledge-base competitors for this industry. Seeds start at
+    # zero mentions so they only fill slots the searches leave free
+    for company_info in known or []:
+        found_companies[company_info["name"]] = {
+            "name": company_info["name"],
+            "website": company_info["website"],
+            "description": "",
+            "similarity_reason": company_info["category"],
+            "snippet": company_info.get("description", ""),
+            "mentions": 0
+        }
 
     # First pass: look for known competitors in results
     for search_result in search_results:
         for result in search_result.get("results", []):
-            title_lower = result.get("title", "").lower()
-            snippet_lower = result.get("snippet", "").lower()
-            combined = f"{title_lower} {snippet_lower}"
-
-            for key, company_info in known_competitors.items():
-                if key in combined and key != brand_name_lower:
-                    if company_info["name"] not in found_companies:
-                        found_companies[company_info["name"]] = {
-                            "name": company_info["name"],
-                            "website": company_info["website"] or result.get("link"),
-                            "description": "",
-                            "similarity_reason": company_info["category"],
-                            "snippet": result.get("snippet", ""),
-                            "mentions": 1
-                        }
-                    else:
-                        found_companies[company_info["name"]]["mentions"] += 1
+            combined = f"{result.get('title', '')} {result.get('snippet', '')}".lower()
+
+            mentioned = {
+                matcher.entries[key]["name"]: matcher.entries[key]
+                for key in matcher.find(combined)
+                if key != brand_name_lower
+            }
+            for company_info in mentioned.values():
+                if company_info["name"] not in found_companies:
+                    found_companies[company_info["name"]] = {
+                        "name": company_info["name"],
+                        "website": company_info["website"] or result.get("link"),
+                        "description": "",
+                        "similarity_reason": company_info["category"],
+                        "snippet": result.get("snippet", ""),
+                        "mentions": 1
+                    }
+                else:
+                    company = found_companies[company_info["name"]]
+                    company["mentions"] += 1
+                    company["snippet"] = company["snippet"] or result.get("snippet", "")
 
     # Second pass: extract companies from titles and snippets
     for search_result in search_results:
         for result in search_result.get("results", []):
-            title = result.get("title", "")
             link = result.get("link", "")
             snippet = result.get("snippet", "")
 
             # Extract domain name as potential company
             if link:
-                domain_match = re.search(r'https?://(?:www\.)?([^/]+)', link)
+                domain_match = _DOMAIN_RE.search(link)
                 if domain_match:
                     domain = domain_match.group(1)
+
+                    # Domains the knowledge base knows count towards that company
+                    company_info = kb.lookup_domain(domain)
+                    if company_info is not None:
+                        if company_info["name"] in found_companies:
+                            found_companies[company_info["name"]]["mentions"] += 1
+                        elif company_info["name"].lower() != brand_name_lower:
+                            found_companies[company_info["name"]] = {
+                                "name": company_info["name"],
+                                "website": company_info["website"],
+                                "description": "",
+                                "similarity_reason": company_info["category"],
+                                "snippet": snippet,
+                                "mentions": 1
+                            }
+                        continue
+
                     # Extract company name from domain
                     company_from_domain = domain.split('.')[0]
+                    company_lower = company_from_domain.lower()
 
                     # Skip excluded domains
-                    if company_from_domain.lower() in excluded_domains:
+                    if company_lower in EXCLUDED_DOMAINS:
                         continue
 
-                    if len(company_from_domain) > 2 and company_from_domain.lower() != brand_name_lower:
+                    if len(company_from_domain) > 2 and company_lower != brand_name_lower:
                         # Capitalize properly
                         company_name = company_from_domain.title()
 
                         if company_name not in found_companies:
                             # Determine relevance based on topics
-                            relevance = []
-                            for topic in topics:
-                                if topic.lower() in title.lower() or topic.lower() in snippet.lower():
-                                    relevance.append(topic)
+                            title_lower = result.get("title", "").lower()
+                            snippet_lower = snippet.lower()
+                            relevance = [
+                                topic for topic, topic_lower in topics_lower
+                                if topic_lower in title_lower or topic_lower in snippet_lower
+                            ]
 
                             if relevance:
                                 found_companies[company_name] = {
@@ -318,7 +475,7 @@ def extract_companies_from_results(
     return competitors
 
 
-def research_competitors(
+async def research_competitors_async(
     brand_name: str,
     brand_description: str,
     industry: str,
@@ -338,25 +495,51 @@ def research_competitors(
         CompetitorAnalysis with competitor data
     """
     try:
-        # Generate smart queries based on context
-        queries = generate_smart_queries(brand_name, brand_description, industry, topics)
+        # When the knowledge base already covers this industry, a couple of
+        # searches are enough to confirm and rank what it knows
+        max_queries = 8
+        kb = get_competitor_kb()
+        known = kb.competitors_for(industry, topics, exclude=brand_name)
+        if known:
+            print(f"[Competitor Research] Knowledge base knows {len(known)} competitors for {industry}")
+            emit("partial", fields={"known_competitors": [c["name"] for c in known]})
+            # Enough to answer with if the deadline passes before searches finish
+            record_partial({"competitors": [
+                {"name": c["name"], "website": c["website"], "similarity_reason": c["category"]}
+                for c in known
+            ]})
+            # Only the industry itself can vouch for coverage; a topic that
+            # happens to name a KB industry is too weak to cut the search
+            covered = kb.competitors_for(industry, exclude=brand_name)
+            if len(covered) >= int(os.getenv("KB_MIN_COVERAGE", 5)):
+                max_queries = int(os.getenv("KB_COVERED_MAX_QUERIES", 2))
+
+        # Plan smart queries based on context
+        # Planning checks the search cache, which may read from disk
+        plan = await asyncio.to_thread(
+            plan_competitor_queries, brand_name, brand_description, industry, topics, max_queries
+        )
+        queries = [c.query for c in plan]
 
-        print(f"[Competitor Research] Generated {len(queries)} search queries:")
-        for q in queries:
-            print(f"  - {q}")
+        print(f"[Competitor Research] Planned {len(queries)} search queries:")
+        for c in plan:
+            print(f"  - {c.query}{' (cached)' if c.cached else ''}")
 
-        # Execute searches in parallel
-        print(f"[Competitor Research] Executing parallel searches...")
-        search_results = parallel_search(queries, max_workers=4)
+        # Execute searches in waves, stopping once they stop finding new companies
+        print(f"[Competitor Research] Executing searches...")
+        emit("tool_started", tool="parallel_search", queries=queries)
+        search_results = await search_in_waves(plan, brand_name, topics, known)
 
         # Count successful searches
         successful = sum(1 for r in search_results if not r.get("error"))
-        print(f"[Competitor Research] {successful}/{len(queries)} searches completed successfully")
+        print(f"[Competitor Research] {successful}/{len(search_results)} searches completed successfully "
+              f"({len(queries) - len(search_results)} skipped)")
 
         # Extract companies from results
-        competitors = extract_companies_from_results(search_results, brand_name, topics)
+        competitors = extract_companies_from_results(search_results, brand_name, topics, known)
 
         print(f"[Competitor Research] Found {len(competitors)} potential competitors")
+        emit("partial", fields={"competitors": [c.name for c in competitors]})
 
         # Determine market position based on competitor count
         if len(competitors) > 7:
@@ -371,7 +554,8 @@ def research_competitors(
             industry=industry,
             competitors=competitors,
             market_position=market_position,
-            competitive_landscape=f"Found {len(competitors)} competitors in {industry} space across topics: {', '.join(topics[:3])}"
+            competitive_landscape=f"Found {len(competitors)} competitors in {industry} space across topics: {', '.join(topics[:3])}",
+            partial=was_cut_off()
         )
 
     except Exception as e:
@@ -384,53 +568,87 @@ def research_competitors(
         )
 
 
-# Keep CrewAI version for more thorough research if needed
-def research_competitors_with_crewai(
+def research_competitors(
     brand_name: str,
     brand_description: str,
     industry: str,
     topics: list[str]
 ) -> CompetitorAnalysis:
     """
-    Research competitors using CrewAI for more thorough analysis.
-    This is slower but may provide more detailed results.
+    Synchronous wrapper around research_competitors_async for callers
+    without an event loop.
     """
-    from crewai import Agent, Task, Crew, Process
-    from crewai.tools import tool
+    async def run() -> CompetitorAnalysis:
+        try:
+            return await research_competitors_async(brand_name, brand_description, industry, topics)
+        finally:
+            await close_async_http_client()
 
-    @tool
-    def search_competitors_tool(query: str) -> str:
-        """Search the web for competitor information."""
-        result = search_serpapi(query)
-        if result.get("error"):
-            return f"Error: {result['error']}"
+    return asyncio.run(run())
 
-        output = []
-        for r in result.get("results", []):
-            output.append(f"Title: {r.get('title')}")
-            output.append(f"Link: {r.get('link')}")
-            output.append(f"Snippet: {r.get('snippet')}")
-            output.append("---")
 
-        return "\n".join(output) if output else "No results found"
+@traced("tool.search_competitors_tool")
+def search_competitors_tool(query: str) -> str:
+    """Search the web for competitor information."""
+    cutoff = tool_cutoff()
+    if cutoff:
+        return cutoff
 
-    topics_str = ", ".join(topics) if topics else "N/A"
-    keywords = extract_keywords_from_description(brand_description)
-    keywords_str = ", ".join(keywords) if keywords else "N/A"
+    result = search_serpapi(query)
+    if result.get("error"):
+        return f"Error: {result['error']}"
+
+    output = []
+    for r in result.get("results", []):
+        output.append(f"Title: {r.get('title')}")
+        output.append(f"Link: {r.get('link')}")
+        output.append(f"Snippet: {r.get('snippet')}")
+        output.append("---")
+
+    return "\n".join(output) if output else "No results found"
+
+
+def _crew_output_format(brand_name: str, industry: str) -> str:
+    """The output format block, bound to {output_format} at kickoff (see CrewTemplate)."""
+    return f"""{{
+            "brand_name": "{brand_name}",
+            "industry": "{industry}",
+            "competitors": [
+                {{
+                    "name": "Competitor Name",
+                    "website": "https://example.com",
+                    "description": "What they do",
+                    "similarity_reason": "Why they compete"
+                }}
+            ],
+            "market_position": "Market overview"
+        }}"""
+
+
+def create_competitor_research_crew() -> "Crew":
+    """
+    Create the CrewAI crew for competitor research, with the brand, its
+    search terms and the output format as placeholders bound at kickoff.
+
+    Returns:
+        Configured Crew instance
+    """
+    from crewai import Agent, Task, Crew, Process
+    from crewai.tools import tool
 
     researcher = Agent(
         role="Competitor Research Specialist",
-        goal=f"Find the top competitors for {brand_name} in the {industry} space",
+        goal="Find the top competitors for {brand_name} in the {industry} space",
         backstory="""You are an expert market researcher who quickly identifies
         competitors by searching for companies in the same space. You use specific
         keywords from the brand description to find direct competitors.""",
         verbose=True,
         allow_delegation=False,
-        tools=[search_competitors_tool]
+        tools=[tool(search_competitors_tool)]
     )
 
     research_task = Task(
-        description=f"""
+        description="""
         Find competitors for {brand_name}.
 
         BRAND DESCRIPTION: {brand_description}
@@ -439,46 +657,58 @@ def research_competitors_with_crewai(
         KEY TERMS FROM DESCRIPTION: {keywords_str}
 
         SEARCH STRATEGY:
-        1. Search for "{keywords[0]} alternatives" if keywords available
-        2. Search for "best {topics[0]} apps 2024" for top topic
+        1. Search for "{top_keyword} alternatives" if keywords available
+        2. Search for "best {top_topic} apps 2024" for top topic
         3. Search for "{industry} market leaders"
 
         Find 5-8 real competitors. Return JSON with this format:
-        {{
-            "brand_name": "{brand_name}",
-            "industry": "{industry}",
-            "competitors": [
-                {{
-                    "name": "Competitor Name",
-                    "website": "https://example.com",
-                    "description": "What they do",
-                    "similarity_reason": "Why they compete"
-                }}
-            ],
-            "market_position": "Market overview"
-        }}
+        {output_format}
         """,
         expected_output="JSON object with competitors",
         agent=researcher
     )
 
-    crew = Crew(
+    return Crew(
         agents=[researcher],
         tasks=[research_task],
         process=Process.sequential,
-        verbose=True
+        verbose=True,
+        cache=False,  # See CrewTemplate
+        step_callback=crew_step_callback
     )
 
-    result = crew.kickoff()
 
-    try:
-        output = str(result)
-        if "```json" in output:
-            output = output.split("```json")[1].split("```")[0]
-        elif "```" in output:
-            output = output.split("```")[1].split("```")[0]
+competitor_crew_template = CrewTemplate("competitor", create_competitor_research_crew)
+
 
-        data = json.loads(output.strip())
+# Keep CrewAI version for more thorough research if needed
+def research_competitors_with_crewai(
+    brand_name: str,
+    brand_description: str,
+    industry: str,
+    topics: list[str]
+) -> CompetitorAnalysis:
+    """
+    Research competitors using CrewAI for more thorough analysis.
+    This is slower but may provide more detailed results.
+    """
+    keywords = extract_keywords_from_description(brand_description)
+
+    configure_crewai_llm_pool()
+    with track_crew("competitor"), span("crew.kickoff", crew="competitor", brand_name=brand_name):
+        result = competitor_crew_template.kickoff({
+            "brand_name": brand_name,
+            "brand_description": brand_description,
+            "industry": industry,
+            "topics_str": ", ".join(topics) if topics else "N/A",
+            "keywords_str": ", ".join(keywords) if keywords else "N/A",
+            "top_keyword": keywords[0] if keywords else brand_name,
+            "top_topic": topics[0] if topics else industry,
+            "output_format": _crew_output_format(brand_name, industry)
+        })
+
+    try:
+        data, truncated = extract_json_object(str(result))
 
         competitors = []
         for comp in data.get("competitors", []):
@@ -490,7 +720,8 @@ def research_competitors_with_crewai(
             industry=data.get("industry", industry),
             competitors=competitors,
             market_position=data.get("market_position"),
-            competitive_landscape=data.get("competitive_landscape")
+            competitive_landscape=data.get("competitive_landscape"),
+            partial=was_cut_off() or truncated
         )
 
     except (json.JSONDecodeError, Exception) as e:
@@ -0,0 +1,227 @@
+"""
+Competitor Knowledge Base - File-backed known competitors indexed by industry, alias and domain
+"""
+import os
+import re
+import json
+import time
+import threading
+from typing import Optional
+
+
+DEFAULT_KB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "known_competitors.json")
+
+
+class CompetitorMatcher:
+    """
+    Finds every known competitor mentioned in a piece of text in one pass.
+
+    All keys are compiled into a single alternation, longest first so that
+    multi-word names win over names they contain, and matched on word
+    boundaries.
+    """
+
+    def __init__(self, entries: dict[str, dict]):
+        self.entries = entries
+        keys = sorted(entries, key=len, reverse=True)
+        self._pattern = (
+            re.compile(r"\b(?:" + "|".join(re.escape(k) for k in keys) + r")\b")
+            if keys else None
+        )
+
+    def find(self, text_lower: str) -> set[str]:
+        """Return the keys of all known competitors in already-lowercased text."""
+        if self._pattern is None:
+            return set()
+        return {m.group(0) for m in self._pattern.finditer(text_lower)}
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def _host(url_or_domain: str) -> str:
+    host = re.sub(r"^https?://", "", url_or_domain.strip().lower()).split("/")[0].split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+class _Index:
+    """Immutable snapshot of the knowledge base, swapped wholesale on reload."""
+
+    def __init__(self, data: dict, mtime: Optional[float]):
+        self.mtime = mtime
+        self.by_alias: dict[str, dict] = {}
+        self.by_domain: dict[str, dict] = {}
+        self.by_industry: dict[str, list[dict]] = {}
+        self.industry_aliases: dict[str, str] = {}
+
+        for industry, info in (data.get("industries") or {}).items():
+            canonical = _normalize(industry)
+            self.industry_aliases[canonical] = canonical
+            for alias in info.get("aliases", []):
+                self.industry_aliases.setdefault(_normalize(alias), canonical)
+
+        self.competitors = 0
+        for raw in data.get("competitors") or []:
+            if not raw.get("name"):
+                continue
+            entry = {
+                "name": raw["name"],
+                "website": raw.get("website"),
+                "category": raw.get("category", ""),
+                "description": raw.get("description", ""),
+            }
+            industries = [_normalize(i) for i in raw.get("industries", [])]
+            self.competitors += 1
+
+            for alias in [*raw.get("aliases", []), raw["name"]]:
+                if alias.strip():
+                    self.by_alias.setdefault(_normalize(alias), entry)
+            if entry["website"]:
+                self.by_domain.setdefault(_host(entry["website"]), entry)
+            for industry in industries:
+                self.industry_aliases.setdefault(industry, industry)
+                self.by_industry.setdefault(industry, []).append(entry)
+
+        self.matcher = CompetitorMatcher(self.by_alias)
+
+
+class CompetitorKB:
+    """
+    Known-competitor knowledge base backed by a JSON file.
+
+    Loaded lazily on first use. The file's mtime is re-checked at most every
+    KB_RELOAD_CHECK_SECONDS and the indexes are rebuilt when it changes, so
+    edits take effect without a restart; reload() forces a rebuild.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("COMPETITOR_KB_PATH", DEFAULT_KB_PATH)
+        self.check_interval = float(os.getenv("KB_RELOAD_CHECK_SECONDS", 5.0))
+        self._index: Optional[_Index] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def _load(self) -> _Index:
+        mtime = self._mtime()
+        data = {}
+        if mtime is not None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[Competitor KB] Could not load {self.path}: {e}")
+                if self._index is not None:
+                    # Keep serving the last good snapshot
+                    return self._index
+        index = _Index(data, mtime)
+        self.reloads += 1
+        print(f"[Competitor KB] Loaded {index.competitors} competitors, "
+              f"{len(index.by_industry)} industries from {self.path}")
+        return index
+
+    def _current(self) -> _Index:
+        index = self._index
+        now = time.monotonic()
+        if index is not None and now - self._checked_at < self.check_interval:
+            return index
+
+        with self._lock:
+            self._checked_at = now
+            if self._index is None or self._mtime() != self._index.mtime:
+                self._index = self._load()
+            return self._index
+
+    def reload(self) -> dict:
+        """Rebuild the indexes from disk now. Returns stats()."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._index = self._load()
+        return self.stats()
+
+    @property
+    def matcher(self) -> CompetitorMatcher:
+        return self._current().matcher
+
+    def resolve_industry(self, value: str) -> Optional[str]:
+        """Map an industry name or alias to its canonical KB industry."""
+        return self._current().industry_aliases.get(_normalize(value or ""))
+
+    def competitors_for(
+        self,
+        industry: str,
+        topics: Optional[list[str]] = None,
+        exclude: Optional[str] = None
+    ) -> list[dict]:
+        """
+        Known competitors for an industry, also matching topics against
+        industry aliases.
+
+        Args:
+            industry: Industry name or alias
+            topics: Extra terms that may name an industry
+            exclude: Brand name to leave out
+
+        Returns:
+            Competitor entries (name, website, category, description)
+        """
+        index = self._current()
+        industries = []
+        for value in [industry, *(topics or [])]:
+            canonical = index.industry_aliases.get(_normalize(value or ""))
+            if canonical and canonical not in industries:
+                industries.append(canonical)
+
+        excluded = _normalize(exclude or "")
+        seen = set()
+        results = []
+        for canonical in industries:
+            for entry in index.by_industry.get(canonical, []):
+                if entry["name"] in seen or _normalize(entry["name"]) == excluded:
+                    continue
+                seen.add(entry["name"])
+                results.append(entry)
+        return results
+
+    def lookup_domain(self, url_or_domain: str) -> Optional[dict]:
+        """Find the competitor owning a domain or any of its parent domains."""
+        index = self._current()
+        host = _host(url_or_domain)
+        while host:
+            entry = index.by_domain.get(host)
+            if entry is not None:
+                return entry
+            _, _, host = host.partition(".")
+            if "." not in host:
+                return None
+        return None
+
+    def stats(self) -> dict:
+        index = self._current()
+        return {
+            "path": self.path,
+            "competitors": index.competitors,
+            "aliases": len(index.by_alias),
+            "industries": len(index.by_industry),
+            "reloads": self.reloads,
+        }
+
+
+_kb: Optional[CompetitorKB] = None
+_kb_lock = threading.Lock()
+
+
+def get_competitor_kb() -> CompetitorKB:
+    """Return the process-wide knowledge base."""
+    global _kb
+    with _kb_lock:
+        if _kb is None:
+            _kb = CompetitorKB()
+        return _kb
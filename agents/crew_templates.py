@@ -0,0 +1,88 @@
+"""
+Crew Templates - Crews built once per worker thread and reused across requests
+
+CrewAI pulls in its whole agent stack on import, so crew modules import it
+only inside their builders and tools (and under TYPE_CHECKING for
+annotations). It loads when a crew first runs, or in the background with
+CREWAI_WARMUP; bench/import_profile.py checks it stays out of startup.
+"""
+import threading
+from typing import Any, Callable, Optional
+
+from deadline import crew_limits
+from metrics import record_crew_usage
+
+
+class _ThreadCrew:
+    """One thread's copy of a template's crew"""
+
+    def __init__(self, crew: Any):
+        self.crew = crew
+        # CrewAI defaults, restored for requests without a deadline
+        self.defaults = [(agent, agent.max_iter, agent.max_execution_time) for agent in crew.agents]
+        self.tokens_seen = 0
+
+
+class CrewTemplate:
+    """
+    A crew whose agents, tools and tasks are built once and reused.
+
+    Per-request values are {placeholders} in agent and task text, bound by
+    CrewAI's input interpolation at kickoff, so each request only pays for
+    the run itself. A kickoff mutates its crew, so every pool thread keeps
+    its own copy. Literal braces (e.g. JSON output formats) must not appear
+    in templated text; pass them in as inputs instead.
+
+    Crews must be built with cache=False. CrewAI's tool cache lives as long
+    as the crew, so a reused crew would replay earlier requests' tool
+    results (including errors and deadline notices) and grow without bound.
+    """
+
+    def __init__(self, name: str, build: Callable[[], Any]):
+        """
+        Args:
+            name: Crew name, for logs
+            build: Builds the Crew (imports CrewAI itself, so loading stays lazy)
+        """
+        self.name = name
+        self._build = build
+        self._local = threading.local()
+
+    def _thread_crew(self) -> _ThreadCrew:
+        state: Optional[_ThreadCrew] = getattr(self._local, "state", None)
+        if state is None:
+            crew = self._build()
+            if getattr(crew, "cache", False):
+                raise ValueError(f"{self.name} crew must be built with cache=False to be reused")
+            state = _ThreadCrew(crew)
+            self._local.state = state
+            print(f"[Crew Templates] Built {self.name} crew for {threading.current_thread().name}")
+        return state
+
+    def kickoff(self, inputs: dict) -> Any:
+        """
+        Run the crew with inputs bound into its placeholders, limited to the
+        current request's deadline.
+
+        Args:
+            inputs: Values for every placeholder in the template
+
+        Returns:
+            The CrewAI result
+        """
+        state = self._thread_crew()
+
+        limits = crew_limits()
+        for agent, max_iter, max_execution_time in state.defaults:
+            agent.max_iter = limits.get("max_iter", max_iter)
+            agent.max_execution_time = limits.get("max_execution_time", max_execution_time)
+
+        try:
+            result = state.crew.kickoff(inputs=inputs)
+        except Exception:
+            # The crew may be left mid-run; rebuild it for the next request
+            self._local.state = None
+            raise
+
+        state.tokens_seen = record_crew_usage(result, state.tokens_seen)
+        return result
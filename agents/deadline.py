@@ -0,0 +1,213 @@
+"""
+Deadlines - Request-scoped time budgets and partial-result salvage for crews, searches and LLM calls
+"""
+import os
+import time
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+from pydantic import BaseModel, ValidationError
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+ResultT = TypeVar("ResultT")
+
+# What tools tell the agent once the budget is spent, so it answers with what it has
+DEADLINE_REACHED_MESSAGE = (
+    "Deadline reached: do not run any more tools. Return your final answer now, "
+    "using only the information already gathered and null for anything unknown."
+)
+
+
+class Deadline:
+    """
+    Time budget for one request.
+
+    Work should wind down at the soft deadline, which leaves a wrap-up margin
+    (DEADLINE_WRAP_UP_SECONDS, at most a quarter of the budget) for the crew
+    to produce its final answer before the hard deadline. Fields reported by
+    crew steps are kept so a partial result can be salvaged at the hard
+    deadline.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        wrap_up = min(float(os.getenv("DEADLINE_WRAP_UP_SECONDS", 10.0)), seconds / 4)
+        self.soft_expires_at = self.expires_at - wrap_up
+        self.fields: dict[str, Any] = {}
+        self.cut_off = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def soft_remaining(self) -> float:
+        return max(0.0, self.soft_expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Whether work should stop starting new tool calls or searches."""
+        return time.monotonic() >= self.soft_expires_at
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Apply a time budget to everything run in the current context, including
+    pool threads and tasks started from it. None or a non-positive value
+    means no deadline.
+    """
+    if not seconds or seconds <= 0:
+        yield None
+        return
+    deadline = Deadline(seconds)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def deadline_expired() -> bool:
+    """Whether the current request's soft deadline has passed (False without one)."""
+    deadline = _current.get()
+    return deadline is not None and deadline.expired()
+
+
+def tool_cutoff() -> Optional[str]:
+    """
+    For tools: once the soft deadline has passed, the message to return
+    instead of doing any work; otherwise None.
+    """
+    deadline = _current.get()
+    if deadline is None or not deadline.expired():
+        return None
+    deadline.cut_off = True
+    return DEADLINE_REACHED_MESSAGE
+
+
+def mark_cut_off() -> None:
+    """Record that work was skipped because of the deadline."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.cut_off = True
+
+
+def was_cut_off() -> bool:
+    """Whether any work was skipped because of the current request's deadline."""
+    deadline = _current.get()
+    return deadline is not None and deadline.cut_off
+
+
+def request_timeout() -> dict:
+    """Per-call timeout kwargs for client calls: the hard time left, or none without a deadline."""
+    deadline = _current.get()
+    if deadline is None:
+        return {}
+    return {"timeout": max(1.0, deadline.remaining())}
+
+
+def time_left(default: float) -> float:
+    """Seconds of budget left before the soft deadline, capped at default."""
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    return min(default, deadline.soft_remaining())
+
+
+def record_partial(fields: dict) -> None:
+    """Remember fields the crew has produced so far for salvage."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.fields.update(fields)
+
+
+def append_partial(field: str, item: Any) -> None:
+    """
+    Add one item to a list field kept for salvage. Safe to call from
+    concurrent pool threads.
+    """
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.fields.setdefault(field, []).append(item)
+
+
+def partial_fields() -> dict:
+    """Fields recorded so far for the current request."""
+    deadline = _current.get()
+    return dict(deadline.fields) if deadline is not None else {}
+
+
+def crew_limits(default_max_iter: int = 15) -> dict:
+    """
+    Agent keyword arguments capping iterations and execution time to the
+    remaining budget. Empty without a deadline, so CrewAI defaults apply.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return {}
+    budget = deadline.soft_remaining()
+    # Roughly one LLM round trip plus one tool call per iteration
+    seconds_per_iter = float(os.getenv("CREW_SECONDS_PER_ITERATION", 8.0))
+    return {
+        "max_iter": max(1, min(default_max_iter, int(budget / seconds_per_iter))),
+        "max_execution_time": max(1, int(budget)),
+    }
+
+
+def salvage(model: type[ModelT], fields: dict, **defaults: Any) -> ModelT:
+    """
+    Build a partial result from whatever fields were collected, dropping
+    any that don't validate.
+
+    Every result model carries this partial flag. Crews and fast paths also
+    set it when the deadline or a truncated LLM reply cut their work short.
+    Partial results are never cached.
+    """
+    data = {k: v for k, v in fields.items() if k in model.model_fields and v is not None}
+    data.update({k: v for k, v in defaults.items() if data.get(k) in (None, "")})
+    data["partial"] = True
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors() if error["loc"]}
+        data = {k: v for k, v in data.items() if k not in invalid}
+        data.update({k: v for k, v in defaults.items() if k in invalid})
+        return model.model_validate(data)
+
+
+async def run_with_deadline(
+    deadline: Optional[Deadline],
+    compute: Callable[[], Awaitable[ResultT]],
+    on_timeout: Callable[[dict], ResultT]
+) -> ResultT:
+    """
+    Await compute() until the hard deadline, then return on_timeout(fields)
+    instead. The computation itself is not cancelled (crew threads can't
+    be), but its tools stop at the soft deadline so it winds down quickly.
+
+    Args:
+        deadline: The request's deadline, or None to just await compute()
+        compute: Zero-argument coroutine function producing the result
+        on_timeout: Builds a partial result from the fields collected so far
+
+    Returns:
+        The full result, or the partial one if the deadline passed first
+    """
+    if deadline is None:
+        return await compute()
+
+    task = asyncio.ensure_future(compute())
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        print(f"[Deadline] {deadline.seconds:g}s budget exhausted, returning partial result")
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return on_timeout(dict(deadline.fields))
@@ -0,0 +1,147 @@
+"""
+Worker Pools - Bounded thread pools that keep blocking crew work off the event loop
+"""
+import os
+import asyncio
+import functools
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+# Default concurrent runs per endpoint family, overridable with <FAMILY>_POOL_SIZE
+DEFAULT_POOL_SIZES = {
+    "product": 4,
+    "brand": 4,
+    "prompts": 8,
+    "batch": 8,
+    "prompt_topics": 16,
+}
+
+_pools: dict[str, ThreadPoolExecutor] = {}
+_pending: dict[str, int] = {}
+_running: dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def get_pool_size(family: str) -> int:
+    """
+    Resolve the worker count for an endpoint family.
+
+    Args:
+        family: Endpoint family name (product, brand, prompts, batch)
+
+    Returns:
+        Configured pool size, at least 1
+    """
+    default = DEFAULT_POOL_SIZES.get(family, 4)
+    try:
+        size = int(os.getenv(f"{family.upper()}_POOL_SIZE", default))
+    except ValueError:
+        size = default
+    return max(1, size)
+
+
+def get_pool(family: str) -> ThreadPoolExecutor:
+    """Return the pool for a family, creating it on first use."""
+    with _lock:
+        pool = _pools.get(family)
+        if pool is None:
+            pool = ThreadPoolExecutor(
+                max_workers=get_pool_size(family),
+                thread_name_prefix=f"{family}-worker"
+            )
+            _pools[family] = pool
+            _pending.setdefault(family, 0)
+            _running.setdefault(family, 0)
+        return pool
+
+
+def _run_tracked(family: str, func: Callable[..., Any]) -> Any:
+    """Run a call inside a worker thread while keeping the running count accurate."""
+    with _lock:
+        _running[family] += 1
+    try:
+        return func()
+    finally:
+        with _lock:
+            _running[family] -= 1
+
+
+def _release(family: str, _future: Future) -> None:
+    # Runs once the call finishes or is cancelled before it starts
+    with _lock:
+        _pending[family] -= 1
+
+
+def submit_in_pool(family: str, func: Callable[..., Any], *args, **kwargs) -> Future:
+    """
+    Submit a blocking callable to the family's worker pool.
+
+    The caller's context variables are copied into the worker thread so
+    request-scoped state follows the work, and the call is counted in
+    pool_stats() until it finishes or is cancelled.
+
+    Args:
+        family: Endpoint family whose pool should run the call
+        func: Synchronous callable to run
+        *args, **kwargs: Arguments for the callable
+
+    Returns:
+        The call's future
+    """
+    pool = get_pool(family)
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+
+    with _lock:
+        _pending[family] += 1
+    try:
+        future = pool.submit(_run_tracked, family, call)
+    except Exception:
+        with _lock:
+            _pending[family] -= 1
+        raise
+    future.add_done_callback(functools.partial(_release, family))
+    return future
+
+
+async def run_in_pool(family: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable in the family's worker pool and await its result.
+
+    See submit_in_pool(). Cancelling the await cancels the call if it
+    hasn't started yet.
+
+    Returns:
+        Whatever the callable returns
+    """
+    return await asyncio.wrap_future(submit_in_pool(family, func, *args, **kwargs))
+
+
+def pool_stats() -> dict:
+    """
+    Report size, running and queued work for every pool created so far.
+
+    Returns:
+        Mapping of family name to its current stats
+    """
+    with _lock:
+        return {
+            family: {
+                "size": pool._max_workers,
+                "running": _running[family],
+                "queued": _pending[family] - _running[family],
+            }
+            for family, pool in _pools.items()
+        }
+
+
+def shutdown_pools(wait: bool = False) -> None:
+    """Shut down every pool. Queued work that has not started is cancelled."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait, cancel_futures=True)
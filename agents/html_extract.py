@@ -0,0 +1,111 @@
+"""
+HTML Extraction - Incremental, bounded-memory text and metadata extraction from HTML pages
+"""
+from html.parser import HTMLParser
+from typing import Iterable, Optional
+
+
+# Elements whose contents never count as page text
+SKIPPED_TAGS = frozenset({"script", "style", "nav", "footer", "header", "noscript", "template", "svg"})
+
+DEFAULT_MAX_CHARS = 15000
+
+
+class PageExtractor(HTMLParser):
+    """
+    Single-pass extractor fed one chunk at a time.
+
+    Collects the title, meta/OG descriptions and visible text, skipping the
+    contents of SKIPPED_TAGS. Sets `done` once max_chars of text have been
+    collected so callers can stop reading the body.
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.title = ""
+        self.meta: dict[str, str] = {}
+        self.done = False
+
+        self._text: list[str] = []
+        self._length = 0
+        self._skip_depth = 0
+        self._in_title = False
+        # Text runs can be split across feed() chunks, so they are only
+        # collapsed and counted once the next tag closes them
+        self._pending: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            attributes = {k.lower(): v for k, v in attrs if v is not None}
+            key = (attributes.get("name") or attributes.get("property") or "").lower()
+            content = attributes.get("content", "").strip()
+            if key in ("description", "og:title", "og:description") and content:
+                self.meta.setdefault(key, content)
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title or not (self._skip_depth or self.done):
+            self._pending.append(data)
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = " ".join("".join(self._pending).split())
+        self._pending.clear()
+        if not text:
+            return
+
+        if self._in_title:
+            if not self.title:
+                self.title = text
+            return
+        self._text.append(text)
+        self._length += len(text) + 1
+        if self._length > self.max_chars:
+            self.done = True
+
+    @property
+    def text(self) -> str:
+        """Visible text with whitespace collapsed, truncated to max_chars."""
+        text = " ".join(self._text)
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars] + "..."
+        return text
+
+
+def extract_page(chunks: Iterable[str], max_chars: int = DEFAULT_MAX_CHARS) -> PageExtractor:
+    """
+    Feed decoded HTML chunks to a PageExtractor, stopping as soon as enough
+    text has been collected.
+
+    Args:
+        chunks: Decoded HTML text chunks (e.g. response.iter_text())
+        max_chars: Text budget
+
+    Returns:
+        The populated extractor
+    """
+    extractor = PageExtractor(max_chars)
+    for chunk in chunks:
+        extractor.feed(chunk)
+        if extractor.done:
+            break
+    extractor.close()
+    return extractor
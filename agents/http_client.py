@@ -0,0 +1,158 @@
+"""
+HTTP Client - Process-wide pooled HTTP client shared by search and crawl tools
+"""
+import os
+import asyncio
+import threading
+import weakref
+from typing import Optional
+from urllib.parse import urlparse
+import httpx
+
+
+DEFAULT_TIMEOUT = 30.0
+
+_client: Optional[httpx.Client] = None
+_host_timeouts: dict[str, float] = {}
+_lock = threading.Lock()
+
+# Async clients are bound to the event loop that created them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (installed via httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _load_host_timeouts() -> dict[str, float]:
+    """
+    Build the per-host timeout table.
+
+    SerpAPI and Firecrawl get their own defaults; HTTP_HOST_TIMEOUTS can
+    add or override entries as "host=seconds,host=seconds".
+    """
+    timeouts = {}
+
+    serpapi_host = urlparse(os.getenv("SERPAPI_URL", "https://serpapi.com/search.json")).hostname
+    if serpapi_host:
+        timeouts[serpapi_host] = float(os.getenv("SERPAPI_TIMEOUT", 30.0))
+
+    firecrawl_host = urlparse(os.getenv("FIRECRAWL_URL", "http://localhost:3002")).hostname
+    if firecrawl_host:
+        timeouts[firecrawl_host] = float(os.getenv("FIRECRAWL_TIMEOUT", 60.0))
+
+    for entry in os.getenv("HTTP_HOST_TIMEOUTS", "").split(","):
+        host, _, seconds = entry.partition("=")
+        if host.strip() and seconds.strip():
+            try:
+                timeouts[host.strip().lower()] = float(seconds)
+            except ValueError:
+                print(f"[HTTP] Ignoring invalid timeout entry: {entry}")
+
+    return timeouts
+
+
+def _client_options() -> dict:
+    """Connection pool, protocol and timeout settings shared by sync and async clients."""
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", 20)),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0))
+    )
+    http2 = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+    if http2 and not _http2_available():
+        print("[HTTP] h2 package not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    return {
+        "http2": http2,
+        "limits": limits,
+        "timeout": float(os.getenv("HTTP_DEFAULT_TIMEOUT", DEFAULT_TIMEOUT))
+    }
+
+
+def create_http_client() -> httpx.Client:
+    """
+    Create a pooled client with keep-alive and, when available, HTTP/2.
+
+    Returns:
+        Configured httpx.Client
+    """
+    return httpx.Client(**_client_options())
+
+
+def init_http_client() -> httpx.Client:
+    """Create the shared client. Called at application startup."""
+    global _client, _host_timeouts
+    with _lock:
+        if _client is None:
+            _host_timeouts = _load_host_timeouts()
+            _client = create_http_client()
+        return _client
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the shared client, creating it lazily when used outside the API
+    server (for example when a crew is run from a script).
+    """
+    client = _client
+    if client is None:
+        client = init_http_client()
+    return client
+
+
+def close_http_client() -> None:
+    """Close the shared client and its connection pool. Called at shutdown."""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the pooled async client for the running event loop, creating it
+    on first use. The API server's loop gets one long-lived client; scripts
+    that use asyncio.run() get their own and should call close_async_http_client().
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            if not _host_timeouts:
+                _host_timeouts.update(_load_host_timeouts())
+            client = httpx.AsyncClient(**_client_options())
+            _async_clients[loop] = client
+        return client
+
+
+async def close_async_http_client() -> None:
+    """Close the running loop's async client, if one was created."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def timeout_for(url: str) -> float:
+    """
+    Look up the timeout to use for a request URL.
+
+    Args:
+        url: Request URL
+
+    Returns:
+        Timeout in seconds for the URL's host
+    """
+    host = (urlparse(url).hostname or "").lower()
+    if host in _host_timeouts:
+        return _host_timeouts[host]
+    return float(os.getenv("HTTP_DEFAULT_TIMEOUT", DEFAULT_TIMEOUT))
@@ -0,0 +1,251 @@
+"""
+Job Queue - Background execution of research requests with callback delivery
+"""
+import os
+import time
+import uuid
+import random
+import asyncio
+import contextvars
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+import httpx
+from pydantic import BaseModel
+
+from tracing import span, current_trace_id
+from metrics import start_request_usage, observe_request_usage
+
+
+class JobStatus(BaseModel):
+    """Current state of a submitted job"""
+    job_id: str
+    kind: str
+    status: str = "queued"  # queued | running | succeeded | failed
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    callback_url: Optional[str] = None
+    callback_status: Optional[str] = None  # pending | delivered | failed
+    callback_attempts: int = 0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    trace_id: Optional[str] = None  # Trace of the submitting request, when tracing is on
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class JobManager:
+    """
+    In-process job queue.
+
+    Submitted jobs are picked up by a fixed set of worker tasks. When a job
+    finishes, its result is POSTed to the job's callback_url (if any) with
+    exponential backoff and jitter between attempts.
+    """
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, JobStatus]" = OrderedDict()
+        self._runners: dict[str, tuple[Callable[[], Awaitable[Any]], contextvars.Context]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._deliveries: set[asyncio.Task] = set()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        """Start worker tasks. Must be called from the running event loop."""
+        self.num_workers = max(1, _env_int("JOB_WORKERS", 32))
+        self.max_queue = max(1, _env_int("JOB_QUEUE_SIZE", 1000))
+        self.retention = max(1, _env_int("JOB_RETENTION", 1000))
+        self.callback_max_attempts = max(1, _env_int("CALLBACK_MAX_ATTEMPTS", 5))
+        self.callback_backoff = _env_float("CALLBACK_BACKOFF_SECONDS", 1.0)
+        self.callback_backoff_max = _env_float("CALLBACK_BACKOFF_MAX_SECONDS", 60.0)
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._client = httpx.AsyncClient(timeout=_env_float("CALLBACK_TIMEOUT_SECONDS", 30.0))
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel workers and pending callback deliveries."""
+        for task in [*self._workers, *self._deliveries]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._deliveries, return_exceptions=True)
+        self._workers = []
+        self._deliveries.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def submit(
+        self,
+        kind: str,
+        run: Callable[[], Awaitable[Any]],
+        callback_url: Optional[str] = None
+    ) -> JobStatus:
+        """
+        Queue a job for background execution.
+
+        Args:
+            kind: Job type label (product, brand, competitor, prompts)
+            run: Zero-argument coroutine function producing the job result
+            callback_url: Optional URL the result is POSTed to on completion
+
+        Returns:
+            The queued job's status
+
+        Raises:
+            QueueFullError: If the queue is at capacity or not started
+        """
+        if self._queue is None:
+            raise QueueFullError("Job queue is not running")
+
+        job = JobStatus(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            created_at=time.time(),
+            callback_url=callback_url,
+            trace_id=current_trace_id()
+        )
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue} jobs waiting)")
+
+        self._jobs[job.job_id] = job
+        # The job runs in the submitting request's context, so its spans
+        # join the request's trace
+        self._runners[job.job_id] = (run, contextvars.copy_context())
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[JobStatus]:
+        """Look up a job by id."""
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        """Queue depth and job counts by status."""
+        counts: dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "workers": len(self._workers),
+            "jobs": counts,
+            "pending_callbacks": len(self._deliveries)
+        }
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs once retention is exceeded."""
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs.keys()):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status in ("succeeded", "failed"):
+                del self._jobs[job_id]
+                excess -= 1
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        job = self._jobs.get(job_id)
+        runner = self._runners.pop(job_id, None)
+        if job is None or runner is None:
+            return
+        run, context = runner
+
+        async def traced_run() -> Any:
+            # Count the job's tokens on their own; the submitting request was
+            # already recorded when it returned the job id
+            usage = start_request_usage()
+            try:
+                with span("job.run", job_id=job.job_id, kind=job.kind):
+                    return await run()
+            finally:
+                observe_request_usage(f"job:{job.kind}", usage)
+
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            result = await asyncio.create_task(traced_run(), context=context)
+            if isinstance(result, BaseModel):
+                result = result.model_dump(mode="json")
+            job.result = result
+            job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Job cancelled"
+            raise
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            print(f"[Jobs] Job {job_id} ({job.kind}) failed: {e}")
+        finally:
+            job.finished_at = time.time()
+
+        if job.callback_url:
+            job.callback_status = "pending"
+            task = asyncio.create_task(self._deliver(job))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    def _callback_payload(self, job: JobStatus) -> dict:
+        payload = dict(job.result or {})
+        payload["job_id"] = job.job_id
+        payload["job_status"] = job.status
+        if job.trace_id:
+            payload["trace_id"] = job.trace_id
+        if job.error:
+            payload["error"] = job.error
+        return payload
+
+    async def _deliver(self, job: JobStatus) -> None:
+        """POST the job result to its callback URL, retrying with backoff."""
+        payload = self._callback_payload(job)
+
+        for attempt in range(1, self.callback_max_attempts + 1):
+            job.callback_attempts = attempt
+            retryable = True
+            try:
+                response = await self._client.post(job.callback_url, json=payload)
+                if response.status_code < 400:
+                    job.callback_status = "delivered"
+                    return
+                retryable = response.status_code == 429 or response.status_code >= 500
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = str(e) or type(e).__name__
+
+            print(f"[Jobs] Callback for {job.job_id} attempt {attempt} failed: {error}")
+            if not retryable or attempt == self.callback_max_attempts:
+                break
+
+            delay = min(self.callback_backoff_max, self.callback_backoff * (2 ** (attempt - 1)))
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+        job.callback_status = "failed"
@@ -0,0 +1,166 @@
+"""
+LLM Clients - Process-wide pooled OpenAI clients shared by every direct LLM call
+"""
+import os
+import time
+import threading
+from typing import Any, Optional
+from pydantic import BaseModel
+
+
+_client: Optional[Any] = None
+_http_client: Optional[Any] = None
+_litellm_configured = False
+_lock = threading.Lock()
+
+
+def _client_settings() -> dict:
+    """Timeout, retry and pool settings from OPENAI_* environment variables."""
+    return {
+        "timeout": float(os.getenv("OPENAI_TIMEOUT", 60.0)),
+        "max_retries": int(os.getenv("OPENAI_MAX_RETRIES", 2)),
+        "max_connections": int(os.getenv("OPENAI_MAX_CONNECTIONS", 50)),
+        "max_keepalive": int(os.getenv("OPENAI_MAX_KEEPALIVE", 20)),
+    }
+
+
+def _limits(settings: dict):
+    import httpx
+    return httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive"]
+    )
+
+
+def init_llm_clients():
+    """
+    Create the shared sync OpenAI client and its connection pool.
+    Called at application startup; safe to call more than once.
+
+    Returns:
+        The shared openai.OpenAI client
+    """
+    global _client, _http_client
+    with _lock:
+        if _client is None:
+            import openai
+
+            settings = _client_settings()
+            _http_client = openai.DefaultHttpxClient(
+                limits=_limits(settings),
+                timeout=settings["timeout"]
+            )
+            _client = openai.OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                timeout=settings["timeout"],
+                max_retries=settings["max_retries"],
+                http_client=_http_client
+            )
+        return _client
+
+
+def get_openai_client():
+    """Return the shared sync OpenAI client, creating it on first use."""
+    client = _client
+    if client is None:
+        client = init_llm_clients()
+    return client
+
+
+def _strict_schema(node: Any) -> Any:
+    """Rewrite a JSON schema in place for strict mode (see json_schema_response_format)."""
+    if isinstance(node, list):
+        for item in node:
+            _strict_schema(item)
+        return node
+    if not isinstance(node, dict):
+        return node
+
+    node.pop("default", None)
+    if isinstance(node.get("title"), str):
+        node.pop("title")
+    properties = node.get("properties")
+    if isinstance(properties, dict):
+        node["required"] = list(properties)
+        node["additionalProperties"] = False
+        for schema in properties.values():
+            _strict_schema(schema)
+    for key in ("items", "anyOf", "allOf", "$defs"):
+        if key in node:
+            _strict_schema(list(node[key].values()) if key == "$defs" else node[key])
+    return node
+
+
+def json_schema_response_format(model: type[BaseModel]) -> dict:
+    """
+    OpenAI structured-output response_format derived from a pydantic model.
+
+    Strict mode requires every property to be listed as required, and allows
+    no defaults or additional properties, so the model's schema is adjusted
+    accordingly; the model still applies its defaults when validating.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model.__name__.lstrip("_"),
+            "strict": True,
+            "schema": _strict_schema(model.model_json_schema()),
+        },
+    }
+
+
+def configure_crewai_llm_pool() -> None:
+    """
+    Point LiteLLM (used by CrewAI agents) at the shared connection pool, so
+    crew LLM calls also reuse connections, and report those calls to the
+    metrics and traces. Does nothing if LiteLLM isn't installed.
+    """
+    global _litellm_configured
+    if _litellm_configured:
+        return
+    try:
+        import litellm
+    except ImportError:
+        return
+
+    from metrics import litellm_success_callback, litellm_failure_callback
+    from tracing import tracing_enabled, make_litellm_tracer
+
+    get_openai_client()
+    with _lock:
+        if not _litellm_configured:
+            litellm.client_session = _http_client
+            litellm.success_callback.append(litellm_success_callback)
+            litellm.failure_callback.append(litellm_failure_callback)
+            if tracing_enabled():
+                litellm.callbacks.append(make_litellm_tracer())
+            _litellm_configured = True
+
+
+def warm_up_crewai() -> None:
+    """
+    Import CrewAI and configure its LLM pool ahead of the first crew request.
+    Run in the background at startup when CREWAI_WARMUP is on; otherwise the
+    first crew-backed request pays for the import.
+    """
+    start = time.perf_counter()
+    try:
+        import crewai  # noqa: F401
+        import crewai.tools  # noqa: F401
+    except ImportError as e:
+        print(f"[LLM Clients] CrewAI warm-up skipped: {e}")
+        return
+    configure_crewai_llm_pool()
+    print(f"[LLM Clients] CrewAI loaded in {time.perf_counter() - start:.2f}s")
+
+
+def close_llm_clients() -> None:
+    """Close the shared client. Called at application shutdown."""
+    global _client, _http_client
+    with _lock:
+        client = _client
+        _client = None
+        _http_client = None
+
+    if client is not None:
+        client.close()
@@ -0,0 +1,271 @@
+"""
+LLM JSON - Tolerant, incremental extraction of the JSON object in an LLM reply
+
+Not named json_repair: CrewAI imports the PyPI package of that name, and
+the service runs from agents/, where a local module would shadow it.
+"""
+import json
+from typing import Optional
+
+
+# Bare words LLMs write in place of JSON literals
+_LITERALS = {
+    "true": "true", "True": "true",
+    "false": "false", "False": "false",
+    "null": "null", "None": "null", "NaN": "null", "undefined": "null",
+}
+
+# How many "{" positions to try when prose before the JSON contains braces
+_MAX_CANDIDATES = 8
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONRepairError(json.JSONDecodeError):
+    """Raised when no JSON object can be recovered from the text"""
+
+
+class JSONStreamParser:
+    """
+    Incrementally rewrites an LLM's JSON object into strict JSON as text
+    arrives, starting at the first "{".
+
+    Tolerated defects: code fences and prose around the object, trailing
+    commas, // comments, single-quoted strings, unquoted keys, Python
+    literals (None/True/False) and raw newlines inside strings. Anything
+    after the outermost object closes is ignored.
+
+    If the text stops early, snapshot() closes the object at the last
+    complete value, so a truncated reply still yields every sub-object that
+    was fully written.
+    """
+
+    def __init__(self):
+        self._out: list[str] = []
+        # One frame per open container: [opener, expecting a value (objects only)]
+        self._stack: list[list] = []
+        self._quote: Optional[str] = None
+        self._escape = False
+        self._string_is_key = False
+        self._scalar: list[str] = []
+        self._comment = False
+        # Last point where everything emitted so far forms complete values:
+        # (length of output, openers still open)
+        self._safe: Optional[tuple[int, tuple[str, ...]]] = None
+        self.started = False
+        self.done = False
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next piece of text."""
+        for char in chunk:
+            if self.done:
+                return
+            self._consume(char)
+
+    @property
+    def depth(self) -> int:
+        """Containers currently open (1 while inside the top-level object only)."""
+        return len(self._stack)
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the object is still open (the text so far stops mid-object)."""
+        return self.started and not self.done
+
+    def text(self) -> Optional[str]:
+        """
+        Strict JSON for the object so far: the complete object, or the
+        truncated one closed at its last complete value. None if nothing
+        complete has been seen yet.
+        """
+        if self.done:
+            return "".join(self._out)
+        if self._safe is None:
+            return None
+        length, openers = self._safe
+        text = "".join(self._out[:length]).rstrip()
+        if text.endswith(","):
+            text = text[:-1]
+        return text + "".join(_CLOSERS[opener] for opener in reversed(openers))
+
+    def snapshot(self) -> Optional[dict]:
+        """The object parsed from the text so far (see text()), or None."""
+        text = self.text()
+        if text is None:
+            return None
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) else None
+
+    def _consume(self, char: str) -> None:
+        if not self.started:
+            if char == "{":
+                self.started = True
+                self._open(char)
+            return
+
+        if self._quote is not None:
+            self._consume_string(char)
+            return
+
+        if self._comment:
+            if char == "\n":
+                self._comment = False
+            return
+
+        if char in "\"'":
+            self._end_scalar()
+            self._quote = char
+            frame = self._stack[-1]
+            self._string_is_key = frame[0] == "{" and not frame[1]
+            self._out.append('"')
+        elif char in "{[":
+            self._end_scalar()
+            self._open(char)
+        elif char in "}]":
+            self._end_scalar()
+            self._close()
+        elif char == ",":
+            self._end_scalar()
+            self._drop_trailing_comma()
+            self._out.append(",")
+            if self._stack[-1][0] == "{":
+                self._stack[-1][1] = False
+        elif char == ":":
+            self._end_scalar()
+            self._out.append(":")
+            self._stack[-1][1] = True
+        elif char.isspace():
+            self._end_scalar()
+            self._out.append(char)
+        elif char == "/" and self._scalar == ["/"]:
+            self._scalar = []
+            self._comment = True
+        else:
+            self._scalar.append(char)
+
+    def _consume_string(self, char: str) -> None:
+        if self._escape:
+            self._escape = False
+            if char == "'":
+                # \' is not a JSON escape; replace the backslash
+                self._out[-1] = "'"
+            else:
+                self._out.append(char)
+            return
+        if char == "\\":
+            self._escape = True
+            self._out.append(char)
+        elif char == self._quote:
+            self._quote = None
+            self._out.append('"')
+            if not self._string_is_key:
+                self._value_done()
+        elif char == '"':
+            self._out.append('\\"')
+        elif char == "\n":
+            self._out.append("\\n")
+        elif char == "\r":
+            self._out.append("\\r")
+        elif char == "\t":
+            self._out.append("\\t")
+        else:
+            self._out.append(char)
+
+    def _open(self, opener: str) -> None:
+        self._stack.append([opener, False])
+        self._out.append(opener)
+
+    def _close(self) -> None:
+        self._drop_trailing_comma()
+        opener = self._stack.pop()[0]
+        # Close with the bracket matching the opener, even if the model mixed them up
+        self._out.append(_CLOSERS[opener])
+        if not self._stack:
+            self.done = True
+            return
+        self._value_done()
+
+    def _end_scalar(self) -> None:
+        if not self._scalar:
+            return
+        word = "".join(self._scalar)
+        self._scalar = []
+        frame = self._stack[-1]
+        if frame[0] == "{" and not frame[1]:
+            # Unquoted key
+            self._out.append(json.dumps(word))
+            return
+        self._out.append(_LITERALS.get(word, word))
+        self._value_done()
+
+    def _value_done(self) -> None:
+        frame = self._stack[-1]
+        if frame[0] == "[" or frame[1]:
+            self._safe = (len(self._out), tuple(f[0] for f in self._stack))
+
+    def _drop_trailing_comma(self) -> None:
+        index = len(self._out) - 1
+        while index >= 0 and self._out[index].isspace():
+            index -= 1
+        if index >= 0 and self._out[index] == ",":
+            del self._out[index]
+
+
+def _fenced_body(text: str) -> str:
+    """The contents of the first ```json (or ```) fence, or the text itself."""
+    for fence in ("```json", "```JSON", "```"):
+        start = text.find(fence)
+        if start == -1:
+            continue
+        body = text[start + len(fence):]
+        end = body.find("```")
+        return body if end == -1 else body[:end]
+    return text
+
+
+def extract_json_object(text: str) -> tuple[dict, bool]:
+    """
+    Extract the JSON object from an LLM reply, repairing common defects
+    and salvaging the complete part of a truncated reply.
+
+    Args:
+        text: Raw model or crew output
+
+    Returns:
+        The parsed object, and whether it was salvaged from truncated output
+
+    Raises:
+        JSONRepairError: If no object can be recovered
+    """
+    text = text or ""
+    body = _fenced_body(text).strip()
+    try:
+        value = json.loads(body)
+        if isinstance(value, dict):
+            return value, False
+    except json.JSONDecodeError:
+        pass
+
+    # Prose before the object may itself contain braces, so try a few starts
+    position = -1
+    for _ in range(_MAX_CANDIDATES):
+        position = body.find("{", position + 1)
+        if position == -1:
+            break
+        parser = JSONStreamParser()
+        parser.feed(body[position:])
+        value = parser.snapshot()
+        if value:
+            if parser.truncated:
+                print(f"[LLM JSON] Output truncated, salvaged {len(value)} top-level fields")
+            return value, parser.truncated
+
+    raise JSONRepairError("No JSON object found in output", text, 0)
+
+
+def parse_json_object(text: str) -> dict:
+    """extract_json_object() for callers that don't need to know about truncation."""
+    return extract_json_object(text)[0]
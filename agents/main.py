@@ -2,24 +2,74 @@
 Product Research API - FastAPI server for CrewAI product research
 """
 import os
+import json
+import time
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager
 from typing import Optional
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 from product_crew import research_product, ProductInfo
-from brand_crew import research_brand, BrandInfo
-from competitor_crew import research_competitors, CompetitorAnalysis
+from brand_crew import research_brand, BrandInfo, scrape_flight
+from competitor_crew import research_competitors_async, CompetitorAnalysis
+from competitor_kb import get_competitor_kb
+from query_planner import get_yield_stats
 from prompt_crew import generate_prompts_fast, generate_prompts_for_brand, PromptGenerationResult
+from executor import run_in_pool, get_pool_size, pool_stats, shutdown_pools
+from jobs import JobManager, QueueFullError
+from http_client import init_http_client, close_http_client, close_async_http_client
+from serpapi import get_search_cache, search_flight, async_search_flight
+from rate_limit import rate_limit_stats
+from progress import ProgressStream, bind_stream, format_event
+from llm_clients import init_llm_clients, close_llm_clients, warm_up_crewai
+from response_cache import ResponseCache, response_key, normalize_text, canonical_url
+from deadline import deadline_scope, run_with_deadline, salvage
+from metrics import (
+    HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS,
+    start_request_usage, observe_request_usage, update_queue_gauges, render
+)
+from tracing import init_tracing, shutdown_tracing, span, set_attributes, current_trace_id
 
 # Load environment variables
 load_dotenv()
 
+jobs = JobManager()
+responses = ResponseCache()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start up and tear down process-wide resources"""
+    init_tracing()
+    init_http_client()
+    init_llm_clients()
+    await jobs.start()
+    if os.getenv("CREWAI_WARMUP", "false").lower() in ("1", "true", "yes"):
+        # Load CrewAI off the event loop; the service is already serving the fast paths meanwhile
+        asyncio.get_running_loop().run_in_executor(None, warm_up_crewai)
+    yield
+    await jobs.stop()
+    shutdown_pools()
+    close_http_client()
+    await close_async_http_client()
+    close_llm_clients()
+    await responses.close()
+    search_cache = get_search_cache()
+    if search_cache is not None:
+        search_cache.close()
+    shutdown_tracing()
+
+
 app = FastAPI(
     title="Product Research API",
     description="CrewAI-powered product research service with autonomous web search",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -32,12 +82,150 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Latency, in-flight count and LLM tokens per endpoint.
+
+    call_next returns once headers are ready, but streaming endpoints keep
+    working while their body is sent, so everything is recorded when the
+    body finishes.
+    """
+    HTTP_IN_FLIGHT.inc()
+    usage = start_request_usage()
+    start = time.perf_counter()
+
+    def finish(status: int) -> None:
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_REQUEST_SECONDS.labels(request.method, path, str(status)).observe(time.perf_counter() - start)
+        observe_request_usage(path, usage)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish(500)
+        raise
+
+    body = response.body_iterator
+
+    async def body_then_finish():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish(response.status_code)
+
+    response.body_iterator = body_then_finish()
+    return response
+
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """Root span per request; the trace id is returned in X-Trace-Id"""
+    with span(f"{request.method} {request.url.path}", http_method=request.method) as current:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        set_attributes(current, http_route=getattr(route, "path", None), http_status_code=response.status_code)
+        trace_id = current_trace_id()
+        if trace_id:
+            response.headers["X-Trace-Id"] = trace_id
+        return response
+
+
+class JobSubmission(BaseModel):
+    """Response returned when a request is accepted in async mode"""
+    job_id: str
+    status: str
+    status_url: str
+    trace_id: Optional[str] = None
+
+
+def submit_job(kind: str, run, callback_url: Optional[str]) -> JSONResponse:
+    """
+    Queue a request for background execution and acknowledge it immediately.
+
+    Args:
+        kind: Job type label
+        run: Zero-argument coroutine function that produces the response payload
+        callback_url: URL the result will be POSTed to when the job finishes
+
+    Returns:
+        202 response carrying the job id
+    """
+    try:
+        job = jobs.submit(kind, run, callback_url)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    submission = JobSubmission(
+        job_id=job.job_id,
+        status=job.status,
+        status_url=f"/jobs/{job.job_id}",
+        trace_id=job.trace_id
+    )
+    return JSONResponse(status_code=202, content=submission.model_dump())
+
+
+def stream_progress(run, fmt: str) -> StreamingResponse:
+    """
+    Run a request in the background and stream its progress events.
+
+    Emits a "started" event immediately, then every progress event the
+    crews and tools report, then a final "result" (or "error") event
+    carrying the same payload the non-streaming endpoint returns.
+
+    Args:
+        run: Zero-argument coroutine function that produces the response payload
+        fmt: "ndjson" for newline-delimited JSON or "sse" for Server-Sent Events
+
+    Returns:
+        Streaming response
+    """
+    if fmt not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+
+    async def events():
+        stream = ProgressStream(asyncio.get_running_loop())
+        context = contextvars.copy_context()
+        bind_stream(context, stream)
+        task = asyncio.create_task(run(), context=context)
+        task.add_done_callback(lambda _: stream.close())
+
+        try:
+            yield format_event({"event": "started", "timestamp": time.time()}, fmt)
+            async for event in stream.events():
+                yield format_event(event, fmt)
+
+            try:
+                result = task.result()
+            except Exception as e:
+                yield format_event({"event": "error", "timestamp": time.time(), "error": str(e)}, fmt)
+            else:
+                if isinstance(result, BaseModel):
+                    result = result.model_dump(mode="json")
+                yield format_event({"event": "result", "timestamp": time.time(), "data": result}, fmt)
+        finally:
+            task.cancel()
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 class ProductResearchRequest(BaseModel):
     """Request model for product research"""
     product_id: str
     product_name: str
     user_id: str
     callback_url: Optional[str] = None
+    async_mode: bool = False  # Return a job id immediately and POST the result to callback_url
+    force_refresh: bool = False  # Ignore cached responses and re-run the research
+    deadline_seconds: Optional[float] = None  # Time budget; returns a partial result when exceeded
 
 
 class ProductResearchResponse(BaseModel):
@@ -51,23 +239,84 @@ class ProductResearchResponse(BaseModel):
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "product-research-api", "version": "2.0.0"}
-
+    return {
+        "status": "healthy",
+        "service": "product-research-api",
+        "version": "2.0.0",
+        "pools": pool_stats(),
+        "jobs": jobs.stats()
+    }
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the search and response caches and in-flight deduplication"""
+    search_cache = get_search_cache()
+    return {
+        "search": search_cache.stats() if search_cache is not None else None,
+        "responses": responses.stats(),
+        "query_yield": get_yield_stats().stats(),
+        "single_flight": {
+            "serpapi": search_flight.stats(),
+            "serpapi_async": async_search_flight.stats(),
+            "scrape": scrape_flight.stats()
+        }
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    update_queue_gauges(pool_stats(), jobs.stats(), rate_limit_stats())
+    content, content_type = render()
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/rate-limits")
+async def rate_limits():
+    """Queue depth, call counts and quota usage per outbound provider"""
+    return rate_limit_stats()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Report the status (and result, once finished) of an async job"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+def _is_parse_error(description: Optional[str]) -> bool:
+    """Crews report unparseable output as an error description; never cache those."""
+    return (description or "").startswith("Error parsing result")
+
+
+async def _run_product_research(
+    request: ProductResearchRequest,
+    family: str = "product"
+) -> ProductInfo:
+    # Run CrewAI research (agent will do its own searches), unless a cached result is fresh
+    # A deadline shapes the computation (its budget, cut-offs and salvage
+    # fields), so requests with one never share in-flight work
+    with deadline_scope(request.deadline_seconds) as deadline:
+        return await run_with_deadline(
+            deadline,
+            lambda: responses.get_or_compute(
+                response_key("product", product_name=normalize_text(request.product_name)),
+                ProductInfo,
+                lambda: run_in_pool(family, research_product, request.product_name),
+                force_refresh=request.force_refresh,
+                cacheable=lambda info: not info.partial and not _is_parse_error(info.description),
+                coalesce=deadline is None
+            ),
+            lambda fields: salvage(ProductInfo, fields, name=request.product_name)
+        )
 
-@app.post("/research", response_model=ProductResearchResponse)
-async def research_product_endpoint(request: ProductResearchRequest):
-    """
-    Research a product using CrewAI with autonomous web search.
 
-    The agent will:
-    1. Search for the product to get general info and pricing
-    2. Search for ingredients
-    3. Search for reviews and claims
-    4. Compile comprehensive product information
-    """
+async def _research_product(request: ProductResearchRequest) -> ProductResearchResponse:
     try:
-        # Run CrewAI research (agent will do its own searches)
-        product_info = research_product(request.product_name)
+        product_info = await _run_product_research(request)
 
         return ProductResearchResponse(
             success=True,
@@ -83,48 +332,165 @@ async def research_product_endpoint(request: ProductResearchRequest):
         )
 
 
+@app.post("/research", response_model=ProductResearchResponse)
+async def research_product_endpoint(request: ProductResearchRequest):
+    """
+    Research a product using CrewAI with autonomous web search.
+
+    The agent will:
+    1. Search for the product to get general info and pricing
+    2. Search for ingredients
+    3. Search for reviews and claims
+    4. Compile comprehensive product information
+    """
+    if request.async_mode:
+        return submit_job("product", lambda: _research_product(request), request.callback_url)
+    return await _research_product(request)
+
+
+def _product_simple_payload(request: ProductResearchRequest, product_info: ProductInfo) -> dict:
+    # Return in format expected by n8n workflow
+    return {
+        "product_id": request.product_id,
+        "user_id": request.user_id,
+        "callback_url": request.callback_url,
+        "updateData": {
+            "name": product_info.name,
+            "brand": product_info.brand,
+            "description": product_info.description,
+            "ingredients": product_info.ingredients,
+            "claims": product_info.claims,
+            "price": product_info.price,
+            "target_audience": product_info.target_audience,
+            "main_category": product_info.main_category,
+            "sub_category": product_info.sub_category,
+            "product_type": product_info.product_type,
+            "what_it_does": product_info.what_it_does,
+            "main_difference": product_info.main_difference,
+            "status": "ready",
+            "partial": product_info.partial
+        }
+    }
+
+
+@app.post("/research/stream")
+async def research_product_stream(
+    request: ProductResearchRequest,
+    fmt: str = Query("ndjson", alias="format")
+):
+    """
+    Streaming variant of /research. Emits tool calls, search results and
+    partial fields as the agent works, then the final response.
+    """
+    return stream_progress(lambda: _research_product(request), fmt)
+
+
+async def _research_product_simple(request: ProductResearchRequest) -> dict:
+    product_info = await _run_product_research(request)
+    return _product_simple_payload(request, product_info)
+
+
 @app.post("/research/simple")
 async def research_product_simple(request: ProductResearchRequest):
     """
     Simplified research endpoint that returns data in n8n-compatible format.
     The agent autonomously searches for product information.
     """
+    if request.async_mode:
+        return submit_job("product", lambda: _research_product_simple(request), request.callback_url)
     try:
-        # Run CrewAI research (agent will do its own searches)
-        product_info = research_product(request.product_name)
-
-        # Return in format expected by n8n workflow
-        return {
-            "product_id": request.product_id,
-            "user_id": request.user_id,
-            "callback_url": request.callback_url,
-            "updateData": {
-                "name": product_info.name,
-                "brand": product_info.brand,
-                "description": product_info.description,
-                "ingredients": product_info.ingredients,
-                "claims": product_info.claims,
-                "price": product_info.price,
-                "target_audience": product_info.target_audience,
-                "main_category": product_info.main_category,
-                "sub_category": product_info.sub_category,
-                "product_type": product_info.product_type,
-                "what_it_does": product_info.what_it_does,
-                "main_difference": product_info.main_difference,
-                "status": "ready"
-            }
-        }
-
+        return await _research_product_simple(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class BatchResearchRequest(BaseModel):
+    """Request model for batch product research"""
+    items: list[ProductResearchRequest]
+    max_parallel: Optional[int] = None  # Defaults to BATCH_POOL_SIZE
+
+
+@app.post("/research/batch")
+async def research_product_batch(request: BatchResearchRequest):
+    """
+    Research many products with bounded parallelism.
+
+    Results are streamed back as NDJSON, one line per item in completion
+    order, followed by a summary line. A failed item is reported on its own
+    line and does not affect the rest of the batch. Items with the same
+    product name share a single crew run, and every item shares the search
+    cache. Batch work runs in its own pool so it can't starve interactive
+    requests.
+    """
+    max_items = int(os.getenv("BATCH_MAX_ITEMS", 1000))
+    if len(request.items) > max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(request.items)} items, the limit is {max_items}"
+        )
+
+    semaphore = asyncio.Semaphore(max(1, request.max_parallel or get_pool_size("batch")))
+    runs: dict[str, asyncio.Task] = {}
+
+    async def research(item: ProductResearchRequest) -> ProductInfo:
+        async with semaphore:
+            return await _run_product_research(item, family="batch")
+
+    def shared_run(item: ProductResearchRequest) -> asyncio.Task:
+        key = normalize_text(item.product_name)
+        if key not in runs:
+            runs[key] = asyncio.create_task(research(item))
+        return runs[key]
+
+    async def run_item(index: int, item: ProductResearchRequest) -> dict:
+        try:
+            product_info = await shared_run(item)
+            return {"type": "item", "index": index, "success": True, **_product_simple_payload(item, product_info)}
+        except Exception as e:
+            return {
+                "type": "item",
+                "index": index,
+                "success": False,
+                "product_id": item.product_id,
+                "user_id": item.user_id,
+                "error": str(e)
+            }
+
+    async def stream():
+        started = time.monotonic()
+        tasks = [asyncio.create_task(run_item(i, item)) for i, item in enumerate(request.items)]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                if line["success"]:
+                    succeeded += 1
+                yield json.dumps(line) + "\n"
+
+            yield json.dumps({
+                "type": "summary",
+                "total": len(tasks),
+                "succeeded": succeeded,
+                "failed": len(tasks) - succeeded,
+                "elapsed_seconds": round(time.monotonic() - started, 2)
+            }) + "\n"
+        finally:
+            # Client went away or the batch finished: drop anything still queued
+            for task in [*tasks, *runs.values()]:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 class BrandResearchRequest(BaseModel):
     """Request model for brand research"""
     website_url: str
     brand_name: Optional[str] = None
     user_id: str
     callback_url: Optional[str] = None
+    async_mode: bool = False
+    force_refresh: bool = False
+    deadline_seconds: Optional[float] = None
 
 
 class BrandResearchResponse(BaseModel):
@@ -134,19 +500,30 @@ class BrandResearchResponse(BaseModel):
     error: Optional[str] = None
 
 
-@app.post("/brand/research", response_model=BrandResearchResponse)
-async def research_brand_endpoint(request: BrandResearchRequest):
-    """
-    Research a brand from their website using CrewAI.
+async def _run_brand_research(request: BrandResearchRequest) -> BrandInfo:
+    # Run CrewAI brand research, unless a cached result is fresh
+    with deadline_scope(request.deadline_seconds) as deadline:
+        return await run_with_deadline(
+            deadline,
+            lambda: responses.get_or_compute(
+                response_key(
+                    "brand",
+                    website_url=canonical_url(request.website_url),
+                    brand_name=normalize_text(request.brand_name)
+                ),
+                BrandInfo,
+                lambda: run_in_pool("brand", research_brand, request.website_url, request.brand_name),
+                force_refresh=request.force_refresh,
+                cacheable=lambda info: not info.partial and not _is_parse_error(info.description),
+                coalesce=deadline is None
+            ),
+            lambda fields: salvage(BrandInfo, fields, name=request.brand_name or "Unknown")
+        )
 
-    The agent will:
-    1. Fetch and analyze the website content
-    2. Search for additional brand information if needed
-    3. Extract brand description, values, and suggested topics
-    """
+
+async def _research_brand(request: BrandResearchRequest) -> BrandResearchResponse:
     try:
-        # Run CrewAI brand research
-        brand_info = research_brand(request.website_url, request.brand_name)
+        brand_info = await _run_brand_research(request)
 
         return BrandResearchResponse(
             success=True,
@@ -160,36 +537,68 @@ async def research_brand_endpoint(request: BrandResearchRequest):
         )
 
 
+@app.post("/brand/research", response_model=BrandResearchResponse)
+async def research_brand_endpoint(request: BrandResearchRequest):
+    """
+    Research a brand from their website using CrewAI.
+
+    The agent will:
+    1. Fetch and analyze the website content
+    2. Search for additional brand information if needed
+    3. Extract brand description, values, and suggested topics
+    """
+    if request.async_mode:
+        return submit_job("brand", lambda: _research_brand(request), request.callback_url)
+    return await _research_brand(request)
+
+
+@app.post("/brand/research/stream")
+async def research_brand_stream(
+    request: BrandResearchRequest,
+    fmt: str = Query("ndjson", alias="format")
+):
+    """
+    Streaming variant of /brand/research. Emits page fetches, searches and
+    partial fields as the agent works, then the final response.
+    """
+    return stream_progress(lambda: _research_brand(request), fmt)
+
+
+async def _research_brand_simple(request: BrandResearchRequest) -> dict:
+    brand_info = await _run_brand_research(request)
+
+    # Return in format expected by n8n workflow
+    return {
+        "website_url": request.website_url,
+        "brand_name": request.brand_name,
+        "user_id": request.user_id,
+        "callback_url": request.callback_url,
+        "brandData": {
+            "name": brand_info.name,
+            "description": brand_info.description or "",
+            "tagline": brand_info.tagline,
+            "industry": brand_info.industry,
+            "target_audience": brand_info.target_audience,
+            "key_products": brand_info.key_products,
+            "brand_values": brand_info.brand_values,
+            "unique_selling_points": brand_info.unique_selling_points,
+            "tone_of_voice": brand_info.tone_of_voice,
+            "suggested_topics": brand_info.suggested_topics or [],
+            "partial": brand_info.partial
+        }
+    }
+
+
 @app.post("/brand/research/simple")
 async def research_brand_simple(request: BrandResearchRequest):
     """
     Simplified brand research endpoint that returns data in n8n-compatible format.
     The agent autonomously analyzes the brand website.
     """
+    if request.async_mode:
+        return submit_job("brand", lambda: _research_brand_simple(request), request.callback_url)
     try:
-        # Run CrewAI brand research
-        brand_info = research_brand(request.website_url, request.brand_name)
-
-        # Return in format expected by n8n workflow
-        return {
-            "website_url": request.website_url,
-            "brand_name": request.brand_name,
-            "user_id": request.user_id,
-            "callback_url": request.callback_url,
-            "brandData": {
-                "name": brand_info.name,
-                "description": brand_info.description or "",
-                "tagline": brand_info.tagline,
-                "industry": brand_info.industry,
-                "target_audience": brand_info.target_audience,
-                "key_products": brand_info.key_products,
-                "brand_values": brand_info.brand_values,
-                "unique_selling_points": brand_info.unique_selling_points,
-                "tone_of_voice": brand_info.tone_of_voice,
-                "suggested_topics": brand_info.suggested_topics or []
-            }
-        }
-
+        return await _research_brand_simple(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -203,6 +612,9 @@ class CompetitorResearchRequest(BaseModel):
     user_id: str
     request_id: Optional[str] = None
     callback_url: Optional[str] = None
+    async_mode: bool = False
+    force_refresh: bool = False
+    deadline_seconds: Optional[float] = None
 
 
 class CompetitorResearchResponse(BaseModel):
@@ -212,23 +624,39 @@ class CompetitorResearchResponse(BaseModel):
     error: Optional[str] = None
 
 
-@app.post("/competitors/research", response_model=CompetitorResearchResponse)
-async def research_competitors_endpoint(request: CompetitorResearchRequest):
-    """
-    Research competitors for a brand using CrewAI.
+async def _run_competitor_research(request: CompetitorResearchRequest) -> CompetitorAnalysis:
+    # Competitor research is natively async, so it runs on the event loop
+    with deadline_scope(request.deadline_seconds) as deadline:
+        return await run_with_deadline(
+            deadline,
+            lambda: responses.get_or_compute(
+                response_key(
+                    "competitor",
+                    brand_name=normalize_text(request.brand_name),
+                    brand_description=normalize_text(request.brand_description),
+                    industry=normalize_text(request.industry),
+                    topics=[normalize_text(t) for t in request.topics]
+                ),
+                CompetitorAnalysis,
+                lambda: research_competitors_async(
+                    brand_name=request.brand_name,
+                    brand_description=request.brand_description,
+                    industry=request.industry,
+                    topics=request.topics
+                ),
+                force_refresh=request.force_refresh,
+                cacheable=lambda analysis: not analysis.partial and bool(analysis.competitors),
+                coalesce=deadline is None
+            ),
+            lambda fields: salvage(
+                CompetitorAnalysis, fields, brand_name=request.brand_name, industry=request.industry
+            )
+        )
 
-    The agent will:
-    1. Search for direct competitors
-    2. Search for alternative solutions
-    3. Analyze the competitive landscape
-    """
+
+async def _research_competitors(request: CompetitorResearchRequest) -> CompetitorResearchResponse:
     try:
-        competitor_analysis = research_competitors(
-            brand_name=request.brand_name,
-            brand_description=request.brand_description,
-            industry=request.industry,
-            topics=request.topics
-        )
+        competitor_analysis = await _run_competitor_research(request)
 
         return CompetitorResearchResponse(
             success=True,
@@ -242,48 +670,88 @@ async def research_competitors_endpoint(request: CompetitorResearchRequest):
         )
 
 
+@app.post("/competitors/research", response_model=CompetitorResearchResponse)
+async def research_competitors_endpoint(request: CompetitorResearchRequest):
+    """
+    Research competitors for a brand using CrewAI.
+
+    The agent will:
+    1. Search for direct competitors
+    2. Search for alternative solutions
+    3. Analyze the competitive landscape
+    """
+    if request.async_mode:
+        return submit_job("competitor", lambda: _research_competitors(request), request.callback_url)
+    return await _research_competitors(request)
+
+
+@app.post("/competitors/research/stream")
+async def research_competitors_stream(
+    request: CompetitorResearchRequest,
+    fmt: str = Query("ndjson", alias="format")
+):
+    """
+    Streaming variant of /competitors/research. Emits each search result as
+    it arrives, then the final response.
+    """
+    return stream_progress(lambda: _research_competitors(request), fmt)
+
+
+async def _research_competitors_simple(request: CompetitorResearchRequest) -> dict:
+    competitor_analysis = await _run_competitor_research(request)
+
+    # Return in format expected by n8n workflow
+    return {
+        "brand_name": request.brand_name,
+        "user_id": request.user_id,
+        "request_id": request.request_id,
+        "callback_url": request.callback_url,
+        "competitorData": {
+            "brand_name": competitor_analysis.brand_name,
+            "industry": competitor_analysis.industry,
+            "competitors": [
+                {
+                    "name": c.name,
+                    "website": c.website,
+                    "description": c.description,
+                    "similarity_reason": c.similarity_reason,
+                    "strengths": c.strengths or [],
+                    "target_audience": c.target_audience
+                }
+                for c in competitor_analysis.competitors
+            ],
+            "market_position": competitor_analysis.market_position,
+            "competitive_landscape": competitor_analysis.competitive_landscape,
+            "partial": competitor_analysis.partial
+        }
+    }
+
+
 @app.post("/competitors/research/simple")
 async def research_competitors_simple(request: CompetitorResearchRequest):
     """
     Simplified competitor research endpoint that returns data in n8n-compatible format.
     """
+    if request.async_mode:
+        return submit_job("competitor", lambda: _research_competitors_simple(request), request.callback_url)
     try:
-        competitor_analysis = research_competitors(
-            brand_name=request.brand_name,
-            brand_description=request.brand_description,
-            industry=request.industry,
-            topics=request.topics
-        )
-
-        # Return in format expected by n8n workflow
-        return {
-            "brand_name": request.brand_name,
-            "user_id": request.user_id,
-            "request_id": request.request_id,
-            "callback_url": request.callback_url,
-            "competitorData": {
-                "brand_name": competitor_analysis.brand_name,
-                "industry": competitor_analysis.industry,
-                "competitors": [
-                    {
-                        "name": c.name,
-                        "website": c.website,
-                        "description": c.description,
-                        "similarity_reason": c.similarity_reason,
-                        "strengths": c.strengths or [],
-                        "target_audience": c.target_audience
-                    }
-                    for c in competitor_analysis.competitors
-                ],
-                "market_position": competitor_analysis.market_position,
-                "competitive_landscape": competitor_analysis.competitive_landscape
-            }
-        }
-
+        return await _research_competitors_simple(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/competitors/kb")
+async def competitor_kb_stats():
+    """Size and reload count of the known-competitor knowledge base"""
+    return get_competitor_kb().stats()
+
+
+@app.post("/competitors/kb/reload")
+async def reload_competitor_kb():
+    """Re-read the known-competitor knowledge base from disk"""
+    return get_competitor_kb().reload()
+
+
 class PromptGenerationRequest(BaseModel):
     """Request model for prompt generation"""
     brand_id: str
@@ -296,7 +764,11 @@ class PromptGenerationRequest(BaseModel):
     num_topics: int = 5
     prompts_per_topic: int = 5
     use_fast_mode: bool = True  # Use fast OpenAI API instead of CrewAI
+    fan_out: bool = True  # Fast mode: one call per topic instead of one large completion
     callback_url: Optional[str] = None
+    async_mode: bool = False
+    force_refresh: bool = False
+    deadline_seconds: Optional[float] = None
 
 
 class PromptGenerationResponse(BaseModel):
@@ -307,37 +779,57 @@ class PromptGenerationResponse(BaseModel):
     error: Optional[str] = None
 
 
-@app.post("/prompts/generate", response_model=PromptGenerationResponse)
-async def generate_prompts_endpoint(request: PromptGenerationRequest):
-    """
-    Generate research topics and prompts for AI visibility tracking.
+async def _run_prompt_generation(request: PromptGenerationRequest) -> PromptGenerationResult:
+    kwargs = dict(
+        brand_name=request.brand_name,
+        brand_description=request.brand_description,
+        topics=request.topics,
+        competitors=request.competitors,
+        num_topics=request.num_topics,
+        prompts_per_topic=request.prompts_per_topic
+    )
+
+    # Choose generation method based on request
+    if request.use_fast_mode:
+        compute = lambda: run_in_pool("prompts", generate_prompts_fast, fan_out=request.fan_out, **kwargs)
+    else:
+        compute = lambda: run_in_pool("prompts", generate_prompts_for_brand, **kwargs)
+
+    def salvage_prompts(fields: dict) -> PromptGenerationResult:
+        result = salvage(
+            PromptGenerationResult, fields,
+            brand_name=request.brand_name, industry=", ".join(request.topics) or "general"
+        )
+        result.total_prompts = sum(len(topic.prompts) for topic in result.topics)
+        return result
+
+    with deadline_scope(request.deadline_seconds) as deadline:
+        return await run_with_deadline(
+            deadline,
+            lambda: responses.get_or_compute(
+                response_key(
+                    "prompts",
+                    brand_name=normalize_text(request.brand_name),
+                    brand_description=normalize_text(request.brand_description),
+                    topics=[normalize_text(t) for t in request.topics],
+                    num_topics=request.num_topics,
+                    prompts_per_topic=request.prompts_per_topic,
+                    use_fast_mode=request.use_fast_mode,
+                    fan_out=request.fan_out and request.use_fast_mode  # crews ignore it
+                ),
+                PromptGenerationResult,
+                compute,
+                force_refresh=request.force_refresh,
+                cacheable=lambda result: not result.partial and result.total_prompts > 0,
+                coalesce=deadline is None
+            ),
+            salvage_prompts
+        )
 
-    The agent will:
-    1. Analyze the brand description and industry topics
-    2. Generate relevant research topics
-    3. Create consumer-style prompts for each topic
-    4. Return structured data for storage in Supabase
-    """
+
+async def _generate_prompts(request: PromptGenerationRequest) -> PromptGenerationResponse:
     try:
-        # Choose generation method based on request
-        if request.use_fast_mode:
-            result = generate_prompts_fast(
-                brand_name=request.brand_name,
-                brand_description=request.brand_description,
-                topics=request.topics,
-                competitors=request.competitors,
-                num_topics=request.num_topics,
-                prompts_per_topic=request.prompts_per_topic
-            )
-        else:
-            result = generate_prompts_for_brand(
-                brand_name=request.brand_name,
-                brand_description=request.brand_description,
-                topics=request.topics,
-                competitors=request.competitors,
-                num_topics=request.num_topics,
-                prompts_per_topic=request.prompts_per_topic
-            )
+        result = await _run_prompt_generation(request)
 
         return PromptGenerationResponse(
             success=True,
@@ -353,67 +845,96 @@ async def generate_prompts_endpoint(request: PromptGenerationRequest):
         )
 
 
+@app.post("/prompts/generate", response_model=PromptGenerationResponse)
+async def generate_prompts_endpoint(request: PromptGenerationRequest):
+    """
+    Generate research topics and prompts for AI visibility tracking.
+
+    The agent will:
+    1. Analyze the brand description and industry topics
+    2. Generate relevant research topics
+    3. Create consumer-style prompts for each topic
+    4. Return structured data for storage in Supabase
+    """
+    if request.async_mode:
+        return submit_job("prompts", lambda: _generate_prompts(request), request.callback_url)
+    return await _generate_prompts(request)
+
+
+@app.post("/prompts/generate/stream")
+async def generate_prompts_stream(
+    request: PromptGenerationRequest,
+    fmt: str = Query("ndjson", alias="format")
+):
+    """
+    Streaming variant of /prompts/generate. Emits LLM call and agent step
+    events as generation progresses, then the final response.
+    """
+    return stream_progress(lambda: _generate_prompts(request), fmt)
+
+
+async def _generate_prompts_simple(request: PromptGenerationRequest) -> dict:
+    result = await _run_prompt_generation(request)
+
+    # Return in format expected by n8n workflow for Supabase storage
+    return {
+        "brand_id": request.brand_id,
+        "brand_name": request.brand_name,
+        "user_id": request.user_id,
+        "organization_id": request.organization_id,
+        "callback_url": request.callback_url,
+        "generation_result": {
+            "brand_name": result.brand_name,
+            "industry": result.industry,
+            "total_prompts": result.total_prompts,
+            "topics": [
+                {
+                    "name": topic.name,
+                    "slug": topic.slug,
+                    "description": topic.description,
+                    "prompts": [
+                        {
+                            "prompt_text": prompt.prompt_text,
+                            "intent": prompt.intent,
+                            "expected_mentions": prompt.expected_mentions
+                        }
+                        for prompt in topic.prompts
+                    ]
+                }
+                for topic in result.topics
+            ],
+            "partial": result.partial
+        }
+    }
+
+
 @app.post("/prompts/generate/simple")
 async def generate_prompts_simple(request: PromptGenerationRequest):
     """
     Simplified prompt generation endpoint that returns data in n8n-compatible format.
     This is designed to be used in n8n workflows for storing in Supabase.
     """
+    if request.async_mode:
+        return submit_job("prompts", lambda: _generate_prompts_simple(request), request.callback_url)
     try:
-        # Choose generation method based on request
-        if request.use_fast_mode:
-            result = generate_prompts_fast(
-                brand_name=request.brand_name,
-                brand_description=request.brand_description,
-                topics=request.topics,
-                competitors=request.competitors,
-                num_topics=request.num_topics,
-                prompts_per_topic=request.prompts_per_topic
-            )
-        else:
-            result = generate_prompts_for_brand(
-                brand_name=request.brand_name,
-                brand_description=request.brand_description,
-                topics=request.topics,
-                competitors=request.competitors,
-                num_topics=request.num_topics,
-                prompts_per_topic=request.prompts_per_topic
-            )
-
-        # Return in format expected by n8n workflow for Supabase storage
-        return {
-            "brand_id": request.brand_id,
-            "brand_name": request.brand_name,
-            "user_id": request.user_id,
-            "organization_id": request.organization_id,
-            "callback_url": request.callback_url,
-            "generation_result": {
-                "brand_name": result.brand_name,
-                "industry": result.industry,
-                "total_prompts": result.total_prompts,
-                "topics": [
-                    {
-                        "name": topic.name,
-                        "slug": topic.slug,
-                        "description": topic.description,
-                        "prompts": [
-                            {
-                                "prompt_text": prompt.prompt_text,
-                                "intent": prompt.intent,
-                                "expected_mentions": prompt.expected_mentions
-                            }
-                            for prompt in topic.prompts
-                        ]
-                    }
-                    for topic in result.topics
-                ]
-            }
-        }
-
+        return await _generate_prompts_simple(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/prompts/generate/simple/stream")
+async def generate_prompts_simple_stream(
+    request: PromptGenerationRequest,
+    fmt: str = Query("ndjson", alias="format")
+):
+    """
+    Streaming variant of /prompts/generate/simple. Fast mode emits a "topic"
+    event with each generated topic as soon as it is complete, then the
+    final n8n-format payload as the "result" event.
+    """
+    return stream_progress(lambda: _generate_prompts_simple(request), fmt)
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
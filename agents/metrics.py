@@ -0,0 +1,180 @@
+"""
+Metrics - Prometheus metrics for endpoints, outbound providers, caches, crews and LLM usage
+"""
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+
+# Crew runs and LLM calls take seconds to minutes, so buckets extend well past the defaults
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Endpoint latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled")
+
+PROVIDER_CALLS = Counter(
+    "provider_calls_total", "Outbound provider calls (each retry attempt counts)",
+    ["provider", "outcome"]
+)
+PROVIDER_SECONDS = Histogram(
+    "provider_call_duration_seconds", "Outbound provider call latency",
+    ["provider"], buckets=LATENCY_BUCKETS
+)
+
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by result", ["cache", "result"])
+
+CREW_KICKOFF_SECONDS = Histogram(
+    "crew_kickoff_duration_seconds", "Duration of crew.kickoff()", ["crew"], buckets=LATENCY_BUCKETS
+)
+CREW_ITERATIONS = Histogram(
+    "crew_iterations", "Agent steps per crew run", ["crew"], buckets=(1, 2, 3, 5, 8, 13, 20, 30, 50)
+)
+
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens used", ["model", "kind"])
+LLM_TOKENS_PER_REQUEST = Histogram(
+    "llm_tokens_per_request", "LLM tokens used while handling one request (or async job, as job:<kind>)", ["route"],
+    buckets=(100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+)
+
+QUEUED = Gauge("work_queued", "Work waiting for a worker", ["queue"])
+RUNNING = Gauge("work_running", "Work currently running", ["queue"])
+
+
+class RequestUsage:
+    """Token usage accumulated across every thread and task serving one request."""
+
+    def __init__(self):
+        self.tokens = 0
+
+
+_usage: contextvars.ContextVar[Optional[RequestUsage]] = contextvars.ContextVar("request_usage", default=None)
+_crew_steps: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("crew_steps", default=None)
+
+
+def start_request_usage() -> RequestUsage:
+    """Start counting tokens for the request running in the current context."""
+    usage = RequestUsage()
+    _usage.set(usage)
+    return usage
+
+
+def observe_request_usage(route: str, usage: RequestUsage) -> None:
+    """Record a finished request's (or job's) token total against its route."""
+    if usage.tokens:
+        LLM_TOKENS_PER_REQUEST.labels(route).observe(usage.tokens)
+
+
+def _add_request_tokens(tokens: int) -> None:
+    usage = _usage.get()
+    if usage is not None:
+        usage.tokens += tokens
+
+
+@contextmanager
+def track_provider(provider: str) -> Iterator[None]:
+    """Time one outbound call and count it as ok or error."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        PROVIDER_CALLS.labels(provider, "error").inc()
+        raise
+    else:
+        PROVIDER_CALLS.labels(provider, "ok").inc()
+    finally:
+        PROVIDER_SECONDS.labels(provider).observe(time.perf_counter() - start)
+
+
+def record_llm_usage(model: str, usage: Any, count_for_request: bool = True) -> None:
+    """
+    Count tokens from an OpenAI/LiteLLM usage object (or dict).
+
+    Args:
+        model: Model name
+        usage: Object with prompt_tokens / completion_tokens
+        count_for_request: Also add to the current request's total
+    """
+    if usage is None:
+        return
+    get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+    prompt = get("prompt_tokens") or 0
+    completion = get("completion_tokens") or 0
+    LLM_TOKENS.labels(model, "prompt").inc(prompt)
+    LLM_TOKENS.labels(model, "completion").inc(completion)
+    if count_for_request:
+        _add_request_tokens(prompt + completion)
+
+
+@contextmanager
+def track_crew(crew: str) -> Iterator[None]:
+    """Time a crew run and count the agent steps it takes."""
+    steps = []
+    token = _crew_steps.set(steps)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        CREW_KICKOFF_SECONDS.labels(crew).observe(time.perf_counter() - start)
+        CREW_ITERATIONS.labels(crew).observe(len(steps))
+        _crew_steps.reset(token)
+
+
+def record_crew_step() -> None:
+    steps = _crew_steps.get()
+    if steps is not None:
+        steps.append(1)
+
+
+def record_crew_usage(result: Any, previous_total: int = 0) -> int:
+    """
+    Add a finished crew's token usage to the current request. LLM calls made
+    by crews are already counted globally by the LiteLLM callbacks.
+
+    Reused crews report usage accumulated over every run, so pass the total
+    seen after the previous run to count only this one.
+
+    Returns:
+        The crew's reported total, for the next call
+    """
+    usage = getattr(result, "token_usage", None)
+    tokens = getattr(usage, "total_tokens", None) or 0
+    run_tokens = tokens - previous_total if tokens >= previous_total else tokens
+    if run_tokens:
+        _add_request_tokens(run_tokens)
+    return tokens
+
+
+def litellm_success_callback(kwargs: dict, response: Any, start_time: Any, end_time: Any) -> None:
+    """LiteLLM success hook: provider latency and token counters for crew LLM calls."""
+    PROVIDER_CALLS.labels("openai", "ok").inc()
+    try:
+        PROVIDER_SECONDS.labels("openai").observe((end_time - start_time).total_seconds())
+    except (TypeError, AttributeError):
+        pass
+    record_llm_usage(kwargs.get("model", "unknown"), getattr(response, "usage", None), count_for_request=False)
+
+
+def litellm_failure_callback(kwargs: dict, response: Any, start_time: Any, end_time: Any) -> None:
+    """LiteLLM failure hook."""
+    PROVIDER_CALLS.labels("openai", "error").inc()
+
+
+def update_queue_gauges(pools: dict, jobs: dict, limiters: dict) -> None:
+    """Refresh queue depth gauges from executor, job queue and rate limiter stats."""
+    for family, stats in pools.items():
+        QUEUED.labels(f"pool:{family}").set(stats["queued"])
+        RUNNING.labels(f"pool:{family}").set(stats["running"])
+    QUEUED.labels("jobs").set(jobs["queued"])
+    RUNNING.labels("jobs").set(jobs["jobs"].get("running", 0))
+    for provider, stats in limiters.items():
+        QUEUED.labels(f"rate_limit:{provider}").set(stats["queue_depth"])
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -3,12 +3,21 @@ Product Research Crew - CrewAI agent for extracting product information
 """
 import os
 import json
-import httpx
-from typing import Optional
-from crewai import Agent, Task, Crew, Process
-from crewai.tools import tool
+from typing import TYPE_CHECKING, Optional
 from pydantic import BaseModel
 
+from serpapi import serpapi_search
+from progress import emit, crew_step_callback
+from llm_clients import configure_crewai_llm_pool
+from metrics import track_crew
+from tracing import span, traced
+from crew_templates import CrewTemplate
+from llm_json import extract_json_object
+from deadline import tool_cutoff, was_cut_off, partial_fields, salvage
+
+if TYPE_CHECKING:  # CrewAI is imported lazily, see crew_templates
+    from crewai import Crew
+
 
 class ProductInfo(BaseModel):
     """Structured product information"""
@@ -24,9 +33,10 @@ class ProductInfo(BaseModel):
     product_type: Optional[str] = None
     what_it_does: Optional[str] = None
     main_difference: Optional[str] = None
+    partial: bool = False  # See deadline.salvage
 
 
-@tool
+@traced("tool.search_google")
 def search_google(query: str) -> str:
     """
     Search Google for product information using SerpAPI.
@@ -41,18 +51,25 @@ def search_google(query: str) -> str:
     if not api_key:
         return "Error: SERPAPI_API_KEY not configured"
 
+    cutoff = tool_cutoff()
+    if cutoff:
+        return cutoff
+
+    emit("tool_started", tool="search_google", query=query)
     try:
-        url = "https://serpapi.com/search.json"
         params = {
             "q": query,
             "api_key": api_key,
             "engine": "google"
         }
 
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        data = serpapi_search(params)
+        emit(
+            "search_results",
+            tool="search_google",
+            query=query,
+            result_count=len(data.get("organic_results", [])) + len(data.get("immersive_products", []))
+        )
 
         extracted = []
 
@@ -101,24 +118,42 @@ def search_google(query: str) -> str:
         return "\n".join(extracted) if extracted else "No relevant results found"
 
     except Exception as e:
+        emit("tool_error", tool="search_google", query=query, error=str(e))
         return f"Search error: {str(e)}"
 
 
-def create_product_research_crew(product_name: str) -> Crew:
-    """
-    Create a CrewAI crew for product research.
+# Bound to {output_format} at kickoff (see CrewTemplate)
+PRODUCT_OUTPUT_FORMAT = """{
+            "name": "exact product name",
+            "brand": "brand name or null",
+            "description": "product description or null",
+            "ingredients": ["ingredient1", "ingredient2"] or null,
+            "claims": ["claim1", "claim2"] or null,
+            "price": "price string or null",
+            "target_audience": "target audience or null",
+            "main_category": "category or null",
+            "sub_category": "subcategory or null",
+            "product_type": "type or null",
+            "what_it_does": "description of what it does or null",
+            "main_difference": "unique selling point or null"
+        }"""
 
-    Args:
-        product_name: Name of the product to research
+
+def create_product_research_crew() -> "Crew":
+    """
+    Create the CrewAI crew for product research, with the product left as
+    a {product_name} placeholder bound at kickoff.
 
     Returns:
         Configured Crew instance
     """
+    from crewai import Agent, Task, Crew, Process
+    from crewai.tools import tool
 
     # Define the Product Research Agent
     researcher = Agent(
         role="Product Research Specialist",
-        goal=f"Research and extract comprehensive product information for '{product_name}'",
+        goal="Research and extract comprehensive product information for '{product_name}'",
         backstory="""You are an expert product researcher specializing in beauty, skincare, and consumer products.
         You have years of experience analyzing product information from various sources.
         You are meticulous about accuracy and NEVER make up information.
@@ -126,12 +161,12 @@ def create_product_research_crew(product_name: str) -> Crew:
         You may run multiple searches to gather comprehensive data about a product.""",
         verbose=True,
         allow_delegation=False,
-        tools=[search_google]
+        tools=[tool(search_google)]
     )
 
     # Define the research task
     research_task = Task(
-        description=f"""
+        description="""
         Research the product "{product_name}" thoroughly and extract the following information:
 
         1. Product Name - The official/full product name
@@ -162,20 +197,7 @@ def create_product_research_crew(product_name: str) -> Crew:
         - Be precise and accurate
         """,
         expected_output="""A JSON object with the extracted product information in this exact format:
-        {
-            "name": "exact product name",
-            "brand": "brand name or null",
-            "description": "product description or null",
-            "ingredients": ["ingredient1", "ingredient2"] or null,
-            "claims": ["claim1", "claim2"] or null,
-            "price": "price string or null",
-            "target_audience": "target audience or null",
-            "main_category": "category or null",
-            "sub_category": "subcategory or null",
-            "product_type": "type or null",
-            "what_it_does": "description of what it does or null",
-            "main_difference": "unique selling point or null"
-        }
+        {output_format}
 
         Return ONLY the JSON object, no other text.""",
         agent=researcher
@@ -186,12 +208,17 @@ def create_product_research_crew(product_name: str) -> Crew:
         agents=[researcher],
         tasks=[research_task],
         process=Process.sequential,
-        verbose=True
+        verbose=True,
+        cache=False,  # See CrewTemplate
+        step_callback=crew_step_callback
     )
 
     return crew
 
 
+product_crew_template = CrewTemplate("product", create_product_research_crew)
+
+
 def research_product(product_name: str) -> ProductInfo:
     """
     Research a product using the CrewAI crew.
@@ -202,25 +229,23 @@ def research_product(product_name: str) -> ProductInfo:
     Returns:
         ProductInfo with extracted data
     """
-    crew = create_product_research_crew(product_name)
-    result = crew.kickoff()
+    configure_crewai_llm_pool()
+    with track_crew("product"), span("crew.kickoff", crew="product", product_name=product_name):
+        result = product_crew_template.kickoff({
+            "product_name": product_name,
+            "output_format": PRODUCT_OUTPUT_FORMAT
+        })
 
     # Parse the result
     try:
-        # Get the raw output
-        output = str(result)
-
-        # Try to extract JSON from the output
-        # Sometimes the LLM wraps it in markdown code blocks
-        if "```json" in output:
-            output = output.split("```json")[1].split("```")[0]
-        elif "```" in output:
-            output = output.split("```")[1].split("```")[0]
-
-        # Parse the JSON
-        data = json.loads(output.strip())
-        return ProductInfo(**data)
+        data, truncated = extract_json_object(str(result))
+        product_info = ProductInfo(**data)
+        product_info.partial = was_cut_off() or truncated
+        return product_info
     except (json.JSONDecodeError, Exception) as e:
+        if was_cut_off():
+            # Keep whatever the agent produced before the deadline
+            return salvage(ProductInfo, partial_fields(), name=product_name)
         # Return basic info if parsing fails
         return ProductInfo(
             name=product_name,
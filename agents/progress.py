@@ -0,0 +1,128 @@
+"""
+Progress Events - Request-scoped progress reporting from crews and tools
+"""
+import json
+import time
+import asyncio
+import contextvars
+from typing import Any, AsyncIterator, Optional
+
+from deadline import current_deadline, record_partial
+from metrics import record_crew_step
+
+
+_current_stream: contextvars.ContextVar[Optional["ProgressStream"]] = contextvars.ContextVar(
+    "progress_stream", default=None
+)
+
+_CLOSED = object()
+
+
+class ProgressStream:
+    """
+    Thread-safe bridge from crew worker threads to an async consumer.
+
+    Events may be emitted from any thread; they are delivered in order to
+    the event loop that created the stream.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(self, event: str, **data: Any) -> None:
+        item = {"event": event, "timestamp": time.time(), **data}
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, _CLOSED)
+
+    async def events(self) -> AsyncIterator[dict]:
+        """Yield events until the stream is closed."""
+        while True:
+            item = await self._queue.get()
+            if item is _CLOSED:
+                return
+            yield item
+
+
+def bind_stream(context: contextvars.Context, stream: ProgressStream) -> None:
+    """Attach a stream to a context so work run inside it reports progress."""
+    context.run(_current_stream.set, stream)
+
+
+def is_streaming() -> bool:
+    """Whether the current request is streaming its progress."""
+    return _current_stream.get() is not None
+
+
+def emit(event: str, **data: Any) -> None:
+    """
+    Report a progress event for the current request.
+
+    A no-op when the request isn't streaming, so tools can call it freely.
+
+    Args:
+        event: Event name (tool_started, search_results, agent_step, partial, ...)
+        **data: JSON-serializable event fields
+    """
+    stream = _current_stream.get()
+    if stream is not None:
+        stream.emit(event, **data)
+
+
+def _preview(text: Any, limit: int = 300) -> str:
+    text = str(text or "")
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def crew_step_callback(step: Any) -> None:
+    """
+    CrewAI step_callback that reports each agent step.
+
+    Tool steps are reported with the tool name and input. Steps whose text
+    is a JSON object (typically the final answer) are also reported as
+    partial extracted fields, and recorded against the request's deadline.
+    """
+    record_crew_step()
+
+    if not is_streaming() and current_deadline() is None:
+        return
+
+    tool = getattr(step, "tool", None)
+    text = getattr(step, "text", None) or getattr(step, "output", None) or getattr(step, "result", None)
+
+    if tool:
+        emit("agent_step", tool=tool, tool_input=_preview(getattr(step, "tool_input", "")))
+    else:
+        emit("agent_step", text=_preview(text))
+
+    fields = _parse_fields(text)
+    if fields:
+        # Kept so a partial result can be salvaged if the deadline passes
+        record_partial(fields)
+        emit("partial", fields=fields)
+
+
+def _parse_fields(text: Any) -> Optional[dict]:
+    """Pull non-null fields out of a step's JSON output, if it has any."""
+    if not isinstance(text, str) or "{" not in text:
+        return None
+    start, end = text.find("{"), text.rfind("}")
+    if end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return {k: v for k, v in data.items() if v is not None} or None
+
+
+def format_event(event: dict, fmt: str) -> str:
+    """Serialize an event as an SSE frame or an NDJSON line."""
+    payload = json.dumps(event, default=str)
+    if fmt == "sse":
+        return f"event: {event['event']}\ndata: {payload}\n\n"
+    return payload + "\n"
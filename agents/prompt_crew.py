@@ -3,9 +3,24 @@ Prompt Generation Crew - Generates research topics and prompts for AI visibility
 """
 import os
 import json
-from typing import Optional
-from pydantic import BaseModel
-from crewai import Agent, Task, Crew, Process
+from concurrent.futures import wait
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+from pydantic import BaseModel, ValidationError
+
+from executor import submit_in_pool
+from rate_limit import get_limiter
+from progress import emit, is_streaming, crew_step_callback
+from llm_clients import get_openai_client, configure_crewai_llm_pool, json_schema_response_format
+from metrics import track_provider, track_crew, record_llm_usage
+from tracing import span
+from crew_templates import CrewTemplate
+from llm_json import JSONStreamParser, extract_json_object, parse_json_object
+from deadline import current_deadline, mark_cut_off, was_cut_off, request_timeout, append_partial
+
+if TYPE_CHECKING:  # CrewAI is imported lazily, see crew_templates
+    from crewai import Crew
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 
 class GeneratedPrompt(BaseModel):
@@ -15,11 +30,15 @@ class GeneratedPrompt(BaseModel):
     expected_mentions: list[str] = []  # brands expected to be mentioned
 
 
-class GeneratedTopic(BaseModel):
-    """A generated topic with its prompts"""
+class TopicOutline(BaseModel):
+    """A topic before its prompts are generated"""
     name: str
     slug: str
     description: str
+
+
+class GeneratedTopic(TopicOutline):
+    """A generated topic with its prompts"""
     prompts: list[GeneratedPrompt] = []
 
 
@@ -29,38 +48,57 @@ class PromptGenerationResult(BaseModel):
     industry: str
     topics: list[GeneratedTopic] = []
     total_prompts: int = 0
+    partial: bool = False  # See deadline.salvage
 
 
-def generate_prompts_for_brand(
-    brand_name: str,
-    brand_description: str,
-    topics: list[str],
-    competitors: list[str] = [],
-    num_topics: int = 5,
-    prompts_per_topic: int = 5
-) -> PromptGenerationResult:
-    """
-    Generate research topics and brand-agnostic prompts using CrewAI.
+class _TopicSelection(BaseModel):
+    """Structured output of fan-out stage 1"""
+    topics: list[TopicOutline]
 
-    The prompts are designed to be neutral/generic questions that:
-    1. Don't mention any specific brand names
-    2. Don't mention competitors
-    3. Ask general category/topic questions that reveal which brands AI recommends
-    4. Sound like natural consumer questions
 
-    Args:
-        brand_name: Name of the brand (used for context only, not in prompts)
-        brand_description: Description of what the brand does (used for topic generation)
-        topics: List of relevant topics/categories
-        competitors: List of competitor names (ignored - prompts are brand-agnostic)
-        num_topics: Number of topics to generate (default 5)
-        prompts_per_topic: Number of prompts per topic (default 5)
+class _TopicPrompts(BaseModel):
+    """Structured output of fan-out stage 2"""
+    prompts: list[GeneratedPrompt]
 
-    Returns:
-        PromptGenerationResult with generated topics and brand-agnostic prompts
+
+class _GeneratedTopics(BaseModel):
+    """Structured output of single-call generation"""
+    topics: list[GeneratedTopic]
+
+
+def _crew_output_format(brand_name: str, topics_str: str, total_prompts: int) -> str:
+    """The RETURN FORMAT block, bound to {output_format} at kickoff (see CrewTemplate)."""
+    return f"""{{
+    "brand_name": "{brand_name}",
+    "industry": "{topics_str}",
+    "topics": [
+        {{
+            "name": "Topic Name",
+            "slug": "topic-name",
+            "description": "Brief description of this topic area",
+            "prompts": [
+                {{
+                    "prompt_text": "The brand-agnostic question a consumer would ask",
+                    "intent": "visibility|recommendation|sentiment",
+                    "expected_mentions": []
+                }}
+            ]
+        }}
+    ],
+    "total_prompts": {total_prompts}
+}}"""
+
+
+def create_prompt_generation_crew() -> "Crew":
     """
+    Create the CrewAI crew for prompt generation, with {num_topics},
+    {prompts_per_topic}, {brand_description}, {topics_str} and
+    {output_format} placeholders bound at kickoff.
 
-    topics_str = ", ".join(topics) if topics else "general"
+    Returns:
+        Configured Crew instance
+    """
+    from crewai import Agent, Task, Crew, Process
 
     # Create the prompt strategist agent
     prompt_strategist = Agent(
@@ -83,7 +121,7 @@ def generate_prompts_for_brand(
 
     # Create the task
     generation_task = Task(
-        description=f"""Generate {num_topics} research topics and {prompts_per_topic} BRAND-AGNOSTIC prompts per topic.
+        description="""Generate {num_topics} research topics and {prompts_per_topic} BRAND-AGNOSTIC prompts per topic.
 
 CONTEXT (for understanding the industry - DO NOT use brand names in prompts):
 - Industry Description: {brand_description}
@@ -123,52 +161,71 @@ CRITICAL REQUIREMENTS:
    - Be specific to the topic/category
 
 RETURN FORMAT: Return a valid JSON object with this exact structure:
-{{
-    "brand_name": "{brand_name}",
-    "industry": "{topics_str}",
-    "topics": [
-        {{
-            "name": "Topic Name",
-            "slug": "topic-name",
-            "description": "Brief description of this topic area",
-            "prompts": [
-                {{
-                    "prompt_text": "The brand-agnostic question a consumer would ask",
-                    "intent": "visibility|recommendation|sentiment",
-                    "expected_mentions": []
-                }}
-            ]
-        }}
-    ],
-    "total_prompts": {num_topics * prompts_per_topic}
-}}
+{output_format}
 
 Generate diverse, high-quality BRAND-AGNOSTIC prompts that will reveal organic AI recommendations.""",
-        expected_output=f"A JSON object containing {num_topics} topics with {prompts_per_topic} brand-agnostic prompts each",
+        expected_output="A JSON object containing {num_topics} topics with {prompts_per_topic} brand-agnostic prompts each",
         agent=prompt_strategist
     )
 
-    # Create and run the crew
-    crew = Crew(
+    return Crew(
         agents=[prompt_strategist],
         tasks=[generation_task],
         process=Process.sequential,
-        verbose=True
+        verbose=True,
+        cache=False,  # See CrewTemplate
+        step_callback=crew_step_callback
     )
 
+
+prompt_crew_template = CrewTemplate("prompts", create_prompt_generation_crew)
+
+
+def generate_prompts_for_brand(
+    brand_name: str,
+    brand_description: str,
+    topics: list[str],
+    competitors: list[str] = [],
+    num_topics: int = 5,
+    prompts_per_topic: int = 5
+) -> PromptGenerationResult:
+    """
+    Generate research topics and brand-agnostic prompts using CrewAI.
+
+    The prompts are designed to be neutral/generic questions that:
+    1. Don't mention any specific brand names
+    2. Don't mention competitors
+    3. Ask general category/topic questions that reveal which brands AI recommends
+    4. Sound like natural consumer questions
+
+    Args:
+        brand_name: Name of the brand (used for context only, not in prompts)
+        brand_description: Description of what the brand does (used for topic generation)
+        topics: List of relevant topics/categories
+        competitors: List of competitor names (ignored - prompts are brand-agnostic)
+        num_topics: Number of topics to generate (default 5)
+        prompts_per_topic: Number of prompts per topic (default 5)
+
+    Returns:
+        PromptGenerationResult with generated topics and brand-agnostic prompts
+    """
+    topics_str = ", ".join(topics) if topics else "general"
+
+    configure_crewai_llm_pool()
+
     try:
-        result = crew.kickoff()
+        with track_crew("prompts"), span("crew.kickoff", crew="prompts", brand_name=brand_name):
+            result = prompt_crew_template.kickoff({
+                "num_topics": num_topics,
+                "prompts_per_topic": prompts_per_topic,
+                "brand_description": brand_description,
+                "topics_str": topics_str,
+                "output_format": _crew_output_format(brand_name, topics_str, num_topics * prompts_per_topic)
+            })
 
         # Parse the result
         output = str(result)
-
-        # Extract JSON from the response
-        if "```json" in output:
-            output = output.split("```json")[1].split("```")[0]
-        elif "```" in output:
-            output = output.split("```")[1].split("```")[0]
-
-        data = json.loads(output.strip())
+        data, truncated = extract_json_object(output)
 
         # Convert to Pydantic models
         generated_topics = []
@@ -200,7 +257,8 @@ Generate diverse, high-quality BRAND-AGNOSTIC prompts that will reveal organic A
             brand_name=brand_name,
             industry=topics_str,
             topics=generated_topics,
-            total_prompts=total_prompts
+            total_prompts=total_prompts,
+            partial=was_cut_off() or truncated
         )
 
     except json.JSONDecodeError as e:
@@ -222,21 +280,330 @@ Generate diverse, high-quality BRAND-AGNOSTIC prompts that will reveal organic A
         )
 
 
+def _structured_output_enabled() -> bool:
+    """
+    Whether fast generation uses the provider's JSON-schema response format
+    (PROMPT_STRUCTURED_OUTPUT) instead of asking for JSON in the prompt.
+    """
+    return os.getenv("PROMPT_STRUCTURED_OUTPUT", "false").lower() in ("1", "true", "yes")
+
+
+def _response_format(model: type[BaseModel], structured: bool) -> dict:
+    """Completion kwargs requesting structured output for a model, if enabled."""
+    return {"response_format": json_schema_response_format(model)} if structured else {}
+
+
+def _parse_structured(model: type[ModelT], output: Optional[str]) -> tuple[ModelT, bool]:
+    """
+    Validate a structured-output reply straight into its model.
+
+    Returns:
+        The model, and whether it was salvaged from a reply truncated at max_tokens
+    """
+    if not output:
+        raise ValueError("Empty structured output (refused or filtered)")
+    try:
+        return model.model_validate_json(output), False
+    except ValidationError:
+        # A reply cut off at max_tokens isn't valid JSON; keep its complete part
+        data, truncated = extract_json_object(output)
+        return model.model_validate(data), truncated
+
+
+def _build_prompts(prompt_list: list[dict]) -> list[GeneratedPrompt]:
+    return [
+        GeneratedPrompt(
+            prompt_text=prompt_data.get("prompt_text", ""),
+            intent=prompt_data.get("intent", "visibility"),
+            expected_mentions=prompt_data.get("expected_mentions", [])
+        )
+        for prompt_data in prompt_list
+    ]
+
+
+def _topic_slug(topic_data: dict) -> str:
+    slug = topic_data.get("slug", "")
+    if not slug:
+        slug = topic_data.get("name", "").lower().replace(" ", "-").replace("/", "-")
+    return slug
+
+
+def _topic_from_dict(topic_data: dict) -> GeneratedTopic:
+    return GeneratedTopic(
+        name=topic_data.get("name", ""),
+        slug=_topic_slug(topic_data),
+        description=topic_data.get("description", ""),
+        prompts=_build_prompts(topic_data.get("prompts", []))
+    )
+
+
+def _emit_topic(index: int, topic: GeneratedTopic) -> None:
+    """Report a finished topic, and keep it in case the hard deadline passes first."""
+    data = topic.model_dump()
+    append_partial("topics", data)
+    emit("topic", index=index, topic=data)
+
+
+def _stream_kwargs(streaming: bool) -> dict:
+    """Completion kwargs for a streamed reply that still reports token usage."""
+    return {"stream": True, "stream_options": {"include_usage": True}} if streaming else {}
+
+
+def _read_topic_stream(response) -> tuple[str, Any]:
+    """
+    Read a streamed single-call completion, emitting a "topic" event as soon
+    as each topic's object closes.
+
+    Returns:
+        The full reply text, and its usage (sent with the last chunk)
+    """
+    parser = JSONStreamParser()
+    parts = []
+    usage = None
+    reported = 0
+    for chunk in response:
+        usage = chunk.usage or usage
+        if not chunk.choices:
+            continue
+        text = chunk.choices[0].delta.content or ""
+        parts.append(text)
+        parser.feed(text)
+        # A topic can only complete on a closing brace
+        if "}" in text:
+            reported = _emit_completed_topics(parser, reported)
+    return "".join(parts), usage
+
+
+def _emit_completed_topics(parser: JSONStreamParser, reported: int) -> int:
+    """
+    Emit topics that have closed since the last call.
+
+    Returns:
+        How many topics have been reported so far
+    """
+    topics = (parser.snapshot() or {}).get("topics")
+    if not isinstance(topics, list):
+        return reported
+    # Between topics (depth 2) every listed topic is closed; deeper, the last one is still being written
+    complete = len(topics) if parser.done or parser.depth <= 2 else len(topics) - 1
+    for index in range(reported, complete):
+        if isinstance(topics[index], dict):
+            _emit_topic(index, _topic_from_dict(topics[index]))
+    return max(reported, complete)
+
+
+def _select_topics(
+    client,
+    system_prompt: str,
+    brand_description: str,
+    topics_str: str,
+    num_topics: int
+) -> list[dict]:
+    """
+    Fan-out stage 1: one small completion that only picks the topic list.
+
+    Returns:
+        Topic dicts with name, slug and description
+    """
+    structured = _structured_output_enabled()
+    user_prompt = f"""Choose {num_topics} distinct research topics for AI visibility tracking.
+
+CONTEXT (for understanding the industry only - DO NOT use any brand names):
+- Industry Description: {brand_description}
+- Industry Topics: {topics_str}
+
+Topics should be specific product categories or use cases in this industry."""
+    if not structured:
+        user_prompt += """
+
+Return ONLY valid JSON (no markdown) with this structure:
+{
+    "topics": [
+        {"name": "Topic Name", "slug": "topic-name", "description": "Brief description"}
+    ]
+}"""
+
+    get_limiter("openai").acquire()
+    emit("llm_call_started", model="gpt-4o-mini", stage="topics")
+    with track_provider("openai"), span("llm.completion", model="gpt-4o-mini"):
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.7,
+            max_tokens=min(4000, 200 + 80 * num_topics),
+            **_response_format(_TopicSelection, structured),
+            **request_timeout()
+        )
+    record_llm_usage("gpt-4o-mini", response.usage)
+    output = response.choices[0].message.content
+    emit("llm_call_finished", model="gpt-4o-mini", stage="topics", characters=len(output or ""))
+
+    if structured:
+        selection, _ = _parse_structured(_TopicSelection, output)
+        return [topic.model_dump() for topic in selection.topics[:num_topics]]
+    data = parse_json_object(output)
+    return data.get("topics", [])[:num_topics]
+
+
+def _generate_topic_prompts(
+    client,
+    system_prompt: str,
+    brand_description: str,
+    topic: dict,
+    prompts_per_topic: int
+) -> list[GeneratedPrompt]:
+    """
+    Fan-out stage 2: generate the prompts for a single topic.
+
+    Returns:
+        Prompts for the topic
+    """
+    structured = _structured_output_enabled()
+    user_prompt = f"""Generate {prompts_per_topic} BRAND-AGNOSTIC consumer prompts for this topic.
+
+TOPIC: {topic.get("name", "")} - {topic.get("description", "")}
+INDUSTRY CONTEXT (DO NOT use any brand names): {brand_description}
+
+Each prompt must sound like a natural consumer question, contain NO brand names,
+and cover a mix of "best X for Y", "which brands make the best X",
+"what do experts recommend", budget and beginner questions."""
+    if structured:
+        user_prompt += """
+Each intent is one of visibility, recommendation or sentiment; leave expected_mentions empty."""
+    else:
+        user_prompt += """
+
+Return ONLY valid JSON (no markdown) with this structure:
+{
+    "prompts": [
+        {
+            "prompt_text": "Brand-agnostic consumer question (NO brand names)",
+            "intent": "visibility|recommendation|sentiment",
+            "expected_mentions": []
+        }
+    ]
+}"""
+
+    get_limiter("openai").acquire()
+    emit("llm_call_started", model="gpt-4o-mini", stage="prompts", topic=topic.get("name"))
+    with track_provider("openai"), span("llm.completion", model="gpt-4o-mini"):
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.7,
+            max_tokens=min(4000, 200 + 120 * prompts_per_topic),
+            **_response_format(_TopicPrompts, structured),
+            **request_timeout()
+        )
+    record_llm_usage("gpt-4o-mini", response.usage)
+    output = response.choices[0].message.content
+    emit("llm_call_finished", model="gpt-4o-mini", stage="prompts", topic=topic.get("name"))
+
+    if structured:
+        return _parse_structured(_TopicPrompts, output)[0].prompts
+    data = parse_json_object(output)
+    return _build_prompts(data.get("prompts", []))
+
+
+def _generate_topic(
+    client,
+    system_prompt: str,
+    brand_description: str,
+    topic_data: dict,
+    prompts_per_topic: int,
+    index: int
+) -> GeneratedTopic:
+    """Fan-out stage 2 for one topic, reported as soon as its prompts are ready."""
+    topic = GeneratedTopic(
+        name=topic_data.get("name", ""),
+        slug=_topic_slug(topic_data),
+        description=topic_data.get("description", ""),
+        prompts=_generate_topic_prompts(client, system_prompt, brand_description, topic_data, prompts_per_topic)
+    )
+    _emit_topic(index, topic)
+    return topic
+
+
+def _generate_prompts_fan_out(
+    client,
+    system_prompt: str,
+    brand_name: str,
+    brand_description: str,
+    topics_str: str,
+    num_topics: int,
+    prompts_per_topic: int
+) -> PromptGenerationResult:
+    """
+    Two-stage generation: pick topics with one small call, then generate each
+    topic's prompts with its own concurrent call. Wall-clock time stays
+    roughly flat as num_topics grows, and no single completion is large
+    enough to be truncated.
+    """
+    selected = _select_topics(client, system_prompt, brand_description, topics_str, num_topics)
+
+    # Per-topic calls share a process-wide pool (PROMPT_TOPICS_POOL_SIZE)
+    futures = [
+        submit_in_pool(
+            "prompt_topics",
+            _generate_topic,
+            client, system_prompt, brand_description, topic, prompts_per_topic, index
+        )
+        for index, topic in enumerate(selected)
+    ]
+
+    # Topics still generating at the soft deadline are dropped
+    deadline = current_deadline()
+    _, not_done = wait(futures, timeout=deadline.soft_remaining() if deadline else None)
+    for future in not_done:
+        future.cancel()
+    if not_done:
+        mark_cut_off()
+
+    generated_topics = []
+    for topic_data, future in zip(selected, futures):
+        if future in not_done:
+            print(f"[Fast Prompt Generation] Topic '{topic_data.get('name')}' dropped at deadline")
+            continue
+        try:
+            generated_topics.append(future.result())
+        except Exception as e:
+            print(f"[Fast Prompt Generation] Topic '{topic_data.get('name')}' failed: {e}")
+
+    return PromptGenerationResult(
+        brand_name=brand_name,
+        industry=topics_str,
+        topics=generated_topics,
+        total_prompts=sum(len(topic.prompts) for topic in generated_topics),
+        partial=bool(not_done)
+    )
+
+
 def generate_prompts_fast(
     brand_name: str,
     brand_description: str,
     topics: list[str],
     competitors: list[str] = [],
     num_topics: int = 5,
-    prompts_per_topic: int = 5
+    prompts_per_topic: int = 5,
+    fan_out: bool = True
 ) -> PromptGenerationResult:
     """
     Fast prompt generation using direct OpenAI API call instead of CrewAI.
     Generates BRAND-AGNOSTIC prompts that don't mention any specific brands.
-    """
-    import openai
 
-    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    With fan_out (the default), topics are chosen first and each topic's
+    prompts are generated by a separate concurrent call. Otherwise a single
+    completion generates everything; for streaming requests it is streamed
+    and parsed incrementally. Either way, streaming requests get a "topic"
+    event as each topic is completed.
+    """
+    client = get_openai_client()
 
     topics_str = ", ".join(topics) if topics else "general"
 
@@ -250,6 +617,21 @@ Your prompts must be NEUTRAL and GENERIC:
 
 This approach gives unbiased results showing which brands AI assistants organically recommend."""
 
+    if fan_out and num_topics > 1:
+        try:
+            return _generate_prompts_fan_out(
+                client, system_prompt, brand_name, brand_description,
+                topics_str, num_topics, prompts_per_topic
+            )
+        except Exception as e:
+            print(f"[Fast Prompt Generation] Error: {e}")
+            return PromptGenerationResult(
+                brand_name=brand_name,
+                industry=topics_str,
+                topics=[],
+                total_prompts=0
+            )
+
     user_prompt = f"""Generate {num_topics} research topics and {prompts_per_topic} BRAND-AGNOSTIC prompts per topic.
 
 CONTEXT (for understanding the industry only - DO NOT use any brand names in prompts):
@@ -271,7 +653,13 @@ Categories to cover:
 - "What do experts recommend for X?"
 - "Best affordable X?"
 - "What X should a beginner use?"
-
+"""
+    structured = _structured_output_enabled()
+    if structured:
+        user_prompt += """
+Each intent is one of visibility, recommendation or sentiment; leave expected_mentions empty."""
+    else:
+        user_prompt += f"""
 Return ONLY valid JSON (no markdown) with this structure:
 {{
     "brand_name": "{brand_name}",
@@ -294,57 +682,50 @@ Return ONLY valid JSON (no markdown) with this structure:
 }}"""
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=4000
-        )
-
-        output = response.choices[0].message.content
-
-        # Clean up the response
-        if output.startswith("```"):
-            if "```json" in output:
-                output = output.split("```json")[1].split("```")[0]
+        # Queue behind the shared OpenAI rate limit; the SDK retries 429/5xx itself
+        get_limiter("openai").acquire()
+        emit("llm_call_started", model="gpt-4o-mini")
+        streaming = is_streaming()
+        with track_provider("openai"), span("llm.completion", model="gpt-4o-mini"):
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.7,
+                max_tokens=4000,
+                **_response_format(_GeneratedTopics, structured),
+                **_stream_kwargs(streaming),
+                **request_timeout()
+            )
+            if streaming:
+                # Streaming requests see each topic as it completes, not after the whole reply
+                output, usage = _read_topic_stream(response)
             else:
-                output = output.split("```")[1].split("```")[0]
+                output, usage = response.choices[0].message.content, response.usage
+        record_llm_usage("gpt-4o-mini", usage)
 
-        data = json.loads(output.strip())
+        emit("llm_call_finished", model="gpt-4o-mini", characters=len(output or ""))
 
-        # Convert to Pydantic models
-        generated_topics = []
-        total_prompts = 0
+        if structured:
+            # Validated straight into the models
+            parsed, truncated = _parse_structured(_GeneratedTopics, output)
+            generated_topics = parsed.topics
+            for topic in generated_topics:
+                topic.slug = topic.slug or _topic_slug(topic.model_dump())
+        else:
+            data, truncated = extract_json_object(output)
 
-        for topic_data in data.get("topics", []):
-            prompts = []
-            for prompt_data in topic_data.get("prompts", []):
-                prompts.append(GeneratedPrompt(
-                    prompt_text=prompt_data.get("prompt_text", ""),
-                    intent=prompt_data.get("intent", "visibility"),
-                    expected_mentions=prompt_data.get("expected_mentions", [])
-                ))
-                total_prompts += 1
-
-            slug = topic_data.get("slug", "")
-            if not slug:
-                slug = topic_data.get("name", "").lower().replace(" ", "-").replace("/", "-")
-
-            generated_topics.append(GeneratedTopic(
-                name=topic_data.get("name", ""),
-                slug=slug,
-                description=topic_data.get("description", ""),
-                prompts=prompts
-            ))
+            # Convert to Pydantic models
+            generated_topics = [_topic_from_dict(topic_data) for topic_data in data.get("topics", [])]
 
         return PromptGenerationResult(
             brand_name=brand_name,
             industry=topics_str,
             topics=generated_topics,
-            total_prompts=total_prompts
+            total_prompts=sum(len(topic.prompts) for topic in generated_topics),
+            partial=truncated
         )
 
     except Exception as e:
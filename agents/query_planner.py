@@ -0,0 +1,185 @@
+"""
+Query Planner - Orders competitor searches by expected yield, pruning near-duplicate queries
+"""
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional
+from pydantic import BaseModel
+
+
+# Query templates: (name, intent, subject kind, format). Queries with the same
+# intent about the same subject are near-duplicates; only the best one runs.
+TEMPLATES = {
+    "keyword_best_apps": ("list", "keyword", "best {subject} apps 2024"),
+    "keyword_alternatives": ("alternatives", "keyword", "{subject} alternatives"),
+    "topic_top_companies": ("list", "topic", "top {subject} companies"),
+    "topic_best_platforms": ("list", "topic", "best {subject} platforms 2024"),
+    "industry_leaders": ("list", "industry", "{subject} market leaders 2024"),
+    "industry_startups": ("startups", "industry", "top {subject} startups"),
+    "brand_alternatives": ("alternatives", "brand", "{subject} alternatives"),
+    "brand_apps_like": ("alternatives", "brand", "apps like {subject}"),
+}
+
+# Expected new companies per query for each template before any history
+# exists; weighted as PRIOR_WEIGHT observed runs
+TEMPLATE_PRIORS = {
+    "keyword_best_apps": 4.0,
+    "keyword_alternatives": 3.5,
+    "brand_alternatives": 3.5,
+    "topic_top_companies": 3.0,
+    "brand_apps_like": 3.0,
+    "topic_best_platforms": 2.5,
+    "industry_leaders": 2.0,
+    "industry_startups": 1.5,
+}
+PRIOR_WEIGHT = 3
+
+
+class QueryCandidate(BaseModel):
+    """A planned search query"""
+    query: str
+    template: str
+    cached: bool = False  # Served from the search cache, so it costs no API call
+    expected_yield: float = 0.0
+
+
+class YieldStats:
+    """
+    Historical new-companies-per-query for each template, persisted in
+    SQLite so the plan improves across restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._counts: dict[str, tuple[int, int]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS query_yield ("
+                    "template TEXT PRIMARY KEY, runs INTEGER NOT NULL, new_companies INTEGER NOT NULL)"
+                )
+                for template, runs, new in self._db.execute("SELECT template, runs, new_companies FROM query_yield"):
+                    self._counts[template] = (runs, new)
+            except sqlite3.Error as e:
+                print(f"[Query Planner] Yield history not persisted ({e})")
+                self._db = None
+
+    def expected_yield(self, template: str) -> float:
+        """Mean new companies per query, smoothed towards the template prior."""
+        runs, new = self._counts.get(template, (0, 0))
+        prior = TEMPLATE_PRIORS.get(template, 1.0)
+        return (new + prior * PRIOR_WEIGHT) / (runs + PRIOR_WEIGHT)
+
+    def record(self, template: str, new_companies: int) -> None:
+        """Record how many previously unseen companies one query surfaced."""
+        with self._lock:
+            runs, new = self._counts.get(template, (0, 0))
+            self._counts[template] = (runs + 1, new + new_companies)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT INTO query_yield (template, runs, new_companies) VALUES (?, 1, ?) "
+                        "ON CONFLICT(template) DO UPDATE SET runs = runs + 1, "
+                        "new_companies = new_companies + excluded.new_companies",
+                        (template, new_companies)
+                    )
+                except sqlite3.Error as e:
+                    print(f"[Query Planner] Could not record yield: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            templates = set(TEMPLATES) | set(self._counts)
+            return {
+                template: {
+                    "runs": self._counts.get(template, (0, 0))[0],
+                    "expected_yield": round(self.expected_yield(template), 2),
+                }
+                for template in sorted(templates)
+            }
+
+
+_stats: Optional[YieldStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_yield_stats() -> YieldStats:
+    """Return the process-wide yield history."""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = YieldStats(os.getenv("QUERY_YIELD_PATH", ".cache/query_yield.sqlite3"))
+        return _stats
+
+
+def plan_queries(
+    brand_name: str,
+    keywords: list[str],
+    industry: str,
+    topics: list[str],
+    is_cached: Callable[[str], bool] = lambda _: False,
+    max_queries: int = 8
+) -> list[QueryCandidate]:
+    """
+    Build the search plan for a competitor analysis.
+
+    Candidates come from the top 3 keywords, top 3 topics, the industry and
+    (for names longer than 3 characters) the brand. Cached queries come
+    first since they are free, then the rest by historical yield. Of each
+    group of near-duplicates only the highest ranked query is kept.
+
+    Args:
+        brand_name: Name of the brand
+        keywords: Keywords extracted from the brand description
+        industry: The industry/sector
+        topics: List of relevant topics
+        is_cached: Whether a query would be answered by the search cache
+        max_queries: Upper bound on the plan length
+
+    Returns:
+        Candidates in the order they should run
+    """
+    subjects = {
+        "keyword": keywords[:3],
+        "topic": topics[:3],
+        "industry": [industry] if industry else [],
+        "brand": [brand_name] if len(brand_name) > 3 else [],
+    }
+    stats = get_yield_stats()
+
+    candidates = []
+    seen_queries = set()
+    for template, (intent, kind, fmt) in TEMPLATES.items():
+        for subject in subjects[kind]:
+            query = fmt.format(subject=subject)
+            if query.lower() in seen_queries:
+                continue
+            seen_queries.add(query.lower())
+            candidates.append((
+                (intent, " ".join(subject.lower().split())),
+                QueryCandidate(
+                    query=query,
+                    template=template,
+                    cached=is_cached(query),
+                    expected_yield=stats.expected_yield(template)
+                )
+            ))
+
+    candidates.sort(key=lambda item: (not item[1].cached, -item[1].expected_yield))
+
+    plan = []
+    seen_signatures = set()
+    for signature, candidate in candidates:
+        if signature in seen_signatures:
+            continue
+        seen_signatures.add(signature)
+        plan.append(candidate)
+
+    return plan[:max_queries]
@@ -0,0 +1,238 @@
+"""
+Rate Limiting - Per-provider token buckets, daily quotas and retry with jittered backoff
+"""
+import os
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+import httpx
+
+from metrics import track_provider
+
+
+# (requests per second, burst size) per provider, overridable with
+# <PROVIDER>_RATE_PER_SECOND / <PROVIDER>_BURST / <PROVIDER>_DAILY_QUOTA
+DEFAULT_LIMITS = {
+    "serpapi": (5.0, 10),
+    "firecrawl": (2.0, 5),
+    "openai": (10.0, 20),
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class QuotaExceededError(Exception):
+    """Raised when a provider's daily quota is used up"""
+
+
+class RateLimiter:
+    """
+    Token bucket with an optional daily quota for one provider.
+
+    Callers reserve a token and sleep until it becomes available instead of
+    failing, so bursts are queued and drained at the configured rate.
+    Works from both worker threads and coroutines.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        rate_per_second: float,
+        burst: int,
+        daily_quota: Optional[int] = None
+    ):
+        self.provider = provider
+        self.rate = max(rate_per_second, 0.001)
+        self.burst = max(1, burst)
+        self.daily_quota = daily_quota
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._day = self._today()
+        self._used_today = 0
+        self._lock = threading.Lock()
+
+        self.waiting = 0
+        self.total_calls = 0
+        self.total_wait_seconds = 0.0
+        self.retries = 0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait for it."""
+        with self._lock:
+            today = self._today()
+            if today != self._day:
+                self._day = today
+                self._used_today = 0
+            if self.daily_quota is not None and self._used_today >= self.daily_quota:
+                raise QuotaExceededError(
+                    f"{self.provider} daily quota of {self.daily_quota} calls exhausted"
+                )
+
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            self._used_today += 1
+            self.total_calls += 1
+
+            wait = max(0.0, -self._tokens / self.rate)
+            if wait > 0:
+                self.waiting += 1
+                self.total_wait_seconds += wait
+            return wait
+
+    def _release_waiter(self) -> None:
+        with self._lock:
+            self.waiting -= 1
+
+    def acquire(self) -> None:
+        """Block the calling thread until a token is available."""
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._release_waiter()
+
+    async def acquire_async(self) -> None:
+        """Suspend the calling coroutine until a token is available."""
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._release_waiter()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "queue_depth": self.waiting,
+                "calls": self.total_calls,
+                "retries": self.retries,
+                "total_wait_seconds": round(self.total_wait_seconds, 3),
+                "daily_quota": self.daily_quota,
+                "used_today": self._used_today,
+            }
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> RateLimiter:
+    """Return the shared limiter for a provider, creating it from env config on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            prefix = provider.upper()
+            default_rate, default_burst = DEFAULT_LIMITS.get(provider, (5.0, 10))
+            quota = os.getenv(f"{prefix}_DAILY_QUOTA")
+            limiter = RateLimiter(
+                provider,
+                rate_per_second=float(os.getenv(f"{prefix}_RATE_PER_SECOND", default_rate)),
+                burst=int(os.getenv(f"{prefix}_BURST", default_burst)),
+                daily_quota=int(quota) if quota else None
+            )
+            _limiters[provider] = limiter
+        return limiter
+
+
+def rate_limit_stats() -> dict:
+    """Current queue depth and counters for every provider used so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.provider: limiter.stats() for limiter in limiters}
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """
+    Decide whether a failed call should be retried.
+
+    Returns:
+        Seconds to wait before retrying, or None if the error is not retryable
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status not in RETRYABLE_STATUS:
+            return None
+        retry_after = error.response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+    elif not isinstance(error, httpx.TransportError) or isinstance(error, httpx.TimeoutException):
+        # Timeouts already cost a full timeout period, so they are not retried
+        return None
+
+    base = float(os.getenv("RATE_LIMIT_BACKOFF_SECONDS", 1.0))
+    return min(30.0, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+
+def _max_attempts() -> int:
+    return max(1, int(os.getenv("RATE_LIMIT_MAX_ATTEMPTS", 4)))
+
+
+def call_with_retry(provider: str, fn: Callable[[], Any]) -> Any:
+    """
+    Run a provider call under its rate limit, retrying 429/5xx and connection
+    errors with jittered exponential backoff.
+
+    Args:
+        provider: Provider name (serpapi, firecrawl, openai)
+        fn: Zero-argument callable making one request
+
+    Returns:
+        fn's result
+    """
+    limiter = get_limiter(provider)
+    attempts = _max_attempts()
+    for attempt in range(attempts):
+        limiter.acquire()
+        try:
+            with track_provider(provider):
+                return fn()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == attempts - 1:
+                raise
+            limiter.retries += 1
+            print(f"[Rate Limit] {provider} call failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+async def call_with_retry_async(provider: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Async variant of call_with_retry.
+
+    Args:
+        provider: Provider name (serpapi, firecrawl, openai)
+        fn: Zero-argument coroutine function making one request
+
+    Returns:
+        fn's result
+    """
+    limiter = get_limiter(provider)
+    attempts = _max_attempts()
+    for attempt in range(attempts):
+        await limiter.acquire_async()
+        try:
+            with track_provider(provider):
+                return await fn()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == attempts - 1:
+                raise
+            limiter.retries += 1
+            print(f"[Rate Limit] {provider} call failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
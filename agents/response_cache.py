@@ -0,0 +1,191 @@
+"""
+Response Cache - Whole research responses cached by normalized input, with stale-while-revalidate
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import contextvars
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from pydantic import BaseModel
+
+from cache import TieredCache, cache_from_env
+from singleflight import AsyncSingleFlight
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Query params that only track campaigns and never change page content
+_TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid", "ref")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Fold case and collapse whitespace."""
+    return " ".join((value or "").casefold().split())
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonicalize a website URL so equivalent spellings share a cache entry.
+
+    Adds a missing scheme, lowercases the host, drops "www.", default
+    ports, fragments, tracking params and trailing slashes, and sorts the
+    remaining query params.
+    """
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def response_key(kind: str, **fields) -> str:
+    """
+    Build a cache key from a request kind and its already-normalized fields.
+
+    Returns:
+        Stable hex digest
+    """
+    raw = json.dumps({"kind": kind, **fields}, sort_keys=True)
+    return f"{kind}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+class ResponseCache:
+    """
+    Caches whole research responses.
+
+    Entries younger than the freshness window are served directly. Older
+    entries, still inside the stale window, are served immediately while a
+    background task recomputes them. Anything older is recomputed inline,
+    and concurrent identical misses share one computation.
+    """
+
+    def __init__(self):
+        self.fresh_seconds = float(os.getenv("RESPONSE_CACHE_FRESH_SECONDS", 6 * 3600))
+        self.stale_seconds = float(os.getenv("RESPONSE_CACHE_STALE_SECONDS", 7 * 86400))
+        self.enabled = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+        self._cache: Optional[TieredCache] = None
+        if self.enabled:
+            self._cache = cache_from_env(
+                name="responses",
+                prefix="RESPONSE_CACHE",
+                default_ttl=self.fresh_seconds + self.stale_seconds,
+                default_path=".cache/response_cache.sqlite3"
+            )
+        self._flight = AsyncSingleFlight("responses")
+        self._revalidating: dict[str, asyncio.Task] = {}
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+
+    async def get_or_compute(
+        self,
+        key: str,
+        model: type[ModelT],
+        compute: Callable[[], Awaitable[ModelT]],
+        force_refresh: bool = False,
+        cacheable: Callable[[ModelT], bool] = lambda _: True,
+        coalesce: bool = True
+    ) -> ModelT:
+        """
+        Return a cached response or compute (and cache) a new one.
+
+        Args:
+            key: Key from response_key()
+            model: Pydantic model the response is stored as
+            compute: Zero-argument coroutine function producing the response
+            force_refresh: Skip the cache lookup and recompute
+            cacheable: Predicate deciding whether a result may be stored
+                (error placeholders should not be)
+            coalesce: Share the computation with concurrent identical misses.
+                Turn off when the result depends on the caller's context
+                (e.g. its deadline), which a shared computation would leak
+
+        Returns:
+            The response model
+        """
+        if self._cache is None:
+            return await compute()
+
+        if not force_refresh:
+            # SQLite reads and JSON decoding stay off the event loop
+            entry = await asyncio.to_thread(self._cache.get_entry, key)
+            if entry is not None:
+                created_at, value = entry
+                if time.time() - created_at > self.fresh_seconds:
+                    self.stale_hits += 1
+                    self._revalidate(key, compute, cacheable)
+                else:
+                    self.fresh_hits += 1
+                return model.model_validate(value)
+
+        if not coalesce:
+            return await self._compute_and_store(key, compute, cacheable)
+        return await self._flight.do(key, lambda: self._compute_and_store(key, compute, cacheable))
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[ModelT]],
+        cacheable: Callable[[ModelT], bool]
+    ) -> ModelT:
+        result = await compute()
+        if cacheable(result):
+            await asyncio.to_thread(self._cache.set, key, result.model_dump(mode="json"))
+        return result
+
+    def _revalidate(self, key: str, compute, cacheable) -> None:
+        """Recompute a stale entry in the background, at most once at a time per key."""
+        if key in self._revalidating:
+            return
+        self.revalidations += 1
+
+        # Fresh context: the refresh must not report progress into the
+        # request stream that happened to trigger it
+        task = asyncio.create_task(
+            self._flight.do(key, lambda: self._compute_and_store(key, compute, cacheable)),
+            context=contextvars.Context()
+        )
+        self._revalidating[key] = task
+
+        def done(t: asyncio.Task) -> None:
+            self._revalidating.pop(key, None)
+            if not t.cancelled() and t.exception() is not None:
+                print(f"[Response Cache] Revalidation of {key} failed: {t.exception()}")
+
+        task.add_done_callback(done)
+
+    def stats(self) -> Optional[dict]:
+        if self._cache is None:
+            return None
+        return {
+            **self._cache.stats(),
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "revalidations": self.revalidations,
+            "revalidating": len(self._revalidating),
+        }
+
+    async def close(self) -> None:
+        """Cancel background revalidations and close the store."""
+        tasks = list(self._revalidating.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._cache is not None:
+            self._cache.close()
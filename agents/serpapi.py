@@ -0,0 +1,168 @@
+"""
+SerpAPI Client - Cached SerpAPI search shared by the product, brand and competitor crews
+"""
+import os
+import json
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+from cache import TieredCache, cache_from_env
+from http_client import get_http_client, get_async_http_client, timeout_for
+from singleflight import SingleFlight, AsyncSingleFlight
+from rate_limit import call_with_retry, call_with_retry_async
+
+
+DEFAULT_SERPAPI_URL = "https://serpapi.com/search.json"
+
+# Params that don't change the result and must stay out of cache keys
+_UNKEYED_PARAMS = {"api_key", "output"}
+
+_cache: Optional[TieredCache] = None
+_cache_lock = threading.Lock()
+
+# Identical searches issued concurrently share one upstream request
+search_flight = SingleFlight("serpapi")
+async_search_flight = AsyncSingleFlight("serpapi")
+
+# Global cap on concurrent async SerpAPI requests, one semaphore per event loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def get_search_cache() -> Optional[TieredCache]:
+    """
+    Return the process-wide search cache, or None when SEARCH_CACHE_ENABLED is off.
+    """
+    global _cache
+    if os.getenv("SEARCH_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = cache_from_env(
+                name="search",
+                prefix="SEARCH_CACHE",
+                default_ttl=86400.0,
+                default_path=".cache/search_cache.sqlite3"
+            )
+        return _cache
+
+
+def serpapi_url() -> str:
+    """SerpAPI endpoint, overridable with SERPAPI_URL (e.g. for the offline benchmark)."""
+    return os.getenv("SERPAPI_URL", DEFAULT_SERPAPI_URL)
+
+
+def normalize_query(query: str) -> str:
+    """Fold case and whitespace so trivially different queries share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+def search_cache_key(params: dict) -> str:
+    """
+    Build the cache key for a SerpAPI request: the normalized query plus
+    every engine param that affects the result.
+    """
+    keyed = {k: str(v) for k, v in params.items() if k not in _UNKEYED_PARAMS}
+    keyed["q"] = normalize_query(keyed.get("q", ""))
+    return json.dumps(keyed, sort_keys=True)
+
+
+def is_search_cached(params: dict) -> bool:
+    """Whether a search would be served from the cache without an API call."""
+    cache = get_search_cache()
+    return cache is not None and cache.contains(search_cache_key(params))
+
+
+def serpapi_search(params: dict) -> dict:
+    """
+    Run a SerpAPI search, serving repeat queries from the search cache.
+
+    Args:
+        params: SerpAPI query params, including q, engine and api_key
+
+    Returns:
+        Parsed SerpAPI JSON response
+
+    Raises:
+        httpx.HTTPError: If the request fails
+    """
+    cache = get_search_cache()
+    key = search_cache_key(params)
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    def request() -> dict:
+        client = get_http_client()
+        url = serpapi_url()
+        response = client.get(url, params=params, timeout=timeout_for(url))
+        response.raise_for_status()
+        return response.json()
+
+    def fetch() -> dict:
+        # Queued behind the shared SerpAPI rate limit; 429/5xx are retried
+        data = call_with_retry("serpapi", request)
+
+        # SerpAPI reports some failures (bad key, exhausted plan) in a 200 body
+        if cache is not None and not data.get("error"):
+            cache.set(key, data)
+
+        return data
+
+    return search_flight.do(key, fetch)
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, int(os.getenv("SERPAPI_MAX_CONCURRENCY", 8))))
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def serpapi_search_async(params: dict) -> dict:
+    """
+    Async variant of serpapi_search sharing the same cache.
+
+    Upstream requests across every caller on the loop are capped at
+    SERPAPI_MAX_CONCURRENCY. Cache access can hit SQLite, so it runs in a
+    worker thread to keep disk I/O off the event loop.
+
+    Args:
+        params: SerpAPI query params, including q, engine and api_key
+
+    Returns:
+        Parsed SerpAPI JSON response
+
+    Raises:
+        httpx.HTTPError: If the request fails
+    """
+    cache = get_search_cache()
+    key = search_cache_key(params)
+
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return cached
+
+    async def request() -> dict:
+        async with _get_semaphore():
+            client = get_async_http_client()
+            url = serpapi_url()
+            response = await client.get(url, params=params, timeout=timeout_for(url))
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch() -> dict:
+        data = await call_with_retry_async("serpapi", request)
+
+        if cache is not None and not data.get("error"):
+            await asyncio.to_thread(cache.set, key, data)
+
+        return data
+
+    return await async_search_flight.do(key, fetch)
@@ -0,0 +1,123 @@
+"""
+Single Flight - Coalesce concurrent identical upstream calls into one
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers that arrive while
+    it is in flight block on the same future and receive its result (or
+    its exception) instead of issuing a duplicate upstream request.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once per in-flight key.
+
+        Args:
+            key: Identity of the upstream call
+            fn: Zero-argument callable performing the call
+
+        Returns:
+            fn's result, shared by every concurrent caller with the same key
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        """Upstream calls made versus calls served by an in-flight twin."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "shared": self.shared,
+                "in_flight": len(self._inflight),
+            }
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio counterpart of SingleFlight for coroutines.
+
+    The shared call runs as its own task, so a caller that is cancelled
+    (for example by a deadline) stops waiting without cancelling the call
+    for everyone else. Keys are scoped to the running loop so tasks are
+    never awaited from a foreign loop.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[tuple[int, str], asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once per in-flight key.
+
+        Args:
+            key: Identity of the upstream call
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            fn's result, shared by every concurrent caller with the same key
+        """
+        scoped_key = (id(asyncio.get_running_loop()), key)
+
+        task = self._inflight.get(scoped_key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[scoped_key] = task
+            self.calls += 1
+            task.add_done_callback(lambda t: self._finish(scoped_key, t))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, scoped_key: tuple[int, str], task: asyncio.Task) -> None:
+        self._inflight.pop(scoped_key, None)
+        # Retrieve the exception so an unawaited failure doesn't log a warning
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """Upstream calls made versus calls served by an in-flight twin."""
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+        }
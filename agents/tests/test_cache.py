@@ -0,0 +1,93 @@
+"""
+Tests for cache.TieredCache - TTL expiry, LRU bounds and disk trimming
+"""
+import time
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from cache import TieredCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_memory_round_trip():
+    cache = TieredCache("test")
+    cache.set("k", {"v": 1})
+    assert cache.get("k") == {"v": 1}
+    assert cache.get("missing") is None
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock, tmp_path):
+    cache = TieredCache("test", str(tmp_path / "c.sqlite3"), ttl_seconds=60)
+    cache.set("k", 1)
+    clock[0] += 59
+    assert cache.get("k") == 1
+    assert cache.contains("k")
+    clock[0] += 2
+    assert cache.get("k") is None
+    assert not cache.contains("k")
+
+
+def test_max_age_is_stricter_than_the_ttl(clock):
+    cache = TieredCache("test", ttl_seconds=60)
+    cache.set("k", 1)
+    clock[0] += 30
+    assert cache.get("k", max_age=10) is None
+    assert cache.get("k") == 1
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TieredCache("test", max_memory_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_disk_hits_are_promoted_to_memory(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    TieredCache("test", path).set("k", [1, 2])
+    cache = TieredCache("test", path)
+    assert cache.get("k") == [1, 2]
+    assert cache.get("k") == [1, 2]
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+
+def test_disk_trim_drops_expired_and_overflowing_rows(clock, tmp_path):
+    cache = TieredCache("test", str(tmp_path / "c.sqlite3"), ttl_seconds=60, max_disk_items=50)
+    cache.set("old", 0)
+    clock[0] += 61
+    # The trim runs every 100 writes
+    for i in range(99):
+        clock[0] += 0.001
+        cache.set(f"k{i}", i)
+    assert cache.stats()["disk_items"] == 50
+    cache.close()
+
+    reopened = TieredCache("test", str(tmp_path / "c.sqlite3"), ttl_seconds=60)
+    assert reopened.get("old") is None
+    assert reopened.get("k98") == 98
+    assert reopened.get("k0") is None
+
+
+def test_delete_and_clear(tmp_path):
+    cache = TieredCache("test", str(tmp_path / "c.sqlite3"))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None
+    assert cache.stats()["disk_items"] == 0
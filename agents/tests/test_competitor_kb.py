@@ -0,0 +1,103 @@
+"""
+Tests for competitor_kb - industry, alias and domain matching
+"""
+import json
+
+import pytest
+
+from competitor_kb import DEFAULT_KB_PATH, CompetitorKB
+
+
+KB_DATA = {
+    "version": 1,
+    "industries": {
+        "project management": {"aliases": ["task management", "pm software"]},
+        "note taking": {"aliases": ["notes apps"]},
+    },
+    "competitors": [
+        {"name": "Asana", "website": "https://www.asana.com", "category": "project management",
+         "aliases": ["asana"], "industries": ["project management"]},
+        {"name": "Monday.com", "website": "https://monday.com", "category": "work os",
+         "aliases": ["monday", "monday.com"], "industries": ["project management"]},
+        {"name": "Notion", "website": "https://www.notion.so", "category": "workspace",
+         "aliases": ["notion", "notion labs"], "industries": ["project management", "note taking"]},
+        {"name": "Evernote", "website": "https://evernote.com", "category": "notes",
+         "aliases": ["evernote"], "industries": ["note taking"]},
+    ],
+}
+
+
+@pytest.fixture
+def kb(tmp_path):
+    path = tmp_path / "known_competitors.json"
+    path.write_text(json.dumps(KB_DATA))
+    return CompetitorKB(str(path))
+
+
+def _names(entries):
+    return [entry["name"] for entry in entries]
+
+
+def test_industry_and_alias_resolution(kb):
+    assert kb.resolve_industry("Project  Management") == "project management"
+    assert kb.resolve_industry("Task Management") == "project management"
+    assert kb.resolve_industry("gardening") is None
+
+
+def test_competitors_for_industry(kb):
+    assert _names(kb.competitors_for("project management")) == ["Asana", "Monday.com", "Notion"]
+
+
+def test_topics_can_name_an_industry_without_duplicates(kb):
+    names = _names(kb.competitors_for("pm software", ["notes apps"]))
+    assert names == ["Asana", "Monday.com", "Notion", "Evernote"]
+
+
+def test_brand_is_excluded(kb):
+    assert "Notion" not in _names(kb.competitors_for("note taking", exclude="notion"))
+
+
+def test_unknown_industry_has_no_competitors(kb):
+    assert kb.competitors_for("gardening", ["seeds"]) == []
+
+
+def test_matcher_prefers_longest_names_on_word_boundaries(kb):
+    found = kb.matcher.find("notion labs vs monday.com, not notional or asanas")
+    assert found == {"notion labs", "monday.com"}
+
+
+def test_lookup_domain_walks_parent_domains(kb):
+    assert kb.lookup_domain("https://app.asana.com/0/home")["name"] == "Asana"
+    assert kb.lookup_domain("www.notion.so")["name"] == "Notion"
+    assert kb.lookup_domain("https://example.com") is None
+
+
+def test_reload_picks_up_edits(kb, tmp_path):
+    assert kb.stats()["competitors"] == 4
+    data = dict(KB_DATA, competitors=KB_DATA["competitors"][:1])
+    (tmp_path / "known_competitors.json").write_text(json.dumps(data))
+    assert kb.reload()["competitors"] == 1
+
+
+def test_unreadable_file_keeps_the_last_snapshot(kb, tmp_path):
+    kb.stats()
+    (tmp_path / "known_competitors.json").write_text("{not json")
+    assert kb.reload()["competitors"] == 4
+
+
+@pytest.mark.parametrize("industry", [
+    "education", "edtech", "EdTech", "test prep", "test preparation",
+    "online learning", "language learning", "software", "saas",
+])
+def test_shipped_kb_does_not_claim_generic_industries(industry):
+    # Broad industries must not resolve to a niche competitor set, which
+    # would seed unrelated companies and cut the competitor search short
+    kb = CompetitorKB(DEFAULT_KB_PATH)
+    assert kb.resolve_industry(industry) is None
+    assert kb.competitors_for(industry, [industry]) == []
+
+
+def test_shipped_kb_matches_specific_industries():
+    kb = CompetitorKB(DEFAULT_KB_PATH)
+    assert kb.resolve_industry("USMLE prep") == "medical education"
+    assert "UWorld" in _names(kb.competitors_for("USMLE prep"))
@@ -0,0 +1,93 @@
+"""
+Tests for deadline - request budgets, tool cut-offs and partial-result salvage
+"""
+import asyncio
+from typing import Optional
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from pydantic import BaseModel
+
+from deadline import (
+    DEADLINE_REACHED_MESSAGE, append_partial, crew_limits, current_deadline, deadline_scope,
+    partial_fields, record_partial, run_with_deadline, salvage, tool_cutoff, was_cut_off
+)
+
+
+class Report(BaseModel):
+    name: str
+    score: Optional[int] = None
+    topics: list[dict] = []
+    partial: bool = False
+
+
+@pytest.mark.parametrize("seconds", [None, 0, -5])
+def test_no_budget_means_no_deadline(seconds):
+    with deadline_scope(seconds) as deadline:
+        assert deadline is None
+        assert current_deadline() is None
+        assert tool_cutoff() is None
+        assert crew_limits() == {}
+        record_partial({"name": "ignored"})
+        assert partial_fields() == {}
+
+
+def test_tools_are_cut_off_after_the_soft_deadline(monkeypatch):
+    monkeypatch.setenv("DEADLINE_WRAP_UP_SECONDS", "10")
+    with deadline_scope(60) as deadline:
+        assert tool_cutoff() is None
+        assert not was_cut_off()
+
+        deadline.soft_expires_at = deadline.expires_at - 60
+        assert tool_cutoff() == DEADLINE_REACHED_MESSAGE
+        assert was_cut_off()
+    assert current_deadline() is None
+
+
+def test_crew_limits_follow_the_remaining_budget(monkeypatch):
+    monkeypatch.setenv("DEADLINE_WRAP_UP_SECONDS", "10")
+    monkeypatch.setenv("CREW_SECONDS_PER_ITERATION", "8")
+    with deadline_scope(50):
+        limits = crew_limits(default_max_iter=15)
+    assert limits["max_iter"] == 4
+    assert 38 <= limits["max_execution_time"] <= 40
+
+
+def test_salvage_keeps_valid_fields_and_fills_defaults():
+    report = salvage(Report, {"score": "not a number", "topics": [{"name": "a"}], "other": 1}, name="Unknown")
+    assert report == Report(name="Unknown", topics=[{"name": "a"}], partial=True)
+
+
+def test_appended_items_are_salvaged():
+    with deadline_scope(60):
+        record_partial({"name": "Acme"})
+        append_partial("topics", {"name": "a"})
+        append_partial("topics", {"name": "b"})
+        fields = partial_fields()
+    assert salvage(Report, fields).topics == [{"name": "a"}, {"name": "b"}]
+
+
+def test_full_result_is_returned_before_the_deadline():
+    async def compute():
+        return Report(name="Acme")
+
+    async def main():
+        with deadline_scope(5) as deadline:
+            return await run_with_deadline(deadline, compute, lambda fields: salvage(Report, fields))
+
+    assert asyncio.run(main()) == Report(name="Acme")
+
+
+def test_partial_result_is_salvaged_at_the_hard_deadline():
+    async def compute():
+        record_partial({"name": "Acme", "score": 3})
+        await asyncio.sleep(5)
+        return Report(name="Acme", score=10)
+
+    async def main():
+        with deadline_scope(0.2) as deadline:
+            return await run_with_deadline(deadline, compute, lambda fields: salvage(Report, fields))
+
+    assert asyncio.run(main()) == Report(name="Acme", score=3, partial=True)
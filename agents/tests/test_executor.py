@@ -0,0 +1,88 @@
+"""
+Tests for executor - worker pool accounting and context propagation
+"""
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from executor import pool_stats, run_in_pool, submit_in_pool
+
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.fixture
+def family(monkeypatch, request):
+    name = f"test_{request.node.name}"
+    monkeypatch.setenv(f"{name.upper()}_POOL_SIZE", "1")
+    return name
+
+
+def _wait_until(check, timeout=5.0):
+    done = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if check():
+            return
+        done.wait(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_counts_running_and_queued_work(family):
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    first = submit_in_pool(family, block)
+    second = submit_in_pool(family, block)
+    started.wait(5)
+
+    assert pool_stats()[family] == {"size": 1, "running": 1, "queued": 1}
+
+    release.set()
+    assert first.result(5) == "done" and second.result(5) == "done"
+    _wait_until(lambda: pool_stats()[family] == {"size": 1, "running": 0, "queued": 0})
+
+
+def test_cancelled_queued_work_is_released(family):
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    running = submit_in_pool(family, block)
+    queued = submit_in_pool(family, lambda: "never")
+    started.wait(5)
+
+    assert queued.cancel()
+    assert pool_stats()[family] == {"size": 1, "running": 1, "queued": 0}
+
+    release.set()
+    running.result(5)
+    _wait_until(lambda: pool_stats()[family] == {"size": 1, "running": 0, "queued": 0})
+
+
+def test_failed_work_is_released(family):
+    def fail():
+        raise ValueError("boom")
+
+    future = submit_in_pool(family, fail)
+    with pytest.raises(ValueError):
+        future.result(5)
+
+    _wait_until(lambda: pool_stats()[family] == {"size": 1, "running": 0, "queued": 0})
+
+
+def test_context_follows_the_call(family):
+    async def main():
+        request_id.set("req-1")
+        return await run_in_pool(family, request_id.get)
+
+    assert asyncio.run(main()) == "req-1"
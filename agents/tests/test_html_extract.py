@@ -0,0 +1,80 @@
+"""
+Tests for html_extract - incremental page text and metadata extraction
+"""
+from html_extract import PageExtractor, extract_page
+
+
+PAGE = """<html><head>
+<title>  Acme
+  Widgets </title>
+<meta name="description" content="Widgets for everyone">
+<meta property="og:title" content="Acme">
+<style>body { color: red; }</style>
+<script>var hidden = "not text";</script>
+</head><body>
+<header>Site header</header>
+<nav><a href="/">Home</a></nav>
+<h1>Best   widgets</h1>
+<p>Built to last.</p>
+<svg><text>icon label</text></svg>
+<footer>Copyright</footer>
+</body></html>"""
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_extracts_title_meta_and_visible_text():
+    page = extract_page([PAGE])
+    assert page.title == "Acme Widgets"
+    assert page.meta == {"description": "Widgets for everyone", "og:title": "Acme"}
+    assert page.text == "Best widgets Built to last."
+
+
+def test_skipped_tags_are_excluded():
+    text = extract_page([PAGE]).text
+    for skipped in ("color: red", "not text", "Site header", "Home", "icon label", "Copyright"):
+        assert skipped not in text
+
+
+def test_nested_skipped_tags():
+    page = extract_page(["<nav><header>x</header>still nav</nav><p>shown</p>"])
+    assert page.text == "shown"
+
+
+def test_chunk_boundaries_do_not_change_the_result():
+    expected = extract_page([PAGE])
+    for size in (1, 3, 7, 64):
+        page = extract_page(_chunks(PAGE, size))
+        assert (page.title, page.meta, page.text) == (expected.title, expected.meta, expected.text)
+
+
+def test_words_split_across_chunks_are_not_broken():
+    assert extract_page(["<p>extra", "ordinary</p>"]).text == "extraordinary"
+
+
+def test_length_cap_truncates_and_stops_reading():
+    body = "<p>" + "word " * 50 + "</p>"
+    chunks = [body] * 10
+    consumed = []
+
+    def feed():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    page = extract_page(feed(), max_chars=100)
+    assert page.done
+    assert page.text.endswith("...")
+    assert len(page.text) == 103
+    # Reading stops once the budget is spent
+    assert len(consumed) < len(chunks)
+
+
+def test_text_under_the_cap_is_not_marked_done():
+    page = PageExtractor(max_chars=1000)
+    page.feed("<p>short</p>")
+    page.close()
+    assert not page.done
+    assert page.text == "short"
@@ -0,0 +1,193 @@
+"""
+Tests for jobs.JobManager - job lifecycle, queue limits and callback delivery
+"""
+import json
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("prometheus_client")
+
+from pydantic import BaseModel
+
+from jobs import JobManager, QueueFullError
+
+
+class Result(BaseModel):
+    value: int
+
+
+@pytest.fixture(autouse=True)
+def job_env(monkeypatch):
+    monkeypatch.setenv("JOB_WORKERS", "1")
+    monkeypatch.setenv("CALLBACK_BACKOFF_SECONDS", "0")
+
+
+async def _wait_for(check, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if check():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def _with_callbacks(manager, handler):
+    """Swap the manager's HTTP client for one served by handler."""
+    manager._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_job_runs_through_to_success():
+    async def main():
+        manager = JobManager()
+        await manager.start()
+        release = asyncio.Event()
+
+        async def run():
+            await release.wait()
+            return Result(value=7)
+
+        job = manager.submit("product", run)
+        assert job.status == "queued"
+
+        await _wait_for(lambda: manager.get(job.job_id).status == "running")
+        release.set()
+        await _wait_for(lambda: manager.get(job.job_id).status == "succeeded")
+        await manager.stop()
+        return manager.get(job.job_id)
+
+    job = asyncio.run(main())
+    assert job.result == {"value": 7}
+    assert job.error is None
+    assert job.started_at is not None and job.finished_at >= job.started_at
+
+
+def test_failed_job_keeps_its_error():
+    async def main():
+        manager = JobManager()
+        await manager.start()
+
+        async def run():
+            raise RuntimeError("crew exploded")
+
+        job = manager.submit("brand", run)
+        await _wait_for(lambda: manager.get(job.job_id).status == "failed")
+        await manager.stop()
+        return manager.get(job.job_id)
+
+    job = asyncio.run(main())
+    assert job.error == "crew exploded"
+    assert job.result is None
+
+
+def test_submit_rejects_when_not_started():
+    manager = JobManager()
+
+    async def run():
+        return {}
+
+    with pytest.raises(QueueFullError):
+        manager.submit("product", run)
+
+
+def test_submit_rejects_when_queue_is_full(monkeypatch):
+    monkeypatch.setenv("JOB_QUEUE_SIZE", "1")
+
+    async def main():
+        manager = JobManager()
+        await manager.start()
+        release = asyncio.Event()
+
+        async def run():
+            await release.wait()
+            return {}
+
+        manager.submit("product", run)
+        await _wait_for(lambda: manager.stats()["jobs"].get("running") == 1)
+        manager.submit("product", run)
+        try:
+            with pytest.raises(QueueFullError):
+                manager.submit("product", run)
+        finally:
+            release.set()
+            await manager.stop()
+
+    asyncio.run(main())
+
+
+def test_callback_is_retried_until_delivered():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(503 if len(requests) < 3 else 200)
+
+    async def main():
+        manager = JobManager()
+        await manager.start()
+        await manager._client.aclose()
+        _with_callbacks(manager, handler)
+
+        async def run():
+            return {"value": 1}
+
+        job = manager.submit("prompts", run, callback_url="https://example.test/hook")
+        await _wait_for(lambda: manager.get(job.job_id).callback_status == "delivered")
+        await manager.stop()
+        return manager.get(job.job_id)
+
+    job = asyncio.run(main())
+    assert job.callback_attempts == 3
+    payload = json.loads(requests[-1].content)
+    assert payload == {"value": 1, "job_id": job.job_id, "job_status": "succeeded"}
+
+
+def test_callback_gives_up_on_client_errors():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(404)
+
+    async def main():
+        manager = JobManager()
+        await manager.start()
+        await manager._client.aclose()
+        _with_callbacks(manager, handler)
+
+        async def run():
+            return {}
+
+        job = manager.submit("prompts", run, callback_url="https://example.test/hook")
+        await _wait_for(lambda: manager.get(job.job_id).callback_status == "failed")
+        await manager.stop()
+        return manager.get(job.job_id)
+
+    job = asyncio.run(main())
+    assert job.callback_attempts == 1
+    assert len(requests) == 1
+
+
+def test_finished_jobs_are_pruned_past_retention(monkeypatch):
+    monkeypatch.setenv("JOB_RETENTION", "2")
+
+    async def main():
+        manager = JobManager()
+        await manager.start()
+
+        async def run():
+            return {}
+
+        first = manager.submit("product", run)
+        await _wait_for(lambda: manager.get(first.job_id).status == "succeeded")
+        second = manager.submit("product", run)
+        await _wait_for(lambda: manager.get(second.job_id).status == "succeeded")
+        third = manager.submit("product", run)
+        await _wait_for(lambda: manager.get(third.job_id).status == "succeeded")
+        await manager.stop()
+        return manager, first, second, third
+
+    manager, first, second, third = asyncio.run(main())
+    assert manager.get(first.job_id) is None
+    assert manager.get(second.job_id) is not None
+    assert manager.get(third.job_id) is not None
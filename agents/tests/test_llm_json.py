@@ -0,0 +1,110 @@
+"""
+Tests for llm_json - tolerant extraction of the JSON object in LLM replies
+"""
+import json
+
+import pytest
+
+from llm_json import JSONRepairError, JSONStreamParser, extract_json_object, parse_json_object
+
+
+def test_plain_object_is_not_truncated():
+    assert extract_json_object('{"a": 1, "b": [1, 2]}') == ({"a": 1, "b": [1, 2]}, False)
+
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"a": 1}\n```',
+    '```\n{"a": 1}\n```\nHope this helps!',
+    'Here is the result:\n{"a": 1}\nLet me know.',
+])
+def test_fences_and_prose_are_ignored(text):
+    assert parse_json_object(text) == {"a": 1}
+
+
+def test_prose_with_braces_before_the_object():
+    text = 'Use {curly} braces for placeholders.\n{"name": "Acme"}'
+    assert parse_json_object(text) == {"name": "Acme"}
+
+
+def test_trailing_commas():
+    assert parse_json_object('{"a": [1, 2, ], "b": {"c": 3,},}') == {"a": [1, 2], "b": {"c": 3}}
+
+
+def test_llm_style_defects():
+    text = """{
+        // the product
+        name: 'Acme "Pro"',
+        'price': None,
+        "in_stock": True,
+        "notes": "line one
+line two"
+    }"""
+    assert parse_json_object(text) == {
+        "name": 'Acme "Pro"',
+        "price": None,
+        "in_stock": True,
+        "notes": "line one\nline two",
+    }
+
+
+def test_escaped_single_quote():
+    assert parse_json_object("{'text': 'it\\'s'}") == {"text": "it's"}
+
+
+def test_truncation_keeps_complete_values():
+    text = '{"topics": [{"name": "A", "prompts": ["x", "y"]}, {"name": "B", "prom'
+    data, truncated = extract_json_object(text)
+    assert truncated
+    assert data == {"topics": [{"name": "A", "prompts": ["x", "y"]}, {"name": "B"}]}
+
+
+def test_truncation_inside_a_string_drops_the_partial_value():
+    data, truncated = extract_json_object('{"a": 1, "b": "unfinished sent')
+    assert truncated
+    assert data == {"a": 1}
+
+
+def test_text_after_the_object_is_ignored():
+    assert parse_json_object('{"a": 1} {"b": 2}') == {"a": 1}
+
+
+@pytest.mark.parametrize("text", ["", None, "no json here", "[1, 2, 3]", '{"a": '])
+def test_unrecoverable_text_raises(text):
+    with pytest.raises(JSONRepairError):
+        extract_json_object(text)
+
+
+def test_repair_error_is_a_decode_error():
+    # Callers that already catch json.JSONDecodeError keep working
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_object("nothing")
+
+
+def test_stream_parser_snapshots_grow_as_chunks_arrive():
+    document = json.dumps({"topics": [{"name": "A"}, {"name": "B"}], "total": 2})
+    parser = JSONStreamParser()
+    snapshots = []
+    for i in range(0, len(document), 5):
+        parser.feed(document[i:i + 5])
+        snapshots.append(parser.snapshot())
+
+    assert parser.done and not parser.truncated
+    assert snapshots[-1] == json.loads(document)
+    # Every intermediate snapshot is a prefix of the final topic list
+    for snapshot in filter(None, snapshots):
+        assert snapshot.get("topics", []) == json.loads(document)["topics"][:len(snapshot.get("topics", []))]
+
+
+def test_stream_parser_depth_tracks_open_containers():
+    parser = JSONStreamParser()
+    parser.feed('{"topics": [{"name": "A"}')
+    assert parser.depth == 2
+    parser.feed(', {"name"')
+    assert parser.depth == 3
+
+
+def test_stream_parser_waits_for_the_first_brace():
+    parser = JSONStreamParser()
+    parser.feed("Sure! Here")
+    assert not parser.started
+    assert parser.snapshot() is None
@@ -0,0 +1,83 @@
+"""
+Tests for query_planner - competitor search ordering and near-duplicate pruning
+"""
+import pytest
+
+pytest.importorskip("pydantic")
+
+import query_planner
+from query_planner import YieldStats, plan_queries
+
+
+@pytest.fixture(autouse=True)
+def fresh_yield_stats(monkeypatch):
+    # In-memory history, so tests neither read nor write .cache/
+    stats = YieldStats(None)
+    monkeypatch.setattr(query_planner, "_stats", stats)
+    return stats
+
+
+def _plan(**overrides):
+    kwargs = dict(
+        brand_name="Acme",
+        keywords=["widgets", "gadgets", "tools", "extra"],
+        industry="hardware",
+        topics=["home improvement"],
+        max_queries=20,
+    )
+    kwargs.update(overrides)
+    return plan_queries(**kwargs)
+
+
+def test_near_duplicates_keep_only_the_best_ranked():
+    plan = _plan()
+    queries = [c.query for c in plan]
+    # "Acme alternatives" and "apps like Acme" ask the same thing; the higher-yield one wins
+    assert "acme alternatives" in (q.lower() for q in queries)
+    assert "apps like Acme" not in queries
+    templates_for_brand = [c.template for c in plan if "acme" in c.query.lower()]
+    assert templates_for_brand == ["brand_alternatives"]
+
+
+def test_identical_queries_are_planned_once():
+    plan = _plan(keywords=["widgets", "Widgets"], topics=[])
+    queries = [c.query.lower() for c in plan]
+    assert len(queries) == len(set(queries))
+
+
+def test_only_top_three_keywords_and_topics_are_used():
+    plan = _plan()
+    assert not any("extra" in c.query for c in plan)
+
+
+def test_short_brand_names_get_no_brand_queries():
+    plan = _plan(brand_name="Abc")
+    assert not any(c.template.startswith("brand_") for c in plan)
+
+
+def test_cached_queries_come_first():
+    plan = _plan(is_cached=lambda query: query == "top hardware startups")
+    assert plan[0].query == "top hardware startups"
+    assert plan[0].cached
+    assert not any(c.cached for c in plan[1:])
+
+
+def test_uncached_queries_are_ordered_by_expected_yield():
+    yields = [c.expected_yield for c in _plan()]
+    assert yields == sorted(yields, reverse=True)
+
+
+def test_history_changes_the_order(fresh_yield_stats):
+    for _ in range(20):
+        fresh_yield_stats.record("industry_startups", 10)
+    assert _plan()[0].template == "industry_startups"
+
+
+def test_plan_is_capped():
+    assert len(_plan(max_queries=3)) == 3
+
+
+def test_yield_history_persists(tmp_path):
+    path = str(tmp_path / "yield.sqlite3")
+    YieldStats(path).record("industry_leaders", 7)
+    assert YieldStats(path).stats()["industry_leaders"]["runs"] == 1
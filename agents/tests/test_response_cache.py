@@ -0,0 +1,148 @@
+"""
+Tests for response_cache - key normalization, freshness and stale-while-revalidate
+"""
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from pydantic import BaseModel
+
+from response_cache import ResponseCache, canonical_url
+
+
+class Answer(BaseModel):
+    value: int
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(monkeypatch, clock):
+    monkeypatch.setenv("RESPONSE_CACHE_PATH", "")
+    monkeypatch.setenv("RESPONSE_CACHE_FRESH_SECONDS", "60")
+    monkeypatch.setenv("RESPONSE_CACHE_STALE_SECONDS", "600")
+    return ResponseCache()
+
+
+class Counter:
+    """Compute function that returns a new value on every call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> Answer:
+        self.calls += 1
+        return Answer(value=self.calls)
+
+
+def test_canonical_url_folds_equivalent_spellings():
+    assert canonical_url("WWW.Example.com/shop/?utm_source=x&b=2&a=1#top") == \
+        canonical_url("https://example.com:443/shop?a=1&b=2")
+
+
+def test_fresh_entry_is_served_without_recomputing(cache):
+    compute = Counter()
+
+    async def main():
+        first = await cache.get_or_compute("k", Answer, compute)
+        second = await cache.get_or_compute("k", Answer, compute)
+        return first, second
+
+    assert asyncio.run(main()) == (Answer(value=1), Answer(value=1))
+    assert compute.calls == 1
+    assert cache.fresh_hits == 1
+
+
+def test_stale_entry_is_served_then_revalidated(cache, clock):
+    compute = Counter()
+
+    async def main():
+        await cache.get_or_compute("k", Answer, compute)
+        clock[0] += 120
+        stale = await cache.get_or_compute("k", Answer, compute)
+        await asyncio.gather(*cache._revalidating.values())
+        refreshed = await cache.get_or_compute("k", Answer, compute)
+        return stale, refreshed
+
+    stale, refreshed = asyncio.run(main())
+    assert stale == Answer(value=1)
+    assert refreshed == Answer(value=2)
+    assert (cache.stale_hits, cache.revalidations, cache.fresh_hits) == (1, 1, 1)
+
+
+def test_expired_entry_is_recomputed_inline(cache, clock):
+    compute = Counter()
+
+    async def main():
+        await cache.get_or_compute("k", Answer, compute)
+        clock[0] += 1000
+        return await cache.get_or_compute("k", Answer, compute)
+
+    assert asyncio.run(main()) == Answer(value=2)
+    assert cache.stale_hits == 0
+
+
+def test_force_refresh_skips_the_lookup(cache):
+    compute = Counter()
+
+    async def main():
+        await cache.get_or_compute("k", Answer, compute)
+        forced = await cache.get_or_compute("k", Answer, compute, force_refresh=True)
+        cached = await cache.get_or_compute("k", Answer, compute)
+        return forced, cached
+
+    assert asyncio.run(main()) == (Answer(value=2), Answer(value=2))
+    assert compute.calls == 2
+
+
+def test_uncacheable_results_are_not_stored(cache):
+    compute = Counter()
+
+    async def main():
+        for _ in range(2):
+            await cache.get_or_compute("k", Answer, compute, cacheable=lambda _: False)
+
+    asyncio.run(main())
+    assert compute.calls == 2
+    assert cache.fresh_hits == 0
+
+
+@pytest.mark.parametrize("coalesce,expected_calls", [(True, 1), (False, 3)])
+def test_concurrent_misses_share_one_computation(cache, coalesce, expected_calls):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return Answer(value=len(calls))
+
+    async def main():
+        return await asyncio.gather(*(
+            cache.get_or_compute("k", Answer, compute, coalesce=coalesce)
+            for _ in range(3)
+        ))
+
+    asyncio.run(main())
+    assert len(calls) == expected_calls
+
+
+def test_disabled_cache_always_computes(monkeypatch, clock):
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    cache = ResponseCache()
+    compute = Counter()
+
+    async def main():
+        for _ in range(2):
+            await cache.get_or_compute("k", Answer, compute)
+
+    asyncio.run(main())
+    assert compute.calls == 2
+    assert cache.stats() is None
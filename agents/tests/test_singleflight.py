@@ -0,0 +1,106 @@
+"""
+Tests for singleflight - coalescing of concurrent identical calls
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flight.do, "k", fetch) for _ in range(4)]
+        while flight.stats()["shared"] < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        assert [f.result() for f in futures] == ["result"] * 4
+
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "shared": 3, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter_and_are_not_remembered():
+    flight = SingleFlight("test")
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: "retried") == "retried"
+
+
+def test_async_calls_share_one_task():
+    async def main():
+        flight = AsyncSingleFlight("test")
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(3)))
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(main())
+    assert results == ["result"] * 3
+    assert len(calls) == 1
+    assert stats == {"calls": 1, "shared": 2, "in_flight": 0}
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def main():
+        flight = AsyncSingleFlight("test")
+        started = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.create_task(flight.do("k", fetch))
+        await started.wait()
+        follower = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+
+        # e.g. the leader's request hit its deadline
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, flight.stats()
+
+    result, stats = asyncio.run(main())
+    assert result == "result"
+    assert stats["calls"] == 1 and stats["in_flight"] == 0
+
+
+def test_cancelled_shared_call_fails_waiters_and_clears_the_key():
+    async def main():
+        flight = AsyncSingleFlight("test")
+
+        async def fetch():
+            await asyncio.sleep(10)
+
+        waiter = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        shared = next(iter(flight._inflight.values()))
+        shared.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        return flight.stats()
+
+    assert asyncio.run(main())["in_flight"] == 0
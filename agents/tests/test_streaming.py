@@ -0,0 +1,105 @@
+"""
+Tests for progress streaming - event ordering, NDJSON/SSE framing and the streaming endpoint wrapper
+"""
+import json
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from progress import ProgressStream, emit, format_event, is_streaming
+from main import stream_progress
+
+
+class Answer(BaseModel):
+    value: int
+
+
+def test_events_from_threads_arrive_in_order():
+    async def main():
+        stream = ProgressStream(asyncio.get_running_loop())
+
+        def work():
+            for i in range(50):
+                stream.emit("step", index=i)
+            stream.close()
+
+        threading.Thread(target=work).start()
+        return [event["index"] async for event in stream.events()]
+
+    assert asyncio.run(main()) == list(range(50))
+
+
+def test_emit_is_a_noop_without_a_stream():
+    assert not is_streaming()
+    emit("step", index=1)
+
+
+def test_format_event():
+    event = {"event": "topic", "index": 0}
+    assert format_event(event, "ndjson") == '{"event": "topic", "index": 0}\n'
+    assert format_event(event, "sse") == 'event: topic\ndata: {"event": "topic", "index": 0}\n\n'
+
+
+def _client(run) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/stream")
+    async def stream(format: str = "ndjson"):
+        return stream_progress(run, format)
+
+    return TestClient(app)
+
+
+def _ndjson(response) -> list[dict]:
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_stream_reports_progress_then_the_result():
+    async def run():
+        assert is_streaming()
+        emit("tool_started", tool="search")
+        await asyncio.to_thread(emit, "search_results", count=3)
+        return Answer(value=42)
+
+    response = _client(run).get("/stream")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    events = _ndjson(response)
+    assert [e["event"] for e in events] == ["started", "tool_started", "search_results", "result"]
+    assert events[-1]["data"] == {"value": 42}
+
+
+def test_stream_reports_failures_as_an_error_event():
+    async def run():
+        raise RuntimeError("crew exploded")
+
+    events = _ndjson(_client(run).get("/stream"))
+    assert [e["event"] for e in events] == ["started", "error"]
+    assert events[-1]["error"] == "crew exploded"
+
+
+def test_sse_frames():
+    async def run():
+        return {"value": 1}
+
+    response = _client(run).get("/stream", params={"format": "sse"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    assert [frame.split("\n")[0] for frame in frames] == ["event: started", "event: result"]
+
+
+def test_unknown_format_is_rejected():
+    async def run():
+        return {}
+
+    with pytest.raises(HTTPException) as excinfo:
+        stream_progress(run, "xml")
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,223 @@
+"""
+Tracing - Optional OpenTelemetry spans for requests, crews, tools, searches and LLM calls
+"""
+import os
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+
+_tracer: Optional[Any] = None
+_provider: Optional[Any] = None
+_lock = threading.Lock()
+
+
+def init_tracing() -> bool:
+    """
+    Configure the tracer from TRACING_EXPORTER:
+
+    - "file": one JSON span per line appended to TRACING_FILE_PATH
+      (default .cache/traces.jsonl)
+    - "otlp": OTLP/HTTP to a collector, configured with the standard
+      OTEL_EXPORTER_OTLP_* variables
+    - unset or "none": tracing disabled, spans are no-ops
+
+    Called at application startup; safe to call more than once.
+
+    Returns:
+        Whether tracing is active
+
+    Raises:
+        RuntimeError: If an exporter is configured but OpenTelemetry (or the
+            OTLP exporter) isn't installed
+    """
+    global _tracer, _provider
+    exporter_name = os.getenv("TRACING_EXPORTER", "none").lower()
+    if exporter_name in ("", "none"):
+        return False
+
+    with _lock:
+        if _tracer is not None:
+            return True
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        except ImportError as e:
+            raise RuntimeError(
+                f"TRACING_EXPORTER={exporter_name} needs opentelemetry-sdk (see requirements.txt)"
+            ) from e
+
+        if exporter_name == "otlp":
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError as e:
+                raise RuntimeError(
+                    "TRACING_EXPORTER=otlp needs opentelemetry-exporter-otlp-proto-http (see requirements.txt)"
+                ) from e
+            exporter = OTLPSpanExporter()
+        else:
+            path = os.getenv("TRACING_FILE_PATH", ".cache/traces.jsonl")
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            exporter = ConsoleSpanExporter(
+                out=open(path, "a", encoding="utf-8"),
+                formatter=lambda span: span.to_json(indent=None) + "\n"
+            )
+
+        service = os.getenv("OTEL_SERVICE_NAME", "cramler-agents")
+        _provider = TracerProvider(resource=Resource.create({"service.name": service}))
+        _provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(_provider)
+        _tracer = trace.get_tracer("cramler.agents")
+        print(f"[Tracing] Exporting spans via {exporter_name}")
+        return True
+
+
+def shutdown_tracing() -> None:
+    """Flush and stop span export. Called at application shutdown."""
+    global _tracer, _provider
+    with _lock:
+        provider = _provider
+        _tracer = None
+        _provider = None
+    if provider is not None:
+        provider.shutdown()
+
+
+def _clean(attributes: dict) -> dict:
+    """OpenTelemetry attributes must be primitives; drop Nones and stringify the rest."""
+    return {
+        k: v if isinstance(v, (str, bool, int, float)) else str(v)
+        for k, v in attributes.items() if v is not None
+    }
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Any]]:
+    """
+    Run a block inside a child span of the current span. Exceptions are
+    recorded on the span and re-raised. A no-op when tracing is disabled.
+
+    Args:
+        name: Span name (e.g. "tool.search_google", "crew.kickoff")
+        **attributes: Span attributes
+
+    Yields:
+        The span, or None when tracing is disabled
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=_clean(attributes)) as current:
+        yield current
+
+
+def traced(name: str):
+    """
+    Decorator running a function inside span(name), with its arguments as
+    attributes. Keeps the signature, so it can sit under CrewAI's @tool.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            bound = signature.bind_partial(*args, **kwargs)
+            with span(name, **bound.arguments):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_attributes(current: Optional[Any], **attributes: Any) -> None:
+    """Add attributes to a span from span(), ignoring None spans."""
+    if current is not None:
+        current.set_attributes(_clean(attributes))
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def current_trace_id() -> Optional[str]:
+    """Hex trace id of the current span, or None when not tracing."""
+    if _tracer is None:
+        return None
+    from opentelemetry import trace
+    context = trace.get_current_span().get_span_context()
+    if not context.is_valid:
+        return None
+    return format(context.trace_id, "032x")
+
+
+def make_litellm_tracer() -> Any:
+    """
+    Build a LiteLLM callback that records a span per crew LLM call.
+
+    LiteLLM reports completions from its own threads, so the caller's span
+    context is captured before the call and reattached when the span is
+    recorded with the call's real start and end times.
+    """
+    from opentelemetry import context
+    from litellm.integrations.custom_logger import CustomLogger
+
+    class LiteLLMTracer(CustomLogger):
+        def __init__(self):
+            super().__init__()
+            self._parents: dict[str, Any] = {}
+
+        def log_pre_api_call(self, model, messages, kwargs):
+            call_id = kwargs.get("litellm_call_id")
+            if call_id:
+                self._parents[call_id] = context.get_current()
+
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, response_obj, start_time, end_time, error=None)
+
+        def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            self._record(kwargs, None, start_time, end_time, error=kwargs.get("exception"))
+
+        async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self.log_success_event(kwargs, response_obj, start_time, end_time)
+
+        async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+            self.log_failure_event(kwargs, response_obj, start_time, end_time)
+
+        def _record(self, kwargs, response_obj, start_time, end_time, error):
+            parent = self._parents.pop(kwargs.get("litellm_call_id"), None)
+            tracer = _tracer
+            if tracer is None:
+                return
+
+            usage = getattr(response_obj, "usage", None)
+            current = tracer.start_span(
+                "llm.completion",
+                context=parent,
+                start_time=_nanoseconds(start_time),
+                attributes=_clean({
+                    "model": kwargs.get("model"),
+                    "prompt_tokens": getattr(usage, "prompt_tokens", None),
+                    "completion_tokens": getattr(usage, "completion_tokens", None),
+                    "error": str(error) if error else None,
+                })
+            )
+            current.end(end_time=_nanoseconds(end_time))
+
+    return LiteLLMTracer()
+
+
+def _nanoseconds(moment: Any) -> Optional[int]:
+    try:
+        return int(moment.timestamp() * 1e9)
+    except AttributeError:
+        return None